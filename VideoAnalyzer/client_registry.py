@@ -0,0 +1,47 @@
+import os
+import threading
+from typing import Any, Callable, Hashable
+from loguru import logger
+
+
+class ClientRegistry:
+    """
+    Process-wide registry of lazily created, reusable clients.
+
+    Clients (HTTP pools, OpenAI, S3, chat models) are created on first use and
+    shared by every job in the process, so connections and TLS sessions are
+    reused instead of being rebuilt per request. A forked child starts with an
+    empty registry: sockets inherited from the parent must not be shared, so
+    the child creates its own clients on first use.
+    """
+
+    def __init__(self) -> None:
+        self._clients: dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        if self._pid != os.getpid():
+            self.reset()
+
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    logger.info(f"Creating shared client: {key[0] if isinstance(key, tuple) else key}")
+                    client = factory()
+                    self._clients[key] = client
+        return client
+
+    def reset(self) -> None:
+        """Drop every client without closing it; used after fork where the sockets belong to the parent."""
+        self._clients = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+
+client_registry = ClientRegistry()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=client_registry.reset)
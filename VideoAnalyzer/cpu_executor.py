@@ -0,0 +1,142 @@
+import inspect
+import math
+import multiprocessing
+import os
+import threading
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
+from loguru import logger
+
+from VideoAnalyzer.settings import config_settings
+
+
+def available_cpu_count() -> int:
+    """CPUs this process may actually use: affinity mask capped by the cgroup v2/v1 CPU quota."""
+    count = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            count = min(count, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+                quota = int(f.read())
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+                period = int(f.read())
+            if quota > 0:
+                count = min(count, math.ceil(quota / period))
+        except (OSError, ValueError):
+            pass
+
+    return max(1, count)
+
+
+def pool_context() -> multiprocessing.context.BaseContext:
+    """
+    Start method of the worker processes. The server process is multithreaded,
+    so workers are not forked from it directly but from a clean forkserver
+    (or spawned where forkserver is unavailable).
+    """
+    method = config_settings.CPU_EXECUTOR_START_METHOD
+    if method not in multiprocessing.get_all_start_methods():
+        method = "spawn"
+    return multiprocessing.get_context(method)
+
+
+def _run_in_worker(fn: Callable, args: tuple, kwargs: dict, inject_logger: bool) -> Any:
+    # The parent's loguru handlers are not shared with the worker, use the worker's own logger
+    if inject_logger:
+        kwargs = kwargs | {"logger": logger}
+    return fn(*args, **kwargs)
+
+
+class CpuStageExecutor:
+    """
+    Process pool for CPU-heavy pipeline stages (FFmpeg extraction, compression,
+    audio slicing and export).
+
+    The pool is sized to the CPUs available to the container. Each stage has its
+    own concurrency cap, so several jobs' FFmpeg steps can run in parallel on a
+    host without oversubscribing it or letting one stage starve the others.
+    Callers block in ``run`` until their stage slot and result are available;
+    ``metrics`` reports the queue depth per stage.
+    """
+
+    def __init__(self, max_workers: int | None = None, stage_limits: dict[str, int] | None = None) -> None:
+        self.max_workers = max_workers or config_settings.CPU_EXECUTOR_MAX_WORKERS or available_cpu_count()
+        self.stage_limits = stage_limits if stage_limits is not None else config_settings.CPU_STAGE_LIMITS
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._waiting: dict[str, int] = defaultdict(int)
+        self._running: dict[str, int] = defaultdict(int)
+        self._completed: dict[str, int] = defaultdict(int)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                logger.info(f"Starting CPU stage executor with {self.max_workers} workers")
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=pool_context())
+            return self._executor
+
+    def _get_semaphore(self, stage: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if stage not in self._semaphores:
+                limit = min(self.stage_limits.get(stage, self.max_workers), self.max_workers)
+                self._semaphores[stage] = threading.BoundedSemaphore(max(1, limit))
+            return self._semaphores[stage]
+
+    def run(self, stage: str, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run a module-level function in the pool under the stage's concurrency cap and return its result."""
+        inject_logger = "logger" in inspect.signature(fn).parameters and "logger" not in kwargs
+        semaphore = self._get_semaphore(stage)
+
+        with self._lock:
+            self._waiting[stage] += 1
+        semaphore.acquire()
+        with self._lock:
+            self._waiting[stage] -= 1
+            self._running[stage] += 1
+
+        try:
+            future = self._get_executor().submit(_run_in_worker, fn, args, kwargs, inject_logger)
+            return future.result()
+        finally:
+            semaphore.release()
+            with self._lock:
+                self._running[stage] -= 1
+                self._completed[stage] += 1
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            stages = set(self._waiting) | set(self._running) | set(self._completed)
+            running = sum(self._running.values())
+            waiting = sum(self._waiting.values())
+            return {
+                "max_workers": self.max_workers,
+                "running": min(running, self.max_workers),
+                # Jobs waiting for their stage slot plus jobs submitted but not yet picked up by a worker
+                "queue_depth": waiting + max(0, running - self.max_workers),
+                "stages": {
+                    stage: {
+                        "limit": min(self.stage_limits.get(stage, self.max_workers), self.max_workers),
+                        "waiting": self._waiting[stage],
+                        "running": self._running[stage],
+                        "completed": self._completed[stage],
+                    }
+                    for stage in sorted(stages)
+                },
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+cpu_executor = CpuStageExecutor()
@@ -0,0 +1,162 @@
+import json
+import os
+import shutil
+import threading
+import time
+from typing import Any
+
+from loguru import logger
+
+from VideoAnalyzer.domains.s3_utils.artifact_store import ArtifactStore, get_artifact_store
+from VideoAnalyzer.settings import config_settings
+
+
+class JobCheckpoint:
+    """
+    Per-stage checkpoints of an ingestion job, keyed by request_id.
+
+    Completed stages are recorded in a manifest next to their outputs in
+    ``CHECKPOINT_DIR/<request_id>/`` and, when an artifact store is given,
+    mirrored to ``checkpoints/<request_id>/`` in the bucket so another worker
+    can pick up the job. A retried request resumes after the last completed
+    stage: downloaded media, per-chunk transcripts, split chunks and embedded
+    batches.
+    """
+
+    MANIFEST_FILE = "manifest.json"
+
+    def __init__(self, request_id: int, root: str | None = None, artifact_store: ArtifactStore | None = None) -> None:
+        self.request_id = request_id
+        self.directory = os.path.join(root or config_settings.CHECKPOINT_DIR, str(request_id))
+        self.artifact_store = artifact_store
+        os.makedirs(self.directory, exist_ok=True)
+        self.manifest = self._load_manifest()
+        if self.manifest["stages"]:
+            logger.info(f"Resuming request_id: {request_id} with completed stages: {list(self.manifest['stages'])}")
+
+    def _remote_key(self, name: str) -> str:
+        return self.artifact_store.key("checkpoints", self.request_id, name)
+
+    def _load_manifest(self) -> dict[str, Any]:
+        manifest_path = os.path.join(self.directory, self.MANIFEST_FILE)
+        if os.path.isfile(manifest_path):
+            with open(manifest_path) as f:
+                return json.load(f)
+        if self.artifact_store is not None and self.artifact_store.exists(self._remote_key(self.MANIFEST_FILE)):
+            return self.artifact_store.get_json(self._remote_key(self.MANIFEST_FILE))
+        return {"request_id": self.request_id, "stages": {}}
+
+    def _write_manifest(self) -> None:
+        manifest_path = os.path.join(self.directory, self.MANIFEST_FILE)
+        temp_path = f"{manifest_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.manifest, f)
+        os.replace(temp_path, manifest_path)
+        if self.artifact_store is not None:
+            self.artifact_store.put_json(self.manifest, self._remote_key(self.MANIFEST_FILE))
+
+    def is_done(self, stage: str) -> bool:
+        return stage in self.manifest["stages"]
+
+    def mark(self, stage: str, **info: Any) -> None:
+        self.manifest["stages"][stage] = info
+        self._write_manifest()
+        logger.info(f"Checkpointed stage '{stage}' for request_id: {self.request_id}")
+
+    def save_file(self, stage: str, file_path: str) -> str:
+        """Move a stage output into the checkpoint directory and return its new path."""
+        name = f"{stage}{os.path.splitext(file_path)[1]}"
+        target = os.path.join(self.directory, name)
+        shutil.move(file_path, target)
+        if self.artifact_store is not None:
+            self.artifact_store.put_file(target, self._remote_key(name))
+        self.mark(stage, file=name)
+        return target
+
+    def file(self, stage: str) -> str:
+        name = self.manifest["stages"][stage]["file"]
+        target = os.path.join(self.directory, name)
+        if not os.path.isfile(target) and self.artifact_store is not None:
+            self.artifact_store.download_file(self._remote_key(name), target)
+        return target
+
+    def save_json(self, stage: str, data: Any) -> None:
+        name = f"{stage}.json"
+        with open(os.path.join(self.directory, name), "w") as f:
+            json.dump(data, f)
+        if self.artifact_store is not None:
+            self.artifact_store.put_json(data, self._remote_key(name))
+        self.mark(stage, file=name)
+
+    def load_json(self, stage: str) -> Any:
+        with open(self.file(stage)) as f:
+            return json.load(f)
+
+    def clear(self) -> None:
+        """Remove every checkpoint of the job once it has completed."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        if self.artifact_store is not None:
+            self.artifact_store.delete_prefix(f"{self._remote_key('')}/")
+        logger.info(f"Cleared checkpoints for request_id: {self.request_id}")
+
+
+def sweep_expired_checkpoints(
+    root: str | None = None, max_age_seconds: float | None = None, artifact_store: ArtifactStore | None = None
+) -> int:
+    """
+    Remove the checkpoints of jobs that failed and were never retried.
+
+    A job's checkpoint expires when its manifest has not been written for
+    ``max_age_seconds``. Local checkpoint directories are removed, and with an
+    artifact store so are the mirrored ``checkpoints/<request_id>/`` prefixes,
+    including those written by other workers. Returns the number of expired
+    jobs.
+    """
+    root = root or config_settings.CHECKPOINT_DIR
+    max_age_seconds = max_age_seconds or config_settings.CHECKPOINT_TTL_HOURS * 3600
+    now = time.time()
+    expired = set()
+
+    if os.path.isdir(root):
+        for request_id in os.listdir(root):
+            directory = os.path.join(root, request_id)
+            manifest_path = os.path.join(directory, JobCheckpoint.MANIFEST_FILE)
+            last_written = os.path.getmtime(manifest_path if os.path.isfile(manifest_path) else directory)
+            if now - last_written > max_age_seconds:
+                shutil.rmtree(directory, ignore_errors=True)
+                expired.add(request_id)
+
+    if artifact_store is not None:
+        for item in artifact_store.list_objects(f"{artifact_store.key('checkpoints')}/"):
+            *_, request_id, name = item["Key"].split("/")
+            if name == JobCheckpoint.MANIFEST_FILE and now - item["LastModified"].timestamp() > max_age_seconds:
+                artifact_store.delete_prefix(f"{artifact_store.key('checkpoints', request_id)}/")
+                expired.add(request_id)
+
+    if expired:
+        logger.info(f"Removed expired checkpoints of {len(expired)} jobs: {sorted(expired)}")
+    return len(expired)
+
+
+_last_sweep = 0.0
+_sweep_lock = threading.Lock()
+
+
+def get_job_checkpoint(request_id: int) -> JobCheckpoint | None:
+    global _last_sweep
+    if not config_settings.CHECKPOINT_ENABLED:
+        return None
+    artifact_store = get_artifact_store() if config_settings.CHECKPOINT_TO_ARTIFACT_STORE else None
+
+    # Expired checkpoints are swept at most once per interval, on the first job after startup included
+    with _sweep_lock:
+        sweep = not _last_sweep or time.monotonic() - _last_sweep > config_settings.CHECKPOINT_SWEEP_INTERVAL_SECONDS
+        if sweep:
+            _last_sweep = time.monotonic()
+    if sweep:
+        try:
+            sweep_expired_checkpoints(artifact_store=artifact_store)
+        except Exception as e:
+            logger.warning(f"Failed to sweep expired checkpoints: {e}")
+
+    return JobCheckpoint(request_id, artifact_store=artifact_store)
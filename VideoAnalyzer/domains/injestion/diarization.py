@@ -0,0 +1,189 @@
+import time
+from typing import List, Tuple
+
+import numpy as np
+from loguru import logger
+
+from VideoAnalyzer.domains.injestion.transcript import TranscriptSegments
+from VideoAnalyzer.domains.injestion.vad import VAD_SAMPLE_RATE
+
+SpeakerTurn = Tuple[float, float, str]
+
+
+def _mel_filterbank(num_filters: int, n_fft: int, sample_rate: int) -> np.ndarray:
+    """Triangular mel filterbank of shape (num_filters, n_fft // 2 + 1)"""
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+    mel_points = np.linspace(hz_to_mel(50.0), hz_to_mel(sample_rate / 2), num_filters + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / sample_rate).astype(int)
+
+    filterbank = np.zeros((num_filters, n_fft // 2 + 1), dtype=np.float32)
+    for i in range(1, num_filters + 1):
+        left, center, right = bins[i - 1], bins[i], bins[i + 1]
+        if center > left:
+            filterbank[i - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            filterbank[i - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return filterbank
+
+
+def extract_speaker_embeddings(
+    samples: np.ndarray,
+    regions: List[Tuple[float, float]],
+    sample_rate: int = VAD_SAMPLE_RATE,
+    window_seconds: float = 1.5,
+    num_filters: int = 40,
+) -> Tuple[np.ndarray, List[Tuple[float, float]]]:
+    """
+    Compute one embedding per fixed window inside the speech regions.
+
+    An embedding is the mean and standard deviation of the log-mel energies of
+    the window, mean-normalised over the recording and L2-normalised so that
+    cosine similarity is a dot product.
+
+    Returns:
+        (embeddings, windows) where windows are (start, end) in seconds.
+    """
+    frame_length = int(0.025 * sample_rate)
+    hop_length = int(0.010 * sample_rate)
+    n_fft = 512
+    filterbank = _mel_filterbank(num_filters, n_fft, sample_rate)
+    hamming = np.hamming(frame_length).astype(np.float32)
+    window_samples = int(window_seconds * sample_rate)
+
+    embeddings = []
+    windows = []
+    for region_start, region_end in regions:
+        start = int(region_start * sample_rate)
+        end = int(region_end * sample_rate)
+        for window_start in range(start, max(start + 1, end - window_samples // 2), window_samples):
+            chunk = samples[window_start: min(end, window_start + window_samples)].astype(np.float32)
+            num_frames = 1 + (len(chunk) - frame_length) // hop_length
+            if num_frames < 10:
+                continue
+            indices = np.arange(frame_length)[None, :] + hop_length * np.arange(num_frames)[:, None]
+            spectrum = np.abs(np.fft.rfft(chunk[indices] * hamming, n=n_fft)) ** 2
+            log_mel = np.log(spectrum @ filterbank.T + 1e-6)
+            embeddings.append(np.concatenate([log_mel.mean(axis=0), log_mel.std(axis=0)]))
+            windows.append((window_start / sample_rate, (window_start + len(chunk)) / sample_rate))
+
+    if not embeddings:
+        return np.zeros((0, num_filters * 2), dtype=np.float32), []
+
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    matrix -= matrix.mean(axis=0)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-9
+    return matrix, windows
+
+
+def cluster_embeddings(
+    embeddings: np.ndarray,
+    threshold: float = 0.3,
+    max_speakers: int = 8,
+    max_clustering_windows: int = 1000,
+) -> np.ndarray:
+    """
+    Centroid-linkage agglomerative clustering on cosine similarity.
+
+    Clusters are merged while their centroid similarity is above ``threshold``
+    or while there are more than ``max_speakers`` clusters. Long recordings are
+    clustered on an evenly spaced subset of windows and every window is then
+    assigned to its nearest centroid, which keeps memory bounded.
+
+    Returns:
+        array of cluster ids, one per embedding, numbered by first appearance.
+    """
+    if len(embeddings) == 0:
+        return np.zeros(0, dtype=np.int32)
+
+    step = max(1, int(np.ceil(len(embeddings) / max_clustering_windows)))
+    sample = embeddings[::step]
+    sums = sample.astype(np.float64)
+    counts = np.ones(len(sample))
+    similarity = sample @ sample.T
+    np.fill_diagonal(similarity, -np.inf)
+    active = np.ones(len(sample), dtype=bool)
+
+    while active.sum() > 1:
+        flat_index = int(np.argmax(similarity))
+        i, j = divmod(flat_index, len(sample))
+        if similarity[i, j] < threshold and active.sum() <= max_speakers:
+            break
+        sums[i] += sums[j]
+        counts[i] += counts[j]
+        active[j] = False
+        similarity[j, :] = -np.inf
+        similarity[:, j] = -np.inf
+
+        centroid = sums[i] / np.linalg.norm(sums[i])
+        row = (sums / np.linalg.norm(sums, axis=1, keepdims=True)) @ centroid
+        row[~active] = -np.inf
+        row[i] = -np.inf
+        similarity[i, :] = row
+        similarity[:, i] = row
+
+    centroids = sums[active] / np.linalg.norm(sums[active], axis=1, keepdims=True)
+    labels = np.argmax(embeddings @ centroids.T.astype(np.float32), axis=1)
+
+    # Number speakers by first appearance
+    _, first_seen = np.unique(labels, return_index=True)
+    order = np.argsort(first_seen)
+    remap = np.empty(len(centroids), dtype=np.int32)
+    remap[np.unique(labels)[order]] = np.arange(len(order))
+    return remap[labels]
+
+
+def diarize(
+    samples: np.ndarray,
+    regions: List[Tuple[float, float]],
+    logger,
+    threshold: float = 0.3,
+    max_speakers: int = 8,
+    sample_rate: int = VAD_SAMPLE_RATE,
+) -> List[SpeakerTurn]:
+    """Run embedding + clustering diarization over the speech regions of decoded audio"""
+    try:
+        logger.info(f"Starting diarization over {len(regions)} speech regions")
+        start_time = time.time()
+        embeddings, windows = extract_speaker_embeddings(samples, regions, sample_rate)
+        labels = cluster_embeddings(embeddings, threshold=threshold, max_speakers=max_speakers)
+
+        turns: List[SpeakerTurn] = []
+        for (start, end), label in zip(windows, labels):
+            speaker = f"SPEAKER_{label:02d}"
+            if turns and turns[-1][2] == speaker and start - turns[-1][1] < 1.0:
+                turns[-1] = (turns[-1][0], end, speaker)
+            else:
+                turns.append((start, end, speaker))
+
+        logger.info(
+            f"Diarization completed in {time.time() - start_time:.2f} seconds: "
+            f"{len(set(labels.tolist()))} speakers, {len(turns)} turns"
+        )
+        return turns
+    except Exception as e:
+        logger.error(f"An error occurred during diarization: {str(e)}")
+        raise
+
+
+def assign_speakers(segments: TranscriptSegments, turns: List[SpeakerTurn]) -> None:
+    """Label each transcript segment with the speaker whose turns overlap it the most"""
+    turn_index = 0
+    for index in range(len(segments)):
+        start, end = segments.starts[index], segments.ends[index]
+        while turn_index < len(turns) and turns[turn_index][1] <= start:
+            turn_index += 1
+
+        overlaps: dict[str, float] = {}
+        probe = turn_index
+        while probe < len(turns) and turns[probe][0] < end:
+            turn_start, turn_end, speaker = turns[probe]
+            overlaps[speaker] = overlaps.get(speaker, 0.0) + min(end, turn_end) - max(start, turn_start)
+            probe += 1
+
+        if overlaps:
+            segments.set_speaker(index, max(overlaps, key=overlaps.get))
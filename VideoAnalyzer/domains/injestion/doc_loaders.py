@@ -8,24 +8,42 @@ from VideoAnalyzer.domains.injestion.utils import (
     extract_audio_from_video,
     extract_metadata_from_video,
     compress_audio,
+    probe_media,
+    select_audio_profile,
+    select_bitrate_profile,
     transcribe_and_combine_chunks,
     format_transcription,
     cleanup_temp_files,
+    count_pdf_pages,
+    extract_pdf_pages,
+)
+from VideoAnalyzer.domains.injestion.transcript import TranscriptSegments
+from VideoAnalyzer.domains.injestion.checkpoint import JobCheckpoint
+from VideoAnalyzer.domains.injestion.diarization import diarize, assign_speakers
+from VideoAnalyzer.domains.injestion.keyframes import extract_slide_documents
+from VideoAnalyzer.domains.injestion.vad import (
+    decode_audio_to_pcm,
+    detect_speech_regions,
+    load_pcm,
+    write_speech_audio,
+    SpeechOffsetMap,
 )
 import os
 import uuid
 import pprint
-from openai import OpenAI
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Iterator, List, Any, Tuple
 from VideoAnalyzer.domains.injestion.exception import FileLoaderException
-from langchain_community.document_loaders import TextLoader, PyPDFLoader
 
 from typing import get_args, Callable
 from VideoAnalyzer.models import FILE_TYPE
-from VideoAnalyzer.vector_db.utils import split_text
+from VideoAnalyzer.vector_db.utils import split_text, split_transcript
 from langchain.chains.summarize import load_summarize_chain
 import json
-from VideoAnalyzer.utils import get_chat_model
+from VideoAnalyzer.utils import get_chat_model, get_transcription_client
+from VideoAnalyzer.cpu_executor import cpu_executor
+from VideoAnalyzer.rate_limiter import count_tokens, get_rate_limiter
 
 
 class MediaProcessor(BaseLoader):
@@ -37,62 +55,85 @@ class MediaProcessor(BaseLoader):
 
     EXTRACTED_AUDIO_TEMPLATE = "extracted_audio_{unique_id}.ogg"
     COMPRESSED_AUDIO_TEMPLATE = "compressed_audio_{unique_id}.ogg"
+    SPEECH_AUDIO_TEMPLATE = "speech_audio_{unique_id}.ogg"
+    PCM_AUDIO_TEMPLATE = "pcm_audio_{unique_id}.s16le"
     TRANSCRIPT_TXT_TEMPLATE = "transcript_{unique_id}.txt"
     TRANSCRIPT_JSON_TEMPLATE = "transcript_{unique_id}.json"
 
-    def __init__(self, file_path: str, file_type: str) -> None:
+    def __init__(
+            self, file_path: str, file_type: str, client: Any = None, checkpoint: JobCheckpoint | None = None
+    ) -> None:
         """
         Initialize MediaProcessor with a file URL and type
         Args:
             file_path (str): Pre-signed URL of the media file
             file_type (str): File type/extension (e.g., 'mp3', 'mp4')
+            client (Any): Optional transcription client shared across jobs
+            checkpoint (JobCheckpoint): Optional checkpoint to resume a retried job from
         """
         self.file_path = file_path
         self.file_type = file_type.lower()
-        self.client = OpenAI(api_key=config_settings.OPENAI_API_KEY)
+        self.client = client or get_transcription_client()
+        self.checkpoint = checkpoint
 
         # Validate URL
         if not is_valid_url(self.file_path) and not os.path.isfile(self.file_path):
             raise ValueError(f"Upload file url is invalid")
 
-        # Ensure the temporary directory exists
-        os.makedirs(self.TEMP_DIR, exist_ok=True)
-
         # Generate a unique ID for this processing session
         self.unique_id = str(uuid.uuid4())[:8]
 
+        # Each job works in its own directory, so concurrent jobs never clean up each other's files
+        self.job_dir = os.path.join(self.TEMP_DIR, self.unique_id)
+        os.makedirs(self.job_dir, exist_ok=True)
+
         # Define output file paths using constants
         self.extracted_audio = os.path.join(
-            self.TEMP_DIR,
+            self.job_dir,
             self.EXTRACTED_AUDIO_TEMPLATE.format(unique_id=self.unique_id),
         )
         self.compressed_audio = os.path.join(
-            self.TEMP_DIR,
+            self.job_dir,
             self.COMPRESSED_AUDIO_TEMPLATE.format(unique_id=self.unique_id),
         )
+        self.speech_audio = os.path.join(
+            self.job_dir,
+            self.SPEECH_AUDIO_TEMPLATE.format(unique_id=self.unique_id),
+        )
+        self.pcm_audio = os.path.join(
+            self.job_dir,
+            self.PCM_AUDIO_TEMPLATE.format(unique_id=self.unique_id),
+        )
+        # Timestamped slide OCR documents, populated for videos by load_segments
+        self.visual_documents: List[Document] = []
         self.transcript_txt = os.path.join(
-            self.TEMP_DIR, self.TRANSCRIPT_TXT_TEMPLATE.format(unique_id=self.unique_id)
+            self.job_dir, self.TRANSCRIPT_TXT_TEMPLATE.format(unique_id=self.unique_id)
         )
         self.transcript_json = os.path.join(
-            self.TEMP_DIR,
+            self.job_dir,
             self.TRANSCRIPT_JSON_TEMPLATE.format(unique_id=self.unique_id),
         )
         super().__init__()
 
-    def lazy_load(self) -> Iterator[Document]:
-        """Process media file and yield Document objects with transcription segments."""
+    def load_segments(self) -> TranscriptSegments:
+        """Process media file and return the transcription as a columnar segment store."""
         try:
             logger.info(f"Starting media processing for file type: {self.file_type}")
 
             # Download file
             temp_input_file = os.path.join(
-                self.TEMP_DIR, f"input_{self.unique_id}.{self.file_type}"
+                self.job_dir, f"input_{self.unique_id}.{self.file_type}"
             )
             logger.info(f"Downloading file to temporary location: {temp_input_file}")
 
-            if not os.path.isfile(self.file_path):
+            if self.checkpoint is not None and self.checkpoint.is_done("download"):
+                temp_input_file = self.checkpoint.file("download")
+                logger.info(f"Reusing checkpointed download: {temp_input_file}")
+            elif not os.path.isfile(self.file_path):
                 logger.info(f"Downloading file from {self.file_path}")
                 download_file(self.file_path, temp_input_file, logger)
+                if self.checkpoint is not None:
+                    temp_input_file = self.checkpoint.save_file("download", temp_input_file)
 
             # Verify the file exists after download
             if not os.path.exists(temp_input_file):
@@ -102,50 +143,114 @@ class MediaProcessor(BaseLoader):
             is_video = self.file_type in ["mp4", "mkv", "avi", "mov"]
             logger.info(f"File identified as: {'video' if is_video else 'audio'}")
 
-            # Process based on file type
-            if is_video:
-                logger.info("Starting video processing workflow...")
-                extract_audio_from_video(temp_input_file, self.extracted_audio, logger)
-                audio_to_process = self.extracted_audio
-                audio_final = audio_to_process
-                logger.info("Video processing workflow completed")
+            # Decode once to a 16k mono PCM file, shared by voice activity detection and diarization
+            frame_rms = None
+            pcm_duration = None
+            speech_regions = None
+            offset_map = None
+            if config_settings.VAD_ENABLED or config_settings.DIARIZATION_ENABLED:
+                frame_rms, pcm_duration = cpu_executor.run(
+                    "decode", decode_audio_to_pcm, temp_input_file, self.pcm_audio,
+                    frame_ms=config_settings.VAD_FRAME_MS,
+                )
+
+            # Drop silence before transcription
+            if config_settings.VAD_ENABLED:
+                speech_regions, offset_map = self._remove_silence(frame_rms, pcm_duration)
+
+            # Process based on file type, choosing the cheapest audio profile that fits the upload limit
+            if offset_map is not None:
+                duration = offset_map.speech_duration
+                profile = select_bitrate_profile(duration, logger)
+                cpu_executor.run(
+                    "transcode", write_speech_audio,
+                    self.pcm_audio, speech_regions, self.speech_audio, bitrate_kbps=profile["bitrate_kbps"],
+                )
+                audio_final = self.speech_audio
             else:
-                logger.info("Starting audio processing workflow...")
-                audio_to_process = temp_input_file
-                logger.info("Compressing audio file...")
-                compress_audio(audio_to_process, self.compressed_audio, logger)
-                audio_final = self.compressed_audio
-                logger.info("Audio processing workflow completed")
+                probe = probe_media(temp_input_file, logger)
+                duration = probe["duration"]
+                profile = select_audio_profile(probe, self.file_type, logger)
+                if not profile["transcode"]:
+                    audio_final = temp_input_file
+                elif is_video:
+                    logger.info("Starting video processing workflow...")
+                    cpu_executor.run(
+                        "transcode", extract_audio_from_video,
+                        temp_input_file, self.extracted_audio,
+                        bitrate_kbps=profile["bitrate_kbps"], sample_rate=profile["sample_rate"],
+                    )
+                    audio_to_process = self.extracted_audio
+                    audio_final = audio_to_process
+                    logger.info("Video processing workflow completed")
+                else:
+                    logger.info("Starting audio processing workflow...")
+                    audio_to_process = temp_input_file
+                    logger.info("Compressing audio file...")
+                    cpu_executor.run(
+                        "transcode", compress_audio,
+                        audio_to_process, self.compressed_audio,
+                        bitrate_kbps=profile["bitrate_kbps"], sample_rate=profile["sample_rate"],
+                    )
+                    audio_final = self.compressed_audio
+                    logger.info("Audio processing workflow completed")
 
             # Transcribe audio
             logger.info("Starting transcription process...")
             file_size = os.path.getsize(audio_final) / (1024 * 1024)  # Convert to MB
             logger.info(f"Processing audio file of size: {file_size:.2f}MB")
 
-            all_segments = transcribe_and_combine_chunks(
-                audio_final, self.TEMP_DIR, self.unique_id, self.client, logger
-            )
-            logger.info(
-                f"Transcription completed. Generated {len(all_segments)} segments"
-            )
+            # Diarize and read slides while the transcription requests are in flight
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                diarization_future = None
+                if config_settings.DIARIZATION_ENABLED:
+                    diarization_future = executor.submit(
+                        diarize,
+                        load_pcm(self.pcm_audio),
+                        speech_regions or [(0.0, pcm_duration)],
+                        logger,
+                        threshold=config_settings.DIARIZATION_THRESHOLD,
+                        max_speakers=config_settings.DIARIZATION_MAX_SPEAKERS,
+                    )
+
+                slides_future = None
+                if is_video and config_settings.VIDEO_OCR_ENABLED:
+                    slides_future = executor.submit(
+                        extract_slide_documents,
+                        temp_input_file,
+                        logger,
+                        duration=pcm_duration,
+                        scene_threshold=config_settings.VIDEO_SCENE_THRESHOLD,
+                        hash_distance=config_settings.VIDEO_OCR_HASH_DISTANCE,
+                    )
+
+                all_segments = transcribe_and_combine_chunks(
+                    audio_final, self.job_dir, self.unique_id, self.client, logger,
+                    checkpoint=self.checkpoint,
+                    chunk_length_ms=profile["chunk_length_ms"],
+                    duration_ms=duration * 1000,
+                    bitrate_kbps=profile["bitrate_kbps"] if profile["transcode"] else None,
+                    cpu_executor=cpu_executor,
+                )
+                logger.info(
+                    f"Transcription completed. Generated {len(all_segments)} segments"
+                )
+                if offset_map is not None:
+                    offset_map.remap_segments(all_segments)
 
-            # Format transcription
-            logger.info("Formatting transcription into documents...")
-            documents = format_transcription(all_segments, logger)
-            logger.info(f"Created {len(documents)} document objects")
-
-            # Yield documents
-            logger.info("Starting document yield process...")
-            doc_count = 0
-            for doc in documents:
-                doc_count += 1
-                if doc_count % 100 == 0:  # Log progress every 100 documents
-                    logger.info(f"Yielded {doc_count}/{len(documents)} documents")
-                yield doc
-
-            logger.info(
-                f"Successfully completed processing. Total documents yielded: {doc_count}"
-            )
+                # Format transcription
+                logger.info("Formatting transcription into segment store...")
+                segments = format_transcription(all_segments, logger)
+                logger.info(f"Stored {len(segments)} transcript segments")
+
+                if diarization_future is not None:
+                    assign_speakers(segments, diarization_future.result())
+                    logger.info(f"Assigned {len(segments.speaker_labels)} speaker labels to segments")
+
+                if slides_future is not None:
+                    self.visual_documents = slides_future.result()
+
+            return segments
 
         except Exception as e:
             logger.error(
@@ -154,18 +259,84 @@ class MediaProcessor(BaseLoader):
             raise
         finally:
             logger.info("Cleaning up temporary files...")
-            cleanup_temp_files(self.TEMP_DIR)
+            cleanup_temp_files(self.job_dir)
             logger.info("Cleanup completed")
 
+    def lazy_load(self) -> Iterator[Document]:
+        """Process media file and yield Document objects with transcription segments."""
+        segments = self.load_segments()
+
+        logger.info("Starting document yield process...")
+        doc_count = 0
+        for doc in segments.iter_documents():
+            doc_count += 1
+            if doc_count % 100 == 0:  # Log progress every 100 documents
+                logger.info(f"Yielded {doc_count}/{len(segments)} documents")
+            yield doc
+
+        for doc in self.visual_documents:
+            doc_count += 1
+            yield doc
+
+        logger.info(
+            f"Successfully completed processing. Total documents yielded: {doc_count}"
+        )
+
+    def _remove_silence(
+        self, frame_rms, duration: float
+    ) -> Tuple[List[Tuple[float, float]] | None, SpeechOffsetMap | None]:
+        """
+        Detect speech from the frame energies of the decoded audio.
+
+        Returns:
+            (speech regions, SpeechOffsetMap) to remap segment timestamps, or
+            (None, None) when the input should be transcribed as is.
+        """
+        logger.info("Running voice activity detection...")
+        regions = detect_speech_regions(
+            frame_rms,
+            duration,
+            frame_ms=config_settings.VAD_FRAME_MS,
+            threshold_db=config_settings.VAD_THRESHOLD_DB,
+            min_dbfs=config_settings.VAD_MIN_DBFS,
+            min_speech_ms=config_settings.VAD_MIN_SPEECH_MS,
+            min_silence_ms=config_settings.VAD_MIN_SILENCE_MS,
+            padding_ms=config_settings.VAD_PADDING_MS,
+        )
+        if not regions:
+            logger.warning("No speech detected, transcribing the full audio")
+            return None, None
+
+        offset_map = SpeechOffsetMap(regions)
+        logger.info(
+            f"Detected {len(regions)} speech regions: "
+            f"{offset_map.speech_duration:.2f}s of speech out of {duration:.2f}s"
+        )
+        return regions, offset_map
+
     def load(self) -> List[Document]:
         """Implementation of load for BaseLoader."""
         return list(self.lazy_load())
 
 
-class TextFileLoader:
-    def __init__(self, file_path: str, process_type: str = "text"):
+class TextFileLoader(BaseLoader):
+    """
+    Streams text and PDF files as Documents.
+
+    Text files are read in blocks of ``TEXT_BLOCK_CHARS`` cut at line breaks,
+    PDFs are parsed in ranges of ``PDF_PAGES_PER_TASK`` pages on the CPU stage
+    executor and yielded page by page in order, so a large document is split
+    and embedded without being held in memory as a whole.
+    """
+
+    TEMP_DIR = MediaProcessor.TEMP_DIR
+
+    def __init__(self, file_path: str, process_type: str = "text", file_type: str = "txt"):
         self.file_path = file_path
         self.process_type = process_type
+        self.file_type = file_type.lower()
+        self.local_file: str | None = None
+        self.job_dir: str | None = None
         # Validate the process type
         self._validate_process_type()
 
@@ -176,45 +347,70 @@ class TextFileLoader:
         if self.process_type not in valid_types:
             raise ValueError(f"Invalid process type: {self.process_type}. Supported types are: {', '.join(valid_types)}")
 
+    def _resolve_local_file(self) -> str:
+        """Download a pre-signed URL to the temp directory, or validate a local path."""
+        if is_valid_url(self.file_path):
+            self.job_dir = os.path.join(self.TEMP_DIR, str(uuid.uuid4())[:8])
+            os.makedirs(self.job_dir, exist_ok=True)
+            self.local_file = os.path.join(self.job_dir, f"input.{self.file_type}")
+            return download_file(self.file_path, self.local_file, logger)
 
-    def _validate_file_path(self) -> None:
-        """Checks if the file path exists."""
         if not os.path.isfile(self.file_path):
             raise FileNotFoundError(f"File not found: {self.file_path}")
-
-    def load(self) -> Document | str:
-        """
-        Loads the file based on the specified process type.
-
-        Returns:
-            Document or str: Loaded Document object or an error message string.
-        """
-        try:
-            logger.info(f"{self.__class__.__name__}.load(): Attempting to load file from {self.file_path}")
-
-            # Validate file path
-            self._validate_file_path()
-
-            if self.process_type == "text":
-                text_loader = TextLoader(
-                    file_path=self.file_path
+        return self.file_path
+
+    def _stream_text_blocks(self, file_path: str) -> Iterator[Document]:
+        block_chars = config_settings.TEXT_BLOCK_CHARS
+        with open(file_path, encoding="utf-8", errors="replace") as f:
+            block_index = 0
+            pending = ""
+            while chunk := f.read(block_chars):
+                pending += chunk
+                # Cut at the last line break so paragraphs are not split across blocks
+                cut = pending.rfind("\n") + 1 or len(pending)
+                block, pending = pending[:cut], pending[cut:]
+                yield Document(page_content=block, metadata={"source": self.file_path, "block": block_index})
+                block_index += 1
+            if pending:
+                yield Document(page_content=pending, metadata={"source": self.file_path, "block": block_index})
+
+    def _stream_pdf_pages(self, file_path: str) -> Iterator[Document]:
+        total_pages = count_pdf_pages(file_path)
+        pages_per_task = max(1, config_settings.PDF_PAGES_PER_TASK)
+        ranges = [(start, start + pages_per_task) for start in range(0, total_pages, pages_per_task)]
+        max_in_flight = max(1, config_settings.CPU_STAGE_LIMITS.get("pdf", 1))
+        logger.info(f"{self.__class__.__name__}: parsing {total_pages} pages in {len(ranges)} tasks")
+
+        # Keep at most max_in_flight page ranges parsed ahead of the consumer, yielding in page order
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            pending: deque[Future] = deque()
+            for start, stop in ranges:
+                pending.append(executor.submit(cpu_executor.run, "pdf", extract_pdf_pages, file_path, start, stop))
+                if len(pending) >= max_in_flight:
+                    yield from self._page_documents(pending.popleft().result(), total_pages)
+            while pending:
+                yield from self._page_documents(pending.popleft().result(), total_pages)
+
+    def _page_documents(self, pages: list[tuple[int, str]], total_pages: int) -> Iterator[Document]:
+        for page_number, text in pages:
+            if text.strip():
+                yield Document(
+                    page_content=text,
+                    metadata={"source": self.file_path, "page": page_number + 1, "total_pages": total_pages},
                 )
 
-                file_contents=text_loader.load()
-                return file_contents
-
+    def lazy_load(self) -> Iterator[Document]:
+        """Yield the file's Documents block by block (text) or page by page (PDF)."""
+        logger.info(f"{self.__class__.__name__}.lazy_load(): Attempting to load file from {self.file_path}")
+        file_path = self._resolve_local_file()
+        try:
+            if self.process_type == "pdf":
+                yield from self._stream_pdf_pages(file_path)
             else:
-                raise ValueError(f"Unsupported process type: {self.process_type}")
-
-        except FileNotFoundError as fnf_error:
-            logger.error(f"{self.__class__.__name__}.load(): File not found - {fnf_error}")
-            return "Error: File does not exist."
-        except ValueError as val_error:
-            logger.error(f"{self.__class__.__name__}.load(): Value error - {val_error}")
-            return str(val_error)
-        except Exception as e:
-            logger.error(f"{self.__class__.__name__}.load(): Unexpected error - {e}")
-            return "Error: An unexpected error occurred while loading the file."
+                yield from self._stream_text_blocks(file_path)
+        finally:
+            if self.job_dir is not None:
+                cleanup_temp_files(self.job_dir)
 
 
 def file_loader(
@@ -227,67 +423,95 @@ def file_loader(
     response_data_api_path: str,
     params: dict[str, Any],
     metadata: list[dict[str, str]] = [{}],
-) -> Tuple[list[Document], str, Any]:
+    client: Any = None,
+    llm: Any = None,
+    checkpoint: JobCheckpoint | None = None,
+) -> Tuple[list[Document], str, TranscriptSegments | None]:
 
     if file_type not in get_args(FILE_TYPE):
         raise FileLoaderException(f"{file_type} is not a supported file type")
 
+    if checkpoint is not None and checkpoint.is_done("split"):
+        logger.info("Restoring split documents from checkpoint")
+        split_state = checkpoint.load_json("split")
+        parsed_documents = [
+            Document(page_content=doc["page_content"], metadata=doc["metadata"])
+            for doc in split_state["documents"]
+        ]
+        columns = split_state.get("segments")
+        segments = TranscriptSegments.from_columns(**columns) if columns is not None else None
+        return parsed_documents, split_state["summary"], segments
+
     loaders: dict[str, Callable[[], BaseLoader]] = {
-        "text": lambda: TextFileLoader(pre_signed_url, process_type="text"),
-        "pdf": lambda: TextFileLoader(pre_signed_url, process_type="pdf"),
-        "audio": lambda: MediaProcessor(pre_signed_url, file_type),
-        "video": lambda: MediaProcessor(pre_signed_url, file_type),
+        "text": lambda: TextFileLoader(
+            pre_signed_url, process_type="pdf" if file_type == "pdf" else "text", file_type=file_type
+        ),
+        "pdf": lambda: TextFileLoader(pre_signed_url, process_type="pdf", file_type=file_type),
+        "audio": lambda: MediaProcessor(pre_signed_url, file_type, client=client, checkpoint=checkpoint),
+        "video": lambda: MediaProcessor(pre_signed_url, file_type, client=client, checkpoint=checkpoint),
     }
 
     if (loader := loaders.get(process_type)) is None:
         raise FileNotFoundError("Unsupported process_type")
 
-    loaded_documents = loader().load()
-    logger.info(f"documents loaded {len(loaded_documents)}")
-
-    # Format transcript for audio/video files
-    transcript_json = None
+    # Audio/video transcripts stay columnar; Documents are only built while chunking
+    segments = None
     if process_type in ["audio", "video"]:
-        transcript_json = {
-            "transcript": [
-                {
-                    "text": doc.page_content,
-                    "start_time": doc.metadata["start_time"],
-                    "end_time": doc.metadata["end_time"],
-                }
-                for doc in loaded_documents
-            ]
-        }
+        media_processor = loader()
+        segments = media_processor.load_segments()
+        logger.info(f"transcript segments loaded {len(segments)}")
 
     parsed_documents: list[Document] = []
     tags = params.get("tags") or []
     synonyms = params.get("synonyms") or []
     document_summary=""
 
-    parsed_documents = split_text(
-        text=loaded_documents,
-        CHUNK_SIZE=config_settings.CHUNK_SIZE,
-        CHUNK_OVERLAP=config_settings.CHUNK_OVERLAP
-    )
+    if process_type in ["audio", "video"]:
+        parsed_documents = split_transcript(
+            segments=segments.iter_documents(),
+            MAX_TOKENS=config_settings.TRANSCRIPT_CHUNK_TOKENS,
+            OVERLAP_SEGMENTS=config_settings.TRANSCRIPT_CHUNK_OVERLAP_SEGMENTS,
+        )
+        if media_processor.visual_documents:
+            parsed_documents += split_text(
+                text=media_processor.visual_documents,
+                CHUNK_SIZE=config_settings.CHUNK_SIZE,
+                CHUNK_OVERLAP=config_settings.CHUNK_OVERLAP
+            )
+    else:
+        # Split page by page as the loader yields, only the chunks are kept
+        loaded_documents = 0
+        for document in loader().lazy_load():
+            loaded_documents += 1
+            parsed_documents += split_text(
+                text=[document],
+                CHUNK_SIZE=config_settings.CHUNK_SIZE,
+                CHUNK_OVERLAP=config_settings.CHUNK_OVERLAP
+            )
+        logger.info(f"documents loaded {loaded_documents}")
 
     # Generate summary
     if params.get("summary", False):
         document_summary = params.get("summary", "")
     else:
         logger.info("Generating document summary")
-        llm = get_chat_model(model_key="SUMMARIZE_LLM_MODEL")
+        llm = llm or get_chat_model(model_key="SUMMARIZE_LLM_MODEL")
         if llm:
             chain = load_summarize_chain(
                 llm,
                 chain_type="stuff",
                 verbose=True,
             )
+            summary_documents = parsed_documents[
+                : config_settings.INITIAL_NUMBER_OF_PAGES_TO_RETRIEVE_FOR_SUMMARIZATION
+            ]
+            get_rate_limiter().acquire(
+                "SUMMARIZE_LLM_MODEL",
+                tokens=count_tokens(doc.page_content for doc in summary_documents)
+                + config_settings.RATE_LIMIT_COMPLETION_TOKENS,
+            )
             summary = chain.invoke(
-                input={
-                    "input_documents": parsed_documents[
-                        : config_settings.INITIAL_NUMBER_OF_PAGES_TO_RETRIEVE_FOR_SUMMARIZATION
-                    ]
-                }
+                input={"input_documents": summary_documents}
             )
             document_summary = summary.get("output_text", "")
 
@@ -309,7 +533,19 @@ def file_loader(
             "title": document.metadata.get("title") or original_file_name
         }
 
-    return parsed_documents, document_summary, transcript_json
+    if checkpoint is not None:
+        checkpoint.save_json(
+            "split",
+            {
+                "documents": [
+                    {"page_content": doc.page_content, "metadata": doc.metadata} for doc in parsed_documents
+                ],
+                "summary": document_summary,
+                "segments": segments.to_columns() if segments is not None else None,
+            },
+        )
+
+    return parsed_documents, document_summary, segments
 
 
 if __name__ == "__main__":
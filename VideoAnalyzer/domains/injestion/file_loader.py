@@ -1,12 +1,24 @@
 from loguru import logger
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any, Tuple
-from VideoAnalyzer.models import FileInjestionRequestDto
-from VideoAnalyzer.vector_db.push_vector import push_to_database
+from VideoAnalyzer.models import FileInjestionRequestDto, BatchFileInjestionRequestDto
+from VideoAnalyzer.vector_db.backends import get_vector_store
+from VideoAnalyzer.vector_db.incremental import compute_chunk_ids, diff_chunks
 from VideoAnalyzer.settings import config_settings
 from langchain_core.documents import Document
 from VideoAnalyzer.domains.injestion.doc_loaders import file_loader
 from VideoAnalyzer.exception import VideoException
+from VideoAnalyzer.domains.injestion.utils import probe_job
+from VideoAnalyzer.domains.injestion.models import JobEstimate
+from VideoAnalyzer.domains.injestion.checkpoint import JobCheckpoint, get_job_checkpoint
+from VideoAnalyzer.domains.injestion.segment_index import get_segment_index
+from VideoAnalyzer.domains.injestion.summary import get_summary_cache
+from VideoAnalyzer.domains.injestion.transcript import TranscriptSegments
+from VideoAnalyzer.domains.injestion.transcript_artifacts import store_transcript_artifacts
 from VideoAnalyzer.update_api_status.models import RequestStatus, RequestStatusEnum, ApiNameEnum
+from VideoAnalyzer.update_api_status.utils import call_update_status_api
+from VideoAnalyzer.job_scheduler import ShortestJobFirstScheduler
+from VideoAnalyzer.utils import get_chat_model, get_transcription_client
 
 
 def load_file(
@@ -20,7 +32,10 @@ def load_file(
     request_id: int,
     response_data_api_path: str,
     token: str,
-) -> Tuple[list[Document], str, Any]:
+    client: Any = None,
+    llm: Any = None,
+    checkpoint: JobCheckpoint | None = None,
+) -> Tuple[list[Document], str, TranscriptSegments | None]:
     logger.info(f"Received file type: {file_type}")
     try:
         return file_loader(
@@ -33,7 +48,9 @@ def load_file(
             response_data_api_path,
             params,
             metadata,
-            token,
+            client=client,
+            llm=llm,
+            checkpoint=checkpoint,
         )
     except Exception as e:
         logger.exception("Exception during file load")
@@ -41,15 +58,68 @@ def load_file(
 
 
 
-def load_file_and_push_to_database_and_update_status(
-    request: FileInjestionRequestDto, token: str
+def push_documents_in_batches(
+    documents: list[Document], file_name: str, namespace: str, checkpoint: JobCheckpoint | None = None
 ) -> None:
+    """
+    Embed and push documents in EMBED_BATCH_SIZE batches, skipping batches already checkpointed.
+
+    Chunks get content-hash IDs, so re-ingesting a file only embeds and inserts
+    the chunks that changed and deletes the ones no longer present. Without
+    incremental ingestion the file's existing chunks are replaced.
+    """
+    vector_store = get_vector_store()
+    ids = compute_chunk_ids(documents, file_name)
+    stale_ids: list[str] = []
+
+    if config_settings.INCREMENTAL_INGESTION_ENABLED:
+        # The diff is checkpointed so batch indices stay stable when a retry resumes mid-push
+        if checkpoint is not None and checkpoint.is_done("chunk_diff"):
+            chunk_diff = checkpoint.load_json("chunk_diff")
+        else:
+            stored_ids = vector_store.get_chunk_ids(file_name, namespace)
+            _, new_ids, stale_ids = diff_chunks(documents, ids, stored_ids)
+            chunk_diff = {"new_ids": new_ids, "stale_ids": stale_ids}
+            if checkpoint is not None:
+                checkpoint.save_json("chunk_diff", chunk_diff)
+
+        new_ids = set(chunk_diff["new_ids"])
+        stale_ids = chunk_diff["stale_ids"]
+        documents = [document for document, chunk_id in zip(documents, ids) if chunk_id in new_ids]
+        ids = [chunk_id for chunk_id in ids if chunk_id in new_ids]
+    elif checkpoint is None or not checkpoint.is_done("chunks_replaced"):
+        # Every chunk is re-inserted under its content-hash ID and Milvus does not enforce unique
+        # primary keys, so the file's existing chunks are removed first instead of duplicated
+        replaced = vector_store.delete(vector_store.get_chunk_ids(file_name, namespace), namespace)
+        logger.info(f"Removed {replaced} existing chunks of {file_name} before re-inserting")
+        if checkpoint is not None:
+            checkpoint.mark("chunks_replaced")
+
+    batch_size = config_settings.EMBED_BATCH_SIZE
+    for batch_index, start in enumerate(range(0, len(documents), batch_size)):
+        stage = f"embedded_batch_{batch_index}"
+        if checkpoint is not None and checkpoint.is_done(stage):
+            logger.info(f"Skipping checkpointed embedding batch {batch_index}")
+            continue
+        vector_store.add_documents(documents[start: start + batch_size], namespace, ids=ids[start: start + batch_size])
+        if checkpoint is not None:
+            checkpoint.mark(stage, documents=len(documents[start: start + batch_size]))
+
+    # Stale chunks are removed only after their replacements are searchable
+    vector_store.delete(stale_ids, namespace)
+
+
+def load_file_and_push_to_database_and_update_status(
+    request: FileInjestionRequestDto, token: str, client: Any = None, llm: Any = None
+) -> RequestStatus:
     logger.info(
         f"Starting background task for {request.file_name} and process_type: {request.process_type}"
     )
 
+    checkpoint = get_job_checkpoint(request.request_id)
+
     try:
-        documents, summary, transcription_json = load_file(
+        documents, summary, segments = load_file(
             request.pre_signed_url,
             request.file_name,
             request.original_file_name,
@@ -60,8 +130,20 @@ def load_file_and_push_to_database_and_update_status(
             request.request_id,
             request.response_data_api_path,
             token,
+            client=client,
+            llm=llm,
+            checkpoint=checkpoint,
         )
-        push_to_database(documents, config_settings.INDEX_NAME, request.namespace)
+        push_documents_in_batches(documents, request.file_name, request.namespace, checkpoint)
+
+        get_summary_cache().put(request.file_name, summary)
+
+        transcript_artifact = None
+        if segments is not None and len(segments):
+            if (segment_index := get_segment_index()) is not None:
+                segment_index.save(request.file_name, segments)
+            if config_settings.TRANSCRIPT_ARTIFACT_ENABLED:
+                transcript_artifact = store_transcript_artifacts(segments, request.request_id)
 
     except Exception as e:
         logger.exception("Failed")
@@ -76,13 +158,17 @@ def load_file_and_push_to_database_and_update_status(
     else:
         logger.info("Completed")
         error_detail = ""
+        if checkpoint is not None:
+            checkpoint.clear()
 
         # Prepare response data with summary
         response_data = {"summary": summary}
 
-        # Add transcript only if it exists
-        if transcription_json and "transcript" in transcription_json:
-            response_data["transcript"] = transcription_json["transcript"]
+        # Long transcripts are sent as a pointer to their artifact instead of inline
+        if transcript_artifact is not None:
+            response_data["transcript_artifact"] = transcript_artifact
+        elif segments is not None:
+            response_data["transcript"] = list(segments.iter_transcript())
 
         # Create status object
         status = RequestStatus(
@@ -98,4 +184,107 @@ def load_file_and_push_to_database_and_update_status(
         f" to backend service for file_name: {request.file_name}"
     )
 
+    call_update_status_api(request.response_data_api_path, status, token)
+    return status
+
+
+def probe_files(files: list[FileInjestionRequestDto]) -> list[JobEstimate]:
+    """Probe the duration and size of every file of a batch concurrently."""
+    with ThreadPoolExecutor(max_workers=config_settings.BATCH_MAX_WORKERS) as executor:
+        return list(executor.map(
+            lambda file_request: probe_job(file_request.pre_signed_url, file_request.process_type, logger), files
+        ))
+
+
+def schedule_files(
+    request: BatchFileInjestionRequestDto,
+    token: str,
+    estimates: list[JobEstimate],
+    scheduler: ShortestJobFirstScheduler,
+) -> list[tuple[Future, float]]:
+    """Queue every file of a batch on the job scheduler and return their futures and ETAs."""
+    client = get_transcription_client()
+    llm = get_chat_model(model_key="SUMMARIZE_LLM_MODEL")
+    return [
+        scheduler.submit(
+            file_request.request_id,
+            estimate["estimated_seconds"],
+            load_file_and_push_to_database_and_update_status,
+            file_request,
+            token,
+            client=client,
+            llm=llm,
+        )
+        for estimate, file_request in zip(estimates, request.files)
+    ]
+
+
+def load_files_and_push_to_database_and_update_status(
+    request: BatchFileInjestionRequestDto,
+    token: str,
+    estimates: list[JobEstimate],
+    futures: list[Future] | None = None,
+) -> RequestStatus:
+    """
+    Ingest every file of a batch and report an aggregate status.
+
+    Files the route already queued on the job scheduler are passed as
+    ``futures`` and only awaited here. Otherwise they run on a batch worker
+    pool, shortest estimated job first, sharing the transcription client and
+    the summarization model across files. Each file reports its own status,
+    followed by an aggregate status for the batch request.
+    """
+    logger.info(f"Starting batch ingestion of {len(request.files)} files for request_id: {request.request_id}")
+
+    if futures is not None:
+        file_statuses = [(file_request, future.result()) for file_request, future in zip(request.files, futures)]
+    else:
+        client = get_transcription_client()
+        llm = get_chat_model(model_key="SUMMARIZE_LLM_MODEL")
+        scheduled = sorted(zip(estimates, request.files), key=lambda item: item[0]["estimated_seconds"])
+        logger.info(
+            f"Scheduled batch files by estimated work: "
+            f"{[(f.file_name, round(estimate['estimated_seconds'])) for estimate, f in scheduled]}"
+        )
+        with ThreadPoolExecutor(max_workers=config_settings.BATCH_MAX_WORKERS) as executor:
+            file_futures = [
+                (
+                    file_request,
+                    executor.submit(
+                        load_file_and_push_to_database_and_update_status, file_request, token, client=client, llm=llm
+                    ),
+                )
+                for _, file_request in scheduled
+            ]
+            file_statuses = [(file_request, future.result()) for file_request, future in file_futures]
+
+    failed = [
+        file_request for file_request, file_status in file_statuses
+        if file_status.status == RequestStatusEnum.FAILED
+    ]
+    status = RequestStatus(
+        request_id=request.request_id,
+        api_name=ApiNameEnum.INJEST_DOC_BATCH,
+        status=RequestStatusEnum.FAILED if len(failed) == len(file_statuses) else RequestStatusEnum.COMPLETED,
+        data_json={
+            "total": len(file_statuses),
+            "completed": len(file_statuses) - len(failed),
+            "failed": len(failed),
+            "files": [
+                {
+                    "request_id": file_request.request_id,
+                    "file_name": file_request.file_name,
+                    "status": file_status.status,
+                }
+                for file_request, file_status in file_statuses
+            ],
+        },
+        error_detail=", ".join(f"{file_request.file_name} failed" for file_request in failed) or None,
+    )
+
+    logger.info(
+        f"Completed batch injest-doc for request_id: {request.request_id}"
+        f" with {status.data_json['completed']}/{status.data_json['total']} files completed"
+    )
+    call_update_status_api(request.response_data_api_path, status, token)
     return status
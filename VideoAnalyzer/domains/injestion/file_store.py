@@ -0,0 +1,96 @@
+import hashlib
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any
+
+from VideoAnalyzer.client_registry import client_registry
+from VideoAnalyzer.domains.s3_utils.artifact_store import ArtifactStore, get_artifact_store
+
+
+class MirroredFileStore(ABC):
+    """
+    Base of the per-file stores of ingested recordings.
+
+    One entry per file_name is written to ``<directory>/<sha1>.<extension>``
+    and, when an artifact store is given, mirrored to ``REMOTE_PREFIX/`` in
+    the bucket, from where it is restored on a worker that lacks the local
+    copy. The most recently used entries are kept in memory. Subclasses set
+    ``REMOTE_PREFIX`` and ``EXTENSION`` and implement ``_write`` and ``_read``.
+    """
+
+    REMOTE_PREFIX = ""
+    EXTENSION = ""
+
+    def __init__(self, directory: str, max_cached: int, artifact_store: ArtifactStore | None = None) -> None:
+        self.directory = directory
+        self.max_cached = max_cached
+        self.artifact_store = artifact_store
+        self._cache: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    @classmethod
+    def shared(cls, mirror: bool) -> "MirroredFileStore":
+        """The process-wide store, mirrored to the artifact store when ``mirror`` is set."""
+        artifact_store = get_artifact_store() if mirror else None
+        return client_registry.get((cls.REMOTE_PREFIX,), lambda: cls(artifact_store=artifact_store))
+
+    @staticmethod
+    def _file_key(file_name: str) -> str:
+        return hashlib.sha1(file_name.encode("utf-8")).hexdigest()
+
+    def _path(self, file_name: str) -> str:
+        return os.path.join(self.directory, f"{self._file_key(file_name)}{self.EXTENSION}")
+
+    def _remote_key(self, file_name: str) -> str:
+        return self.artifact_store.key(self.REMOTE_PREFIX, f"{self._file_key(file_name)}{self.EXTENSION}")
+
+    @abstractmethod
+    def _write(self, path: str, value: Any) -> None:
+        """Write an entry to the file at ``path``."""
+
+    @abstractmethod
+    def _read(self, path: str) -> Any:
+        """Read an entry written by ``_write``."""
+
+    def _remember(self, file_name: str, value: Any) -> None:
+        with self._lock:
+            self._cache[file_name] = value
+            self._cache.move_to_end(file_name)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+
+    def write(self, file_name: str, value: Any) -> None:
+        path = self._path(file_name)
+        temp_path = f"{path}.tmp{self.EXTENSION}"
+        self._write(temp_path, value)
+        os.replace(temp_path, path)
+        if self.artifact_store is not None:
+            self.artifact_store.put_file(path, self._remote_key(file_name))
+        self._remember(file_name, value)
+
+    def read(self, file_name: str) -> Any:
+        with self._lock:
+            if (value := self._cache.get(file_name)) is not None:
+                self._cache.move_to_end(file_name)
+                return value
+
+        path = self._path(file_name)
+        if not os.path.isfile(path):
+            if self.artifact_store is None or not self.artifact_store.exists(self._remote_key(file_name)):
+                return None
+            self.artifact_store.download_file(self._remote_key(file_name), path)
+
+        value = self._read(path)
+        self._remember(file_name, value)
+        return value
+
+    def remove(self, file_name: str) -> None:
+        with self._lock:
+            self._cache.pop(file_name, None)
+        if os.path.isfile(path := self._path(file_name)):
+            os.remove(path)
+        if self.artifact_store is not None:
+            self.artifact_store.delete_prefix(self._remote_key(file_name))
@@ -0,0 +1,179 @@
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Queue
+from subprocess import Popen, PIPE
+from typing import Iterator, List, Tuple
+
+import numpy as np
+import pytesseract
+from PIL import Image
+from langchain_core.documents import Document
+from loguru import logger
+
+from VideoAnalyzer.cpu_executor import cpu_executor
+from VideoAnalyzer.domains.injestion.transcript import format_timestamp
+from VideoAnalyzer.settings import config_settings
+
+PTS_TIME_PATTERN = re.compile(r"pts_time:\s*([0-9.]+)")
+
+
+def _read_frame_timestamps(stderr, timestamps: Queue) -> None:
+    """Collect the pts_time of every frame reported by the showinfo filter"""
+    for line in iter(stderr.readline, b""):
+        if b"showinfo" in line and (match := PTS_TIME_PATTERN.search(line.decode(errors="ignore"))):
+            timestamps.put(float(match.group(1)))
+    timestamps.put(None)
+
+
+def extract_scene_keyframes(
+    input_video,
+    logger,
+    scene_threshold: float = 0.3,
+    width: int = 1280,
+    height: int = 720,
+) -> Iterator[Tuple[float, np.ndarray]]:
+    """
+    Stream the frames where the scene changes from a single FFmpeg pass.
+
+    FFmpeg's scene score selects the first frame and every frame that differs
+    from its predecessor by more than ``scene_threshold``; frames are scaled and
+    padded to a fixed grayscale size and read from stdout, while their
+    timestamps are parsed from the showinfo filter on stderr.
+
+    Yields:
+        (timestamp in seconds, grayscale frame of shape (height, width))
+    """
+    command = [
+        "ffmpeg",
+        "-nostdin",
+        "-i",
+        input_video,
+        "-an",
+        "-vf",
+        f"select='eq(n\\,0)+gt(scene\\,{scene_threshold})',showinfo,"
+        f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+        f"pad={width}:{height}",
+        "-vsync",
+        "vfr",
+        "-f",
+        "rawvideo",
+        "-pix_fmt",
+        "gray",
+        "-",
+    ]
+    frame_size = width * height
+    timestamps: Queue = Queue()
+    process = Popen(command, stdout=PIPE, stderr=PIPE)
+    reader = threading.Thread(target=_read_frame_timestamps, args=(process.stderr, timestamps), daemon=True)
+    reader.start()
+
+    try:
+        while True:
+            frame = process.stdout.read(frame_size)
+            if len(frame) < frame_size:
+                break
+            timestamp = timestamps.get()
+            if timestamp is None:
+                break
+            yield timestamp, np.frombuffer(frame, dtype=np.uint8).reshape(height, width)
+    finally:
+        process.stdout.close()
+        process.wait()
+        reader.join(timeout=5)
+
+    if process.returncode not in (0, None):
+        logger.warning(f"FFmpeg scene detection exited with code {process.returncode}")
+
+
+def perceptual_hash(frame: np.ndarray, hash_size: int = 8) -> int:
+    """Difference hash: compare adjacent cells of a (hash_size x hash_size + 1) block-mean thumbnail"""
+    rows = np.linspace(0, frame.shape[0], hash_size + 1).astype(int)[:-1]
+    cols = np.linspace(0, frame.shape[1], hash_size + 2).astype(int)[:-1]
+    thumbnail = np.add.reduceat(np.add.reduceat(frame.astype(np.float32), rows, axis=0), cols, axis=1)
+    bits = (thumbnail[:, 1:] > thumbnail[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def _ocr_frame(frame: bytes, width: int, height: int) -> str:
+    image = Image.frombytes("L", (width, height), frame)
+    return pytesseract.image_to_string(image)
+
+
+def extract_slide_documents(
+    input_video,
+    logger,
+    duration: float | None = None,
+    scene_threshold: float = 0.3,
+    hash_distance: int = 6,
+    width: int = 1280,
+    height: int = 720,
+) -> List[Document]:
+    """
+    OCR the scene-change keyframes of a video into timestamped Documents.
+
+    Keyframes whose perceptual hash is within ``hash_distance`` bits of an
+    already OCR'd frame are dropped, so revisited or slowly animated slides
+    are only read once. OCR runs on the shared CPU stage executor under the
+    ``ocr`` stage limit while FFmpeg keeps decoding.
+    """
+    try:
+        logger.info(f"Extracting slide keyframes from: {input_video}")
+        start_time = time.time()
+        seen_hashes: List[int] = []
+        in_flight: deque[Tuple[float, Future]] = deque()
+        ocr_results: List[Tuple[float, str]] = []
+        skipped = 0
+        max_in_flight = max(1, config_settings.CPU_STAGE_LIMITS.get("ocr", 1))
+
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            for timestamp, frame in extract_scene_keyframes(
+                input_video, logger, scene_threshold=scene_threshold, width=width, height=height
+            ):
+                frame_hash = perceptual_hash(frame)
+                if any((frame_hash ^ seen).bit_count() <= hash_distance for seen in seen_hashes):
+                    skipped += 1
+                    continue
+                seen_hashes.append(frame_hash)
+                in_flight.append(
+                    (timestamp, executor.submit(cpu_executor.run, "ocr", _ocr_frame, frame.tobytes(), width, height))
+                )
+
+                # Bound the number of frames held in memory while OCR catches up
+                if len(in_flight) >= max_in_flight * 4:
+                    timestamp, future = in_flight.popleft()
+                    ocr_results.append((timestamp, future.result()))
+
+            ocr_results.extend((timestamp, future.result()) for timestamp, future in in_flight)
+
+        documents = []
+        for index, (timestamp, text) in enumerate(ocr_results):
+            text = text.strip()
+            if len(text) < 3:
+                continue
+            if index + 1 < len(ocr_results):
+                end = ocr_results[index + 1][0]
+            else:
+                end = max(timestamp, duration or timestamp)
+            documents.append(
+                Document(
+                    page_content=text,
+                    metadata={
+                        "start_time": format_timestamp(timestamp),
+                        "end_time": format_timestamp(end),
+                        "source": "slide_ocr",
+                    },
+                )
+            )
+
+        logger.info(
+            f"Slide OCR completed in {time.time() - start_time:.2f} seconds: "
+            f"{len(ocr_results)} keyframes read, {skipped} near-duplicates skipped, "
+            f"{len(documents)} documents created"
+        )
+        return documents
+    except Exception as e:
+        logger.error(f"An error occurred during slide extraction: {str(e)}")
+        raise
@@ -0,0 +1,405 @@
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Iterator
+
+from loguru import logger
+
+from VideoAnalyzer.domains.injestion.doc_loaders import MediaProcessor
+from VideoAnalyzer.domains.injestion.segment_index import get_segment_index
+from VideoAnalyzer.domains.injestion.transcript import TranscriptSegments
+from VideoAnalyzer.domains.injestion.utils import is_valid_url, transcribe_audio
+from VideoAnalyzer.models import LiveStreamInjestionRequestDto
+from VideoAnalyzer.settings import config_settings
+from VideoAnalyzer.update_api_status.models import RequestStatus, RequestStatusEnum, ApiNameEnum
+from VideoAnalyzer.update_api_status.utils import call_update_status_api
+from VideoAnalyzer.utils import get_transcription_client
+from VideoAnalyzer.vector_db.backends import get_vector_store
+from VideoAnalyzer.vector_db.incremental import compute_chunk_ids
+from VideoAnalyzer.vector_db.utils import split_transcript
+
+SENTENCE_END = re.compile(r"[.!?…][\"')\]]*\s*$")
+
+
+def start_segmenter(stream_url: str, output_dir: str, window_seconds: int) -> subprocess.Popen:
+    """
+    Start ffmpeg cutting the audio of a live source into rolling windows.
+
+    The source can be an HLS playlist, an RTMP URL or a local file that is
+    still being written. Windows are written as 16k mono Opus files and
+    appended to ``windows.csv`` (file name, start and end in stream seconds)
+    as soon as each one is closed.
+    """
+    command = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-threads", str(config_settings.FFMPEG_THREADS)]
+    idle_timeout_us = str(int(config_settings.LIVE_IDLE_TIMEOUT_SECONDS * 1_000_000))
+    if os.path.isfile(stream_url) and not stream_url.endswith(".m3u8"):
+        # Keep reading at the end of a growing file until it stops growing
+        command += ["-follow", "1", "-rw_timeout", idle_timeout_us]
+        stream_url = f"file:{stream_url}"
+    elif stream_url.startswith(("http://", "https://")):
+        command += ["-rw_timeout", idle_timeout_us]
+    command += [
+        "-i", stream_url,
+        "-vn",
+        "-ac", "1",
+        "-ar", "16000",
+        "-c:a", "libopus",
+        "-b:a", f"{config_settings.LIVE_BITRATE_KBPS}k",
+        "-application", "voip",
+        "-f", "segment",
+        "-segment_time", str(window_seconds),
+        "-segment_format", "ogg",
+        "-segment_list", os.path.join(output_dir, "windows.csv"),
+        "-segment_list_type", "csv",
+        "-reset_timestamps", "1",
+        os.path.join(output_dir, "window_%06d.ogg"),
+    ]
+    logger.info(f"Starting live segmenter: {' '.join(command)}")
+    return subprocess.Popen(command, stdin=subprocess.DEVNULL)
+
+
+def join_boundary(left: str, right: str, max_overlap_words: int = 3) -> str:
+    """Join text cut at a window boundary, dropping words repeated on both sides of the cut."""
+    left_words, right_words = left.split(), right.split()
+    for overlap in range(min(max_overlap_words, len(left_words), len(right_words)), 0, -1):
+        if [w.lower().strip(".,") for w in left_words[-overlap:]] == [w.lower().strip(".,") for w in right_words[:overlap]]:
+            right_words = right_words[overlap:]
+            break
+    return " ".join(left_words + right_words)
+
+
+class LiveStreamIngestor:
+    """
+    Rolling transcription and indexing of a live stream.
+
+    ffmpeg cuts the stream into windows of ``LIVE_WINDOW_SECONDS``; at most
+    ``LIVE_TRANSCRIBE_CONCURRENCY`` windows are transcribed at once while
+    later windows wait on disk. Windows are indexed in stream order: the last
+    segment of every window is held back and, when it does not end a
+    sentence, joined with the first segment of the next window so words cut
+    at the boundary are not split across chunks. Each window's segments are
+    chunked and upserted into the namespace as soon as they are stitched.
+
+    Lag is the time from ffmpeg closing a window to its chunks being
+    searchable, and is reported by ``metrics`` together with the backlog.
+    """
+
+    def __init__(
+        self,
+        request: LiveStreamInjestionRequestDto,
+        client: Any = None,
+        window_seconds: int | None = None,
+        max_concurrency: int | None = None,
+    ) -> None:
+        if not is_valid_url(request.stream_url) and not os.path.isfile(request.stream_url):
+            raise ValueError(f"Stream url is invalid: {request.stream_url}")
+
+        self.request = request
+        self.client = client or get_transcription_client()
+        self.window_seconds = window_seconds or request.window_seconds or config_settings.LIVE_WINDOW_SECONDS
+        self.max_concurrency = max_concurrency or config_settings.LIVE_TRANSCRIBE_CONCURRENCY
+        self.directory = os.path.join(MediaProcessor.TEMP_DIR, f"live_{request.request_id}")
+        self.segments = TranscriptSegments()
+        self.additional_metadata = {
+            "original_file_name": request.original_file_name,
+            "file_name": request.file_name,
+            "file_type": "live",
+            "process_type": "audio",
+            "tags": request.params.get("tags") or [],
+            "synonyms": request.params.get("synonyms") or [],
+            "title": request.original_file_name,
+        }
+        for metadata in request.metadata:
+            self.additional_metadata.update(metadata)
+
+        self._tail: SimpleNamespace | None = None
+        self._process: subprocess.Popen | None = None
+        self._stop = threading.Event()
+        self._windows_since_save = 0
+        self._saved_segments = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "state": "starting",
+            "windows_received": 0,
+            "windows_indexed": 0,
+            "windows_failed": 0,
+            "segments_indexed": 0,
+            "chunks_indexed": 0,
+            "indexed_until_seconds": 0.0,
+            "last_lag_seconds": None,
+            "max_lag_seconds": None,
+            "total_lag_seconds": 0.0,
+        }
+
+    def _update(self, **stats: Any) -> None:
+        with self._lock:
+            self._stats.update(stats)
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        total_lag, indexed = stats.pop("total_lag_seconds"), stats["windows_indexed"]
+        stats["backlog_windows"] = stats["windows_received"] - indexed - stats["windows_failed"]
+        stats["avg_lag_seconds"] = total_lag / indexed if indexed else None
+        return {"request_id": self.request.request_id, "window_seconds": self.window_seconds} | stats
+
+    def stop(self) -> None:
+        """Stop reading the stream; windows already cut are still indexed."""
+        self._stop.set()
+        if self._process is not None and self._process.poll() is None:
+            # ffmpeg closes the current window and the window list on SIGTERM
+            self._process.terminate()
+
+    def _iter_windows(self) -> Iterator[SimpleNamespace | None]:
+        """Yield windows as ffmpeg closes them, and None on idle polls."""
+        list_path = os.path.join(self.directory, "windows.csv")
+        position = 0
+        pending = ""
+        while True:
+            exited = self._process.poll() is not None
+            if os.path.isfile(list_path):
+                with open(list_path) as f:
+                    f.seek(position)
+                    pending += f.read()
+                    position = f.tell()
+            *lines, pending = pending.split("\n")
+            for line in filter(None, lines):
+                name, start, end = line.rsplit(",", 2)
+                yield SimpleNamespace(
+                    path=os.path.join(self.directory, name.strip('"')),
+                    start=float(start),
+                    end=float(end),
+                    closed_at=time.time(),
+                )
+            if exited:
+                return
+            yield None
+            time.sleep(config_settings.LIVE_POLL_INTERVAL_SECONDS)
+
+    def _transcribe_window(self, window: SimpleNamespace) -> list[SimpleNamespace]:
+        try:
+            transcript = transcribe_audio(window.path, self.client, logger)
+            return [
+                SimpleNamespace(start=window.start + segment.start, end=window.start + segment.end, text=segment.text)
+                for segment in transcript.segments or []
+            ]
+        finally:
+            os.remove(window.path)
+
+    def _stitch(self, segments: list[SimpleNamespace]) -> list[SimpleNamespace]:
+        """Prepend the held back segment of the previous window and hold back this window's last one."""
+        if self._tail is not None:
+            tail = self._tail
+            if (
+                segments
+                and not SENTENCE_END.search(tail.text)
+                and segments[0].start - tail.end <= config_settings.LIVE_STITCH_GAP_SECONDS
+            ):
+                first = segments[0]
+                segments[0] = SimpleNamespace(start=tail.start, end=first.end, text=f" {join_boundary(tail.text, first.text)}")
+            else:
+                segments.insert(0, tail)
+        self._tail = segments.pop() if segments else None
+        return segments
+
+    def _index_segments(self, segments: list[SimpleNamespace]) -> int:
+        first = len(self.segments)
+        for segment in segments:
+            self.segments.append(segment.start, segment.end, segment.text)
+        if not segments:
+            return 0
+
+        chunks = split_transcript(
+            segments=self.segments.iter_documents(first),
+            MAX_TOKENS=config_settings.TRANSCRIPT_CHUNK_TOKENS,
+            OVERLAP_SEGMENTS=0,
+        )
+        for chunk in chunks:
+            chunk.metadata |= self.additional_metadata
+        get_vector_store().add_documents(
+            chunks, self.request.namespace, ids=compute_chunk_ids(chunks, self.request.file_name)
+        )
+        return len(chunks)
+
+    def _save_segment_index(self, force: bool = False) -> None:
+        """
+        Persist the segments every LIVE_SEGMENT_INDEX_EVERY_WINDOWS windows and
+        when the stream is drained, instead of rewriting (and re-uploading) the
+        growing index after every window.
+        """
+        if len(self.segments) == self._saved_segments:
+            return
+        if not force and self._windows_since_save < config_settings.LIVE_SEGMENT_INDEX_EVERY_WINDOWS:
+            return
+        if (segment_index := get_segment_index()) is not None:
+            segment_index.save(self.request.file_name, self.segments)
+        self._saved_segments = len(self.segments)
+        self._windows_since_save = 0
+
+    def _index_window(self, window: SimpleNamespace, future: Future) -> None:
+        try:
+            segments = future.result()
+        except Exception as e:
+            logger.error(f"Failed to transcribe live window {window.start:.1f}-{window.end:.1f}s: {e}")
+            with self._lock:
+                self._stats["windows_failed"] += 1
+            return
+
+        chunks = self._index_segments(self._stitch(segments))
+        self._windows_since_save += 1
+        self._save_segment_index()
+        lag = time.time() - window.closed_at
+        with self._lock:
+            self._stats["windows_indexed"] += 1
+            self._stats["segments_indexed"] = len(self.segments)
+            self._stats["chunks_indexed"] += chunks
+            self._stats["indexed_until_seconds"] = self.segments.duration
+            self._stats["last_lag_seconds"] = lag
+            self._stats["max_lag_seconds"] = max(lag, self._stats["max_lag_seconds"] or 0.0)
+            self._stats["total_lag_seconds"] += lag
+        logger.info(f"Indexed live window {window.start:.1f}-{window.end:.1f}s with {chunks} chunks, lag {lag:.2f}s")
+
+    def run(self) -> dict[str, Any]:
+        """Ingest until the stream ends or ``stop`` is called, returning the final metrics."""
+        os.makedirs(self.directory, exist_ok=True)
+        self._process = start_segmenter(self.request.stream_url, self.directory, self.window_seconds)
+        if self._stop.is_set():
+            self._process.terminate()
+        self._update(state="streaming")
+
+        try:
+            in_flight: deque[tuple[SimpleNamespace, Future]] = deque()
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                for window in self._iter_windows():
+                    if window is not None:
+                        with self._lock:
+                            self._stats["windows_received"] += 1
+                        # Backpressure: later windows wait on disk until a transcription slot frees up
+                        while len(in_flight) >= self.max_concurrency:
+                            self._index_window(*in_flight.popleft())
+                        in_flight.append((window, executor.submit(self._transcribe_window, window)))
+                    while in_flight and in_flight[0][1].done():
+                        self._index_window(*in_flight.popleft())
+
+                self._update(state="draining")
+                while in_flight:
+                    self._index_window(*in_flight.popleft())
+
+            if self._tail is not None:
+                tail, self._tail = self._tail, None
+                chunks = self._index_segments([tail])
+                with self._lock:
+                    self._stats["segments_indexed"] = len(self.segments)
+                    self._stats["chunks_indexed"] += chunks
+                    self._stats["indexed_until_seconds"] = self.segments.duration
+            self._save_segment_index(force=True)
+
+            if self._process.wait() not in (0, 255) and not self._stop.is_set():
+                raise RuntimeError(f"ffmpeg exited with code {self._process.returncode}")
+            self._update(state="completed")
+            return self.metrics()
+        except Exception:
+            self._update(state="failed")
+            raise
+        finally:
+            if self._process.poll() is None:
+                self._process.kill()
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+# Ingestions running in this process: with several API workers, the metrics and
+# stop routes only find a stream on the worker that accepted it
+_live_streams: dict[int, LiveStreamIngestor] = {}
+_live_streams_lock = threading.Lock()
+
+
+def get_live_stream(request_id: int) -> LiveStreamIngestor | None:
+    return _live_streams.get(request_id)
+
+
+def ingest_live_stream_and_update_status(request: LiveStreamInjestionRequestDto, token: str) -> RequestStatus:
+    logger.info(f"Starting live stream ingestion for {request.file_name} from {request.stream_url}")
+
+    try:
+        ingestor = LiveStreamIngestor(request)
+        with _live_streams_lock:
+            if request.request_id in _live_streams:
+                raise ValueError(f"Live stream {request.request_id} is already being ingested")
+            _live_streams[request.request_id] = ingestor
+        try:
+            metrics = ingestor.run()
+        finally:
+            with _live_streams_lock:
+                _live_streams.pop(request.request_id, None)
+
+    except Exception as e:
+        logger.exception("Failed")
+        status = RequestStatus(
+            request_id=request.request_id,
+            api_name=ApiNameEnum.INJEST_LIVE_STREAM,
+            status=RequestStatusEnum.FAILED,
+            error_detail=f"Failed live stream ingestion: {e}",
+        )
+
+    else:
+        status = RequestStatus(
+            request_id=request.request_id,
+            api_name=ApiNameEnum.INJEST_LIVE_STREAM,
+            status=RequestStatusEnum.COMPLETED,
+            data_json=metrics,
+        )
+
+    logger.info(f"Completed live stream ingestion for file_name: {request.file_name} with status: {status.status}")
+    call_update_status_api(request.response_data_api_path, status, token)
+    return status
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Ingest a local media file re-streamed as live HLS by ffmpeg")
+    parser.add_argument("source", help="Local audio/video file to stream")
+    parser.add_argument("--namespace", default="live-test")
+    parser.add_argument("--window-seconds", type=int, default=30)
+    parser.add_argument("--segment-seconds", type=int, default=4)
+    args = parser.parse_args()
+
+    hls_dir = tempfile.mkdtemp(prefix="live_hls_")
+    playlist = os.path.join(hls_dir, "stream.m3u8")
+    # -re paces the source at real time, so the playlist grows like a live event
+    publisher = subprocess.Popen(
+        [
+            "ffmpeg", "-hide_banner", "-loglevel", "error", "-re", "-i", args.source,
+            "-vn", "-c:a", "aac", "-f", "hls",
+            "-hls_time", str(args.segment_seconds), "-hls_list_size", "0", playlist,
+        ]
+    )
+    while not os.path.isfile(playlist):
+        time.sleep(0.5)
+
+    ingestor = LiveStreamIngestor(
+        LiveStreamInjestionRequestDto(
+            request_id=0,
+            response_data_api_path="",
+            stream_url=playlist,
+            file_name=os.path.basename(args.source),
+            original_file_name=os.path.basename(args.source),
+            namespace=args.namespace,
+        ),
+        window_seconds=args.window_seconds,
+    )
+    runner = threading.Thread(target=ingestor.run)
+    runner.start()
+    while runner.is_alive():
+        runner.join(10)
+        print(ingestor.metrics())
+    publisher.wait()
+    shutil.rmtree(hls_dir, ignore_errors=True)
+    print(ingestor.metrics())
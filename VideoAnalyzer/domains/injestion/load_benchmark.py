@@ -0,0 +1,125 @@
+"""
+Concurrent request capacity of the sync and async ingestion request paths.
+
+In process (default), the response building of ``/injestion`` runs the way
+FastAPI serves a sync route, on the anyio threadpool (40 threads per worker),
+and that of ``/injestion/async`` on the event loop, without starting the
+background ingestion. With ``--base-url`` the same requests are sent to a
+running server instead, which also ingests every request.
+
+    python -m VideoAnalyzer.domains.injestion.load_benchmark --url "<pre-signed video url>" --requests 200
+    python -m VideoAnalyzer.domains.injestion.load_benchmark --url "<url>" --base-url http://localhost:8000 --token "<token>"
+"""
+import argparse
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable
+
+import anyio.to_thread
+import httpx
+import numpy as np
+
+from VideoAnalyzer.domains.injestion.routes import build_injestion_response, build_injestion_response_async
+from VideoAnalyzer.models import FileInjestionRequestDto
+
+
+def make_request(index: int, url: str, process_type: str, file_type: str) -> FileInjestionRequestDto:
+    return FileInjestionRequestDto(
+        request_id=index,
+        response_data_api_path="",
+        pre_signed_url=url,
+        file_name=f"load_test/{index}.{file_type}",
+        namespace="load-test",
+        original_file_name=f"load_test_{index}.{file_type}",
+        process_type=process_type,
+        file_type=file_type,
+    )
+
+
+async def run_load(
+    call: Callable[[FileInjestionRequestDto], Awaitable[Any]],
+    requests: list[FileInjestionRequestDto],
+    concurrency: int,
+) -> dict[str, Any]:
+    """Send the requests with at most ``concurrency`` in flight and time each one."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+    peak_threads = threading.active_count()
+
+    async def send(request: FileInjestionRequestDto) -> None:
+        nonlocal errors, peak_threads
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await call(request)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+            peak_threads = max(peak_threads, threading.active_count())
+
+    started = time.perf_counter()
+    await asyncio.gather(*(send(request) for request in requests))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": len(requests),
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": len(requests) / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "peak_threads": peak_threads,
+    }
+
+
+def in_process_calls() -> dict[str, Callable[[FileInjestionRequestDto], Awaitable[Any]]]:
+    return {
+        "sync": lambda request: anyio.to_thread.run_sync(build_injestion_response, request),
+        "async": build_injestion_response_async,
+    }
+
+
+def http_calls(base_url: str, token: str) -> dict[str, Callable[[FileInjestionRequestDto], Awaitable[Any]]]:
+    client = httpx.AsyncClient(base_url=base_url, timeout=600, limits=httpx.Limits(max_connections=None))
+
+    async def post(path: str, request: FileInjestionRequestDto) -> None:
+        response = await client.post(path, json=request.model_dump(), headers={"authorization": token})
+        response.raise_for_status()
+
+    return {
+        "sync": lambda request: post("/injestion", request),
+        "async": lambda request: post("/injestion/async", request),
+    }
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    calls = http_calls(args.base_url, args.token) if args.base_url else in_process_calls()
+    for concurrency in [int(level) for level in args.concurrency.split(",")]:
+        for name, call in calls.items():
+            requests = [
+                make_request(index, args.url, args.process_type, args.file_type) for index in range(args.requests)
+            ]
+            result = await run_load(call, requests, concurrency)
+            print(
+                f"{name:>5} c={concurrency:<4} {result['throughput_rps']:8.1f} req/s"
+                f"  p50 {result['p50_ms']:8.1f}ms  p95 {result['p95_ms']:8.1f}ms  p99 {result['p99_ms']:8.1f}ms"
+                f"  errors {result['errors']}  peak threads {result['peak_threads']}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", required=True, help="Pre-signed URL or local path of the media to submit")
+    parser.add_argument("--process-type", default="video")
+    parser.add_argument("--file-type", default="mp4")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", default="10,50,200", help="Comma separated in-flight request levels")
+    parser.add_argument("--base-url", default=None, help="Load test a running server instead of in process")
+    parser.add_argument("--token", default="", help="Authorization header sent to the server")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
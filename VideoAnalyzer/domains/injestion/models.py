@@ -7,3 +7,16 @@ class FileMetadata(TypedDict):
     original_file_name: str | None
     total_pages: int | None
     thumbnail_object_path: str | None
+
+
+class AudioProfile(TypedDict):
+    transcode: bool
+    bitrate_kbps: int
+    sample_rate: int
+    chunk_length_ms: int
+
+
+class JobEstimate(TypedDict):
+    duration_seconds: float | None
+    size_bytes: int
+    estimated_seconds: float
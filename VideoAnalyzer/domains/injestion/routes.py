@@ -1,18 +1,153 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Header
-from VideoAnalyzer.domains.injestion.utils import extract_metadata_from_video
+from fastapi.responses import StreamingResponse
+from VideoAnalyzer.domains.injestion.utils import (
+    extract_metadata_from_video,
+    extract_metadata_from_video_async,
+    probe_job,
+    probe_job_async,
+)
+from VideoAnalyzer.domains.injestion.models import JobEstimate
+from VideoAnalyzer.domains.injestion.segment_index import get_segment_index
+from VideoAnalyzer.domains.injestion.live_stream import get_live_stream, ingest_live_stream_and_update_status
+from VideoAnalyzer.domains.injestion.transcript import parse_timestamp
+from VideoAnalyzer.domains.injestion.summary import get_summary_cache, load_summary_documents, stream_summary_events
+from VideoAnalyzer.domains.injestion.transcript_artifacts import TRANSCRIPT_FORMATS, TranscriptArtifactReader
+from VideoAnalyzer.domains.injestion.file_loader import (
+    load_file_and_push_to_database_and_update_status,
+    load_files_and_push_to_database_and_update_status,
+    probe_files,
+    schedule_files,
+)
+from VideoAnalyzer.domains.s3_utils.utils import get_s3_client
 from VideoAnalyzer.models import (
     FileInjestionRequestDto,
     FileInjestionResponseDto,
-
+    BatchFileInjestionRequestDto,
+    BatchFileInjestionResponseDto,
+    LiveStreamInjestionRequestDto,
 )
 from VideoAnalyzer.settings import config_settings
+from VideoAnalyzer.cpu_executor import cpu_executor
+from VideoAnalyzer.job_scheduler import get_job_scheduler
+from VideoAnalyzer.rate_limiter import get_rate_limiter
 from loguru import logger
-from typing import Tuple, Any, Callable
+from typing import Tuple, Any, Callable, Literal
 
 
 router = APIRouter(tags=["injestion"])
 
 
+def build_injestion_response(
+        request: FileInjestionRequestDto,
+        s3_client: Any = None,
+) -> FileInjestionResponseDto:
+    logger.info("Extracting the metadata")
+    if request.process_type == "video":
+        metadata_dict = extract_metadata_from_video(
+            pre_signed_url=request.pre_signed_url,
+            file_name=request.file_name,
+            original_file_name=request.original_file_name,
+            bucket_name=config_settings.BUCKET_NAME,
+            s3_client=s3_client,
+        )
+
+        return FileInjestionResponseDto(
+            title=metadata_dict["title"],
+            author=metadata_dict["author"],
+            file_name=metadata_dict["file_name"],
+            original_file_name=metadata_dict["original_file_name"],
+            total_pages=metadata_dict["total_pages"],
+            thumbnail_object_path=metadata_dict["thumbnail_object_path"],
+        )
+
+    return FileInjestionResponseDto(
+        title=request.original_file_name,
+        author="",
+        file_name=request.file_name,
+        original_file_name=request.original_file_name,
+        total_pages=None,
+        thumbnail_object_path="",
+    )
+
+
+async def build_injestion_response_async(request: FileInjestionRequestDto) -> FileInjestionResponseDto:
+    """Async counterpart of build_injestion_response, nothing in it blocks the event loop."""
+    if request.process_type != "video":
+        return build_injestion_response(request)
+
+    logger.info("Extracting the metadata")
+    metadata_dict = await extract_metadata_from_video_async(
+        pre_signed_url=request.pre_signed_url,
+        file_name=request.file_name,
+        original_file_name=request.original_file_name,
+        bucket_name=config_settings.BUCKET_NAME,
+    )
+    return FileInjestionResponseDto(
+        title=metadata_dict["title"],
+        author=metadata_dict["author"],
+        file_name=metadata_dict["file_name"],
+        original_file_name=metadata_dict["original_file_name"],
+        total_pages=metadata_dict["total_pages"],
+        thumbnail_object_path=metadata_dict["thumbnail_object_path"],
+    )
+
+
+def schedule_injestion(
+        request: FileInjestionRequestDto,
+        token: str,
+        response: FileInjestionResponseDto,
+        estimate: JobEstimate,
+        background_tasks: BackgroundTasks,
+) -> FileInjestionResponseDto:
+    """Queue the ingestion on the job scheduler by its estimated work, or run it as a background task."""
+    response.estimated_duration_seconds = estimate["duration_seconds"]
+    scheduler = get_job_scheduler()
+    if scheduler is None:
+        background_tasks.add_task(
+            load_file_and_push_to_database_and_update_status,
+            request,
+            token,
+        )
+        return response
+
+    _, response.eta_seconds = scheduler.submit(
+        request.request_id,
+        estimate["estimated_seconds"],
+        load_file_and_push_to_database_and_update_status,
+        request,
+        token,
+    )
+    return response
+
+
+def schedule_batch_injestion(
+        request: BatchFileInjestionRequestDto,
+        token: str,
+        response: BatchFileInjestionResponseDto,
+        estimates: list[JobEstimate],
+        background_tasks: BackgroundTasks,
+) -> BatchFileInjestionResponseDto:
+    """Queue every file of the batch on the job scheduler, and report the batch status once all are done."""
+    futures = None
+    if (scheduler := get_job_scheduler()) is not None:
+        scheduled = schedule_files(request, token, estimates, scheduler)
+        futures = [future for future, _ in scheduled]
+        for file_response, (_, eta) in zip(response.files, scheduled):
+            file_response.eta_seconds = eta
+
+    for file_response, estimate in zip(response.files, estimates):
+        file_response.estimated_duration_seconds = estimate["duration_seconds"]
+    background_tasks.add_task(
+        load_files_and_push_to_database_and_update_status,
+        request,
+        token,
+        estimates,
+        futures=futures,
+    )
+    return response
+
+
 @router.post(
     path="/injestion",
     summary="Injest the document into database",
@@ -26,39 +161,246 @@ def injest_doc(
     logger.info(f"Injesting the document into database")
 
     try:
-        logger.info("Extracting the metadata")
-        if request.process_type == "video":
-            metadata_dict = extract_metadata_from_video(
-                pre_signed_url=request.pre_signed_url,
-                file_name=request.file_name,
-                original_file_name=request.original_file_name,
-                bucket_name=config_settings.BUCKET_NAME,
-            )
+        response = build_injestion_response(request)
+        estimate = probe_job(request.pre_signed_url, request.process_type, logger)
+        return schedule_injestion(request, token, response, estimate, background_tasks)
 
-            response = FileInjestionResponseDto(
-                title=metadata_dict["title"],
-                author=metadata_dict["author"],
-                file_name=metadata_dict["file_name"],
-                original_file_name=metadata_dict["original_file_name"],
-                total_pages=metadata_dict["total_pages"],
-                thumbnail_object_path=metadata_dict["thumbnail_object_path"],
-            )
+    except ModuleNotFoundError:
+        raise HTTPException()
 
-        elif request.process_type == "audio":
-            response = FileInjestionResponseDto(
-                title=request.original_file_name,
-                author="",
-                file_name=request.file_name,
-                original_file_name=request.original_file_name,
-                total_pages=None,
-                thumbnail_object_path="",
-            )
 
-        background_tasks.add_task(
-            request,
+@router.post(
+    path="/injestion/batch",
+    summary="Injest a batch of documents into database",
+    description="Injest many documents in one request, sharing clients and the worker pool across files",
+)
+def injest_docs_batch(
+        request: BatchFileInjestionRequestDto,
+        background_tasks: BackgroundTasks,
+        token: str = Header(alias="authorization"),
+) -> BatchFileInjestionResponseDto:
+    logger.info(f"Injesting a batch of {len(request.files)} documents into database")
 
+    try:
+        s3_client = None
+        if any(file_request.process_type == "video" for file_request in request.files):
+            s3_client = get_s3_client(
+                config_settings.REGION_NAME,
+                config_settings.ENDPOINT_URL,
+                config_settings.AWS_ACCESS_KEY_ID,
+                config_settings.AWS_SECRET_ACCESS_KEY,
+            )
+
+        response = BatchFileInjestionResponseDto(
+            request_id=request.request_id,
+            files=[build_injestion_response(file_request, s3_client) for file_request in request.files],
         )
-        return response
+        estimates = probe_files(request.files)
+        return schedule_batch_injestion(request, token, response, estimates, background_tasks)
 
     except ModuleNotFoundError:
         raise HTTPException()
+
+
+@router.get(
+    path="/injestion/transcripts/{request_id}",
+    summary="Stream a stored transcript",
+    description="Stream a page of transcript rows as JSON lines, or the whole transcript as SRT or VTT",
+)
+def stream_transcript(
+        request_id: int,
+        format: Literal["jsonl", "srt", "vtt"] = "jsonl",
+        offset: int = 0,
+        limit: int | None = None,
+) -> StreamingResponse:
+    try:
+        reader = TranscriptArtifactReader(request_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    media_type = TRANSCRIPT_FORMATS[format][1]
+    total = reader.index["segments"]
+    if format != "jsonl":
+        return StreamingResponse(reader.iter_file(format), media_type=media_type)
+
+    offset = max(offset, 0)
+    limit = min(limit or config_settings.TRANSCRIPT_ARTIFACT_BLOCK_ROWS, config_settings.TRANSCRIPT_PAGE_MAX_ROWS)
+    headers = {"X-Total-Segments": str(total)}
+    if offset + limit < total:
+        headers["X-Next-Offset"] = str(offset + limit)
+    return StreamingResponse(reader.iter_rows(offset, limit), media_type=media_type, headers=headers)
+
+
+@router.get(
+    path="/injestion/summary/stream",
+    summary="Stream a file summary",
+    description="Stream summary tokens over server-sent events, serving already summarized files from the cache",
+)
+async def stream_summary(file_name: str, refresh: bool = False) -> StreamingResponse:
+    cached_summary = None if refresh else await asyncio.to_thread(get_summary_cache().get, file_name)
+    documents = None
+    if cached_summary is None:
+        documents = await asyncio.to_thread(load_summary_documents, file_name)
+        if not documents:
+            raise HTTPException(status_code=404, detail=f"No summary or transcript found for {file_name}")
+
+    return StreamingResponse(
+        stream_summary_events(file_name, documents, cached_summary),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post(
+    path="/injestion/live",
+    summary="Injest a live stream into database",
+    description="Transcribe an HLS/RTMP stream or a growing file in rolling windows and index it while it plays",
+)
+def injest_live_stream(
+        request: LiveStreamInjestionRequestDto,
+        background_tasks: BackgroundTasks,
+        token: str = Header(alias="authorization"),
+) -> dict[str, Any]:
+    logger.info(f"Injesting live stream {request.stream_url} into database")
+
+    if get_live_stream(request.request_id) is not None:
+        raise HTTPException(status_code=409, detail=f"Live stream {request.request_id} is already being ingested")
+
+    background_tasks.add_task(ingest_live_stream_and_update_status, request, token)
+    return {"request_id": request.request_id, "file_name": request.file_name, "status": "accepted"}
+
+
+@router.get(
+    path="/injestion/live/{request_id}/metrics",
+    summary="Live stream ingestion metrics",
+    description=(
+        "Windows transcribed and indexed, backlog and end-to-end lag of a live stream ingestion. "
+        "Live ingestions are tracked per API worker process, so with several workers this answers 404 "
+        "unless the request reaches the worker that accepted the stream (e.g. with sticky routing on request_id)"
+    ),
+)
+def live_stream_metrics(request_id: int) -> dict[str, Any]:
+    if (ingestor := get_live_stream(request_id)) is None:
+        raise HTTPException(status_code=404, detail=f"No live stream ingestion running for {request_id}")
+    return ingestor.metrics()
+
+
+@router.post(
+    path="/injestion/live/{request_id}/stop",
+    summary="Stop a live stream ingestion",
+    description=(
+        "Stop reading the stream; windows already received are indexed before the status is reported. "
+        "Like the metrics route, this only reaches a stream on the API worker process that accepted it"
+    ),
+)
+def stop_live_stream(request_id: int) -> dict[str, Any]:
+    if (ingestor := get_live_stream(request_id)) is None:
+        raise HTTPException(status_code=404, detail=f"No live stream ingestion running for {request_id}")
+    ingestor.stop()
+    return ingestor.metrics()
+
+
+@router.post(
+    path="/injestion/async",
+    summary="Injest the document into database (async)",
+    description="Async variant of /injestion that serves the request on the event loop instead of the threadpool",
+)
+async def injest_doc_async(
+        request: FileInjestionRequestDto,
+        background_tasks: BackgroundTasks,
+        token: str = Header(alias="authorization"),
+) -> FileInjestionResponseDto:
+    logger.info(f"Injesting the document into database")
+
+    response, estimate = await asyncio.gather(
+        build_injestion_response_async(request),
+        probe_job_async(request.pre_signed_url, request.process_type, logger),
+    )
+    return schedule_injestion(request, token, response, estimate, background_tasks)
+
+
+@router.post(
+    path="/injestion/batch/async",
+    summary="Injest a batch of documents into database (async)",
+    description="Async variant of /injestion/batch, probing durations, sizes and metadata of all files concurrently",
+)
+async def injest_docs_batch_async(
+        request: BatchFileInjestionRequestDto,
+        background_tasks: BackgroundTasks,
+        token: str = Header(alias="authorization"),
+) -> BatchFileInjestionResponseDto:
+    logger.info(f"Injesting a batch of {len(request.files)} documents into database")
+
+    files, estimates = await asyncio.gather(
+        asyncio.gather(*(build_injestion_response_async(file_request) for file_request in request.files)),
+        asyncio.gather(
+            *(
+                probe_job_async(file_request.pre_signed_url, file_request.process_type, logger)
+                for file_request in request.files
+            )
+        ),
+    )
+    response = BatchFileInjestionResponseDto(request_id=request.request_id, files=list(files))
+    return schedule_batch_injestion(request, token, response, list(estimates), background_tasks)
+
+
+@router.get(
+    path="/injestion/metrics/cpu-executor",
+    summary="CPU stage executor metrics",
+    description="Worker count, queue depth and per-stage concurrency of the CPU stage executor",
+)
+def cpu_executor_metrics() -> dict[str, Any]:
+    return cpu_executor.metrics()
+
+
+@router.get(
+    path="/injestion/metrics/job-scheduler",
+    summary="Job scheduler metrics",
+    description="Queued and running ingestion jobs, their estimated work and waiting time, and the ETA calibration",
+)
+def job_scheduler_metrics() -> dict[str, Any]:
+    scheduler = get_job_scheduler()
+    if scheduler is None:
+        raise HTTPException(status_code=404, detail="Job scheduler is disabled")
+    return scheduler.metrics()
+
+
+@router.get(
+    path="/injestion/metrics/rate-limits",
+    summary="Model API rate limit buckets",
+    description="Per-minute quotas and currently available requests and tokens of each model key on this host",
+)
+def rate_limit_metrics() -> dict[str, Any]:
+    return get_rate_limiter().metrics()
+
+
+@router.get(
+    path="/injestion/segments/context",
+    summary="Transcript segments around a timestamp",
+    description="Jump to a timestamp of an ingested recording and return the neighbouring transcript segments",
+)
+def segment_context(
+        file_name: str,
+        timestamp: str,
+        before: int | None = None,
+        after: int | None = None,
+) -> dict[str, Any]:
+    segment_index = get_segment_index()
+    if segment_index is None:
+        raise HTTPException(status_code=404, detail="Segment index is disabled")
+
+    try:
+        seconds = parse_timestamp(timestamp) if ":" in timestamp else float(timestamp)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Invalid timestamp: {timestamp}")
+
+    window = config_settings.SEGMENT_CONTEXT_WINDOW
+    context = segment_index.context(
+        file_name,
+        seconds,
+        before=window if before is None else max(before, 0),
+        after=window if after is None else max(after, 0),
+    )
+    if context is None:
+        raise HTTPException(status_code=404, detail=f"No transcript segments indexed for {file_name}")
+    return context
@@ -0,0 +1,125 @@
+from typing import Any
+
+import numpy as np
+from langchain_core.documents import Document
+from loguru import logger
+
+from VideoAnalyzer.domains.injestion.file_store import MirroredFileStore
+from VideoAnalyzer.domains.injestion.transcript import TranscriptSegments, parse_timestamp
+from VideoAnalyzer.domains.s3_utils.artifact_store import ArtifactStore
+from VideoAnalyzer.settings import config_settings
+
+
+class SegmentIndex(MirroredFileStore):
+    """
+    Per-file index of transcript segments keyed by (file_name, start_time).
+
+    Every ingested recording's segments are stored column-wise in
+    ``SEGMENT_INDEX_DIR/<file>.npz`` (start/end times, text offsets and one
+    UTF-8 text buffer) and, when an artifact store is given, mirrored to
+    ``segment_index/`` in the bucket. Looking up the segment at a timestamp is
+    a binary search over the sorted start times, so the neighbours of a
+    retrieved chunk are fetched in O(log n) without another vector search.
+    The most recently used files are kept in memory.
+    """
+
+    REMOTE_PREFIX = "segment_index"
+    EXTENSION = ".npz"
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        max_cached_files: int | None = None,
+        artifact_store: ArtifactStore | None = None,
+    ) -> None:
+        super().__init__(
+            directory or config_settings.SEGMENT_INDEX_DIR,
+            max_cached_files or config_settings.SEGMENT_INDEX_MAX_CACHED_FILES,
+            artifact_store,
+        )
+
+    def _write(self, path: str, segments: TranscriptSegments) -> None:
+        columns: dict[str, Any] = {
+            "starts": np.frombuffer(segments.starts, dtype=np.float64),
+            "ends": np.frombuffer(segments.ends, dtype=np.float64),
+            "offsets": np.frombuffer(segments.offsets, dtype=np.int64),
+            "text": np.frombuffer(segments.buffer.encode("utf-8"), dtype=np.uint8),
+        }
+        if segments.speaker_ids is not None:
+            columns["speaker_ids"] = np.frombuffer(segments.speaker_ids, dtype=np.int16)
+            columns["speaker_labels"] = np.array(segments.speaker_labels, dtype=np.str_)
+        np.savez(path, **columns)
+
+    def _read(self, path: str) -> TranscriptSegments:
+        with np.load(path, allow_pickle=False) as columns:
+            return TranscriptSegments.from_columns(
+                columns["starts"],
+                columns["ends"],
+                columns["offsets"],
+                columns["text"].tobytes().decode("utf-8"),
+                speaker_ids=columns["speaker_ids"] if "speaker_ids" in columns else None,
+                speaker_labels=columns["speaker_labels"].tolist() if "speaker_labels" in columns else (),
+            )
+
+    def save(self, file_name: str, segments: TranscriptSegments) -> None:
+        self.write(file_name, segments)
+        logger.info(f"Indexed {len(segments)} segments for file_name: {file_name}")
+
+    def load(self, file_name: str) -> TranscriptSegments | None:
+        return self.read(file_name)
+
+    def delete(self, file_name: str) -> None:
+        self.remove(file_name)
+
+    def context(self, file_name: str, seconds: float, before: int, after: int) -> dict[str, Any] | None:
+        """
+        The segment playing at ``seconds`` with up to ``before`` preceding and
+        ``after`` following segments, or None when the file is not indexed.
+        """
+        segments = self.load(file_name)
+        if segments is None or not len(segments):
+            return None
+
+        hit = segments.locate(seconds)
+        start, stop = max(hit - before, 0), min(hit + after + 1, len(segments))
+        return {
+            "file_name": file_name,
+            "hit_index": hit,
+            "total_segments": len(segments),
+            "segments": [
+                {"index": index} | row
+                for index, row in enumerate(segments.iter_transcript(start, stop), start=start)
+            ],
+        }
+
+    def expand(self, document: Document, before: int, after: int) -> Document:
+        """
+        Widen a retrieved transcript chunk by its neighbouring segments.
+
+        Documents without a file name or timestamps, or from files without an
+        index, are returned unchanged.
+        """
+        metadata = document.metadata
+        if not all(metadata.get(field) for field in ("file_name", "start_time", "end_time")):
+            return document
+        segments = self.load(metadata["file_name"])
+        if segments is None or not len(segments):
+            return document
+
+        first = segments.locate(parse_timestamp(metadata["start_time"]))
+        last = segments.locate(parse_timestamp(metadata["end_time"]))
+        start, stop = max(first - before, 0), min(last + after + 1, len(segments))
+        return Document(
+            page_content="".join(segments.text(index) for index in range(start, stop)).strip(),
+            metadata=metadata | {
+                "start_time": segments.metadata(start)["start_time"],
+                "end_time": segments.metadata(stop - 1)["end_time"],
+                "context_segments": stop - start,
+            },
+        )
+
+
+def get_segment_index() -> SegmentIndex | None:
+    if not config_settings.SEGMENT_INDEX_ENABLED:
+        return None
+    return SegmentIndex.shared(config_settings.SEGMENT_INDEX_TO_ARTIFACT_STORE)
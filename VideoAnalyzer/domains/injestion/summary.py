@@ -0,0 +1,147 @@
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator
+
+from langchain_core.documents import Document
+from loguru import logger
+
+from VideoAnalyzer.domains.injestion.file_store import MirroredFileStore
+from VideoAnalyzer.domains.injestion.segment_index import get_segment_index
+from VideoAnalyzer.domains.s3_utils.artifact_store import ArtifactStore
+from VideoAnalyzer.rate_limiter import count_tokens, get_rate_limiter
+from VideoAnalyzer.settings import config_settings
+from VideoAnalyzer.utils import get_chat_model
+from VideoAnalyzer.vector_db.utils import split_transcript
+
+# Prompt of the "stuff" summarize chain used at ingestion, so streamed and ingested summaries match
+SUMMARY_PROMPT = """Write a concise summary of the following:
+
+
+"{text}"
+
+
+CONCISE SUMMARY:"""
+
+
+def build_summary_prompt(documents: list[Document]) -> str:
+    return SUMMARY_PROMPT.format(text="\n\n".join(document.page_content for document in documents))
+
+
+class SummaryCache(MirroredFileStore):
+    """
+    Summaries of ingested files, keyed by file_name.
+
+    Summaries are written to ``SUMMARY_CACHE_DIR/<file>.json`` and, when an
+    artifact store is given, mirrored to ``summaries/`` in the bucket; the
+    most recently used ones are also kept in memory. Re-ingesting a file
+    replaces its summary.
+    """
+
+    REMOTE_PREFIX = "summaries"
+    EXTENSION = ".json"
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        max_entries: int | None = None,
+        artifact_store: ArtifactStore | None = None,
+    ) -> None:
+        super().__init__(
+            directory or config_settings.SUMMARY_CACHE_DIR,
+            max_entries or config_settings.SUMMARY_CACHE_MAX_ENTRIES,
+            artifact_store,
+        )
+
+    def _write(self, path: str, entry: dict[str, Any]) -> None:
+        with open(path, "w") as f:
+            json.dump(entry, f)
+
+    def _read(self, path: str) -> dict[str, Any]:
+        with open(path) as f:
+            return json.load(f)
+
+    def get(self, file_name: str) -> str | None:
+        entry = self.read(file_name)
+        return entry["summary"] if entry is not None else None
+
+    def put(self, file_name: str, summary: str) -> None:
+        if not summary:
+            return
+        self.write(file_name, {"file_name": file_name, "summary": summary, "created_at": time.time()})
+
+
+def get_summary_cache() -> SummaryCache:
+    return SummaryCache.shared(config_settings.SUMMARY_CACHE_TO_ARTIFACT_STORE)
+
+
+def load_summary_documents(file_name: str) -> list[Document] | None:
+    """First chunks of an ingested recording, rebuilt from its segment index, as summarized at ingestion."""
+    segment_index = get_segment_index()
+    segments = segment_index.load(file_name) if segment_index is not None else None
+    if segments is None or not len(segments):
+        return None
+    documents = split_transcript(
+        segments=segments.iter_documents(),
+        MAX_TOKENS=config_settings.TRANSCRIPT_CHUNK_TOKENS,
+        OVERLAP_SEGMENTS=config_settings.TRANSCRIPT_CHUNK_OVERLAP_SEGMENTS,
+    )
+    return documents[: config_settings.INITIAL_NUMBER_OF_PAGES_TO_RETRIEVE_FOR_SUMMARIZATION]
+
+
+def format_sse(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def astream_summary(documents: list[Document], llm: Any = None) -> AsyncIterator[str]:
+    """Summary tokens as the chat model generates them."""
+    llm = llm or get_chat_model(model_key="SUMMARIZE_LLM_MODEL")
+    prompt = build_summary_prompt(documents)
+    await get_rate_limiter().aacquire(
+        "SUMMARIZE_LLM_MODEL", tokens=count_tokens([prompt]) + config_settings.RATE_LIMIT_COMPLETION_TOKENS
+    )
+    async for chunk in llm.astream(prompt):
+        if chunk.content:
+            yield chunk.content
+
+
+async def stream_summary_events(
+    file_name: str, documents: list[Document] | None, cached_summary: str | None
+) -> AsyncIterator[str]:
+    """
+    Server-sent events of a file summary: ``token`` events with the text as
+    it is generated, then ``done``. A cached summary is sent as one token
+    event; a generated one is cached once complete.
+    """
+    started = time.monotonic()
+    if cached_summary is not None:
+        yield format_sse("token", {"text": cached_summary})
+        yield format_sse("done", {"file_name": file_name, "cached": True, "characters": len(cached_summary)})
+        return
+
+    parts = []
+    first_token_seconds = None
+    try:
+        async for token in astream_summary(documents):
+            if first_token_seconds is None:
+                first_token_seconds = time.monotonic() - started
+                logger.info(f"First summary token for {file_name} after {first_token_seconds:.2f}s")
+            parts.append(token)
+            yield format_sse("token", {"text": token})
+    except Exception as e:
+        logger.exception(f"Summary streaming failed for {file_name}")
+        yield format_sse("error", {"file_name": file_name, "detail": str(e)})
+        return
+
+    summary = "".join(parts)
+    await asyncio.to_thread(get_summary_cache().put, file_name, summary)
+    yield format_sse(
+        "done",
+        {
+            "file_name": file_name,
+            "cached": False,
+            "characters": len(summary),
+            "first_token_seconds": first_token_seconds,
+            "total_seconds": time.monotonic() - started,
+        },
+    )
@@ -0,0 +1,210 @@
+from array import array
+from bisect import bisect_right
+from io import StringIO
+from typing import Any, Iterable, Iterator
+from langchain_core.documents import Document
+
+
+def format_timestamp(seconds):
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    seconds = seconds % 60
+    return f"{hours:02d}:{minutes:02d}:{seconds:06.3f}"
+
+
+def parse_timestamp(timestamp: str) -> float:
+    """Seconds of a format_timestamp string (HH:MM:SS.mmm)"""
+    hours, minutes, seconds = timestamp.split(":")
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+class TranscriptSegments:
+    """
+    Columnar store for transcription segments.
+
+    Start and end times are kept in float arrays and every segment's text is a
+    slice of one string buffer addressed by an offsets array, so a multi-hour
+    transcript costs a handful of Python objects instead of one Document and
+    metadata dict per segment. Documents and the transcript JSON are produced
+    lazily from the columns.
+    """
+
+    def __init__(self) -> None:
+        self.starts = array("d")
+        self.ends = array("d")
+        self.offsets = array("q", [0])
+        self._writer: StringIO | None = StringIO()
+        self._buffer = ""
+        self.speaker_ids: array | None = None
+        self.speaker_labels: list[str] = []
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Any]) -> "TranscriptSegments":
+        """Build the store from objects exposing start, end and text attributes."""
+        transcript = cls()
+        for segment in segments:
+            transcript.append(segment.start, segment.end, segment.text)
+        return transcript
+
+    @classmethod
+    def from_columns(
+        cls,
+        starts: Iterable[float],
+        ends: Iterable[float],
+        offsets: Iterable[int],
+        buffer: str,
+        speaker_ids: Iterable[int] | None = None,
+        speaker_labels: Iterable[str] = (),
+    ) -> "TranscriptSegments":
+        """Restore a store from its columns, as persisted by the segment index and checkpoints."""
+        transcript = cls()
+        transcript.starts = array("d", starts)
+        transcript.ends = array("d", ends)
+        transcript.offsets = array("q", offsets)
+        transcript._writer = None
+        transcript._buffer = buffer
+        if speaker_ids is not None:
+            transcript.speaker_ids = array("h", speaker_ids)
+            transcript.speaker_labels = list(speaker_labels)
+        return transcript
+
+    def append(self, start: float, end: float, text: str) -> None:
+        if self._writer is None:
+            self._writer = StringIO(self._buffer)
+            self._writer.seek(0, 2)
+        self._writer.write(text)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.offsets.append(self.offsets[-1] + len(text))
+        if self.speaker_ids is not None:
+            self.speaker_ids.append(-1)
+
+    def set_speaker(self, index: int, label: str) -> None:
+        if self.speaker_ids is None:
+            self.speaker_ids = array("h", [-1]) * len(self)
+        if label not in self.speaker_labels:
+            self.speaker_labels.append(label)
+        self.speaker_ids[index] = self.speaker_labels.index(label)
+
+    def speaker(self, index: int) -> str | None:
+        if self.speaker_ids is None or self.speaker_ids[index] < 0:
+            return None
+        return self.speaker_labels[self.speaker_ids[index]]
+
+    @property
+    def buffer(self) -> str:
+        if self._writer is not None:
+            self._buffer = self._writer.getvalue()
+            self._writer = None
+        return self._buffer
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def duration(self) -> float:
+        return self.ends[-1] if self.ends else 0.0
+
+    def locate(self, seconds: float) -> int:
+        """Index of the segment playing at ``seconds``, or the last one starting before it."""
+        return max(bisect_right(self.starts, seconds) - 1, 0)
+
+    def text(self, index: int) -> str:
+        return self.buffer[self.offsets[index]: self.offsets[index + 1]]
+
+    def metadata(self, index: int) -> dict[str, str]:
+        metadata = {
+            "start_time": format_timestamp(self.starts[index]),
+            "end_time": format_timestamp(self.ends[index]),
+        }
+        if (speaker := self.speaker(index)) is not None:
+            metadata["speaker"] = speaker
+        return metadata
+
+    def iter_documents(self, start: int = 0, stop: int | None = None) -> Iterator[Document]:
+        """Yield one Document per segment, built on demand."""
+        for index in range(start, len(self) if stop is None else min(stop, len(self))):
+            yield Document(page_content=self.text(index), metadata=self.metadata(index))
+
+    def iter_transcript(self, start: int = 0, stop: int | None = None) -> Iterator[dict[str, str]]:
+        """Yield transcript rows in the shape used by the status payload."""
+        for index in range(start, len(self) if stop is None else min(stop, len(self))):
+            yield {"text": self.text(index)} | self.metadata(index)
+
+    def to_columns(self) -> dict[str, Any]:
+        """JSON-serialisable columns, restored with from_columns."""
+        columns = {
+            "starts": list(self.starts),
+            "ends": list(self.ends),
+            "offsets": list(self.offsets),
+            "buffer": self.buffer,
+        }
+        if self.speaker_ids is not None:
+            columns |= {"speaker_ids": list(self.speaker_ids), "speaker_labels": self.speaker_labels}
+        return columns
+
+
+def benchmark_memory(num_segments: int) -> dict[str, float]:
+    """
+    Retained memory in MB of a transcript on the ingestion path before and
+    after the columnar store: per-segment Documents plus the transcript JSON
+    built for every job, against TranscriptSegments, whose JSON rows are only
+    built for the inline status fallback (reported separately).
+    """
+    import tracemalloc
+    from types import SimpleNamespace
+
+    segments = [
+        SimpleNamespace(start=i * 4.0, end=i * 4.0 + 3.5, text=f" Segment number {i} of the recording.")
+        for i in range(num_segments)
+    ]
+
+    tracemalloc.start()
+    documents = [
+        Document(
+            page_content=segment.text,
+            metadata={"start_time": format_timestamp(segment.start), "end_time": format_timestamp(segment.end)},
+        )
+        for segment in segments
+    ]
+    transcript_json = {
+        "transcript": [
+            {"text": doc.page_content, "start_time": doc.metadata["start_time"], "end_time": doc.metadata["end_time"]}
+            for doc in documents
+        ]
+    }
+    documents_size, _ = tracemalloc.get_traced_memory()
+    del documents, transcript_json
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    transcript = TranscriptSegments.from_segments(segments)
+    transcript.buffer
+    columnar_size, _ = tracemalloc.get_traced_memory()
+    inline_rows = list(transcript.iter_transcript())
+    inline_size, _ = tracemalloc.get_traced_memory()
+    del inline_rows
+    tracemalloc.stop()
+
+    return {
+        "documents_and_json_mb": documents_size / (1024 * 1024),
+        "columnar_mb": columnar_size / (1024 * 1024),
+        "columnar_with_inline_json_mb": inline_size / (1024 * 1024),
+    }
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Retained memory of transcripts on the ingestion path")
+    parser.add_argument("--segments", type=int, default=50000)
+    args = parser.parse_args()
+    result = benchmark_memory(args.segments)
+    print(f"Segments: {args.segments}")
+    print(f"Documents + transcript JSON (before): {result['documents_and_json_mb']:.2f}MB")
+    print(f"TranscriptSegments (after): {result['columnar_mb']:.2f}MB")
+    print(f"TranscriptSegments + inline status JSON: {result['columnar_with_inline_json_mb']:.2f}MB")
+
+
+if __name__ == "__main__":
+    main()
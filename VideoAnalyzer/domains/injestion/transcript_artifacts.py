@@ -0,0 +1,173 @@
+import gzip
+import json
+import os
+import tempfile
+import zlib
+from typing import Any, Iterator
+
+from loguru import logger
+
+from VideoAnalyzer.domains.injestion.transcript import TranscriptSegments
+from VideoAnalyzer.domains.s3_utils.artifact_store import ArtifactStore, get_artifact_store
+from VideoAnalyzer.settings import config_settings
+
+TRANSCRIPT_FORMATS = {
+    "jsonl": ("transcript.jsonl.gz", "application/x-ndjson"),
+    "srt": ("transcript.srt.gz", "application/x-subrip"),
+    "vtt": ("transcript.vtt.gz", "text/vtt"),
+}
+INDEX_FILE = "transcript.index.json"
+
+
+def srt_timestamp(seconds: float) -> str:
+    milliseconds = round(seconds * 1000)
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+
+
+def iter_srt(segments: TranscriptSegments) -> Iterator[str]:
+    for index in range(len(segments)):
+        text = segments.text(index).strip()
+        if (speaker := segments.speaker(index)) is not None:
+            text = f"{speaker}: {text}"
+        start, end = srt_timestamp(segments.starts[index]), srt_timestamp(segments.ends[index])
+        yield f"{index + 1}\n{start} --> {end}\n{text}\n\n"
+
+
+def iter_vtt(segments: TranscriptSegments) -> Iterator[str]:
+    yield "WEBVTT\n\n"
+    for index in range(len(segments)):
+        text = segments.text(index).strip()
+        if (speaker := segments.speaker(index)) is not None:
+            text = f"<v {speaker}>{text}"
+        start, end = srt_timestamp(segments.starts[index]), srt_timestamp(segments.ends[index])
+        yield f"{start.replace(',', '.')} --> {end.replace(',', '.')}\n{text}\n\n"
+
+
+def write_transcript_artifacts(segments: TranscriptSegments, directory: str, block_rows: int) -> dict[str, Any]:
+    """
+    Write the transcript as gzip JSONL, SRT and VTT files, returning the JSONL block index.
+
+    The JSONL file is a multi-member gzip with one member per ``block_rows``
+    rows; the index records every member's byte offset and length, so a page
+    of rows is read with one ranged GET and decompressed on its own.
+    """
+    blocks = []
+    with open(os.path.join(directory, TRANSCRIPT_FORMATS["jsonl"][0]), "wb") as f:
+        for start in range(0, len(segments), block_rows):
+            lines = "".join(
+                json.dumps(row) + "\n" for row in segments.iter_transcript(start, start + block_rows)
+            )
+            member = gzip.compress(lines.encode("utf-8"), compresslevel=6, mtime=0)
+            blocks.append([f.tell(), len(member)])
+            f.write(member)
+
+    for name, iter_lines in (("srt", iter_srt), ("vtt", iter_vtt)):
+        with gzip.open(os.path.join(directory, TRANSCRIPT_FORMATS[name][0]), "wt", encoding="utf-8") as f:
+            f.writelines(iter_lines(segments))
+
+    return {
+        "segments": len(segments),
+        "duration_seconds": segments.duration,
+        "speakers": list(segments.speaker_labels),
+        "block_rows": block_rows,
+        "blocks": blocks,
+    }
+
+
+def store_transcript_artifacts(
+    segments: TranscriptSegments, request_id: int, artifact_store: ArtifactStore | None = None
+) -> dict[str, Any]:
+    """Upload the transcript artifacts of a job and return the pointer sent in its status."""
+    artifact_store = artifact_store or get_artifact_store()
+    with tempfile.TemporaryDirectory() as directory:
+        index = write_transcript_artifacts(segments, directory, config_settings.TRANSCRIPT_ARTIFACT_BLOCK_ROWS)
+        with open(os.path.join(directory, INDEX_FILE), "w") as f:
+            json.dump(index, f)
+
+        uploads = [
+            (os.path.join(directory, file_name), artifact_store.key("transcripts", request_id, file_name), content_type)
+            for file_name, content_type in [*TRANSCRIPT_FORMATS.values(), (INDEX_FILE, "application/json")]
+        ]
+        sizes = {os.path.basename(path): os.path.getsize(path) for path, _, _ in uploads}
+        artifact_store.upload_many(uploads)
+
+    keys = {
+        name: artifact_store.key("transcripts", request_id, file_name)
+        for name, (file_name, _) in TRANSCRIPT_FORMATS.items()
+    }
+    logger.info(f"Stored transcript artifacts of {len(segments)} segments for request_id: {request_id}")
+    return {
+        "bucket_name": artifact_store.bucket_name,
+        "keys": keys | {"index": artifact_store.key("transcripts", request_id, INDEX_FILE)},
+        "url": f"/injestion/transcripts/{request_id}",
+        "segments": index["segments"],
+        "duration_seconds": index["duration_seconds"],
+        "speakers": index["speakers"],
+        "compressed_bytes": sizes,
+    }
+
+
+def iter_gzip_members(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Decompress a stream of concatenated gzip members chunk by chunk."""
+    decompressor = zlib.decompressobj(wbits=31)
+    for chunk in chunks:
+        while chunk:
+            yield decompressor.decompress(chunk)
+            if not decompressor.eof:
+                break
+            # A member ended, the rest of the chunk starts the next one
+            chunk = decompressor.unused_data
+            decompressor = zlib.decompressobj(wbits=31)
+
+
+class TranscriptArtifactReader:
+    """Streams rows or whole files of a stored transcript without downloading it at once."""
+
+    STREAM_CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, request_id: int, artifact_store: ArtifactStore | None = None) -> None:
+        self.artifact_store = artifact_store or get_artifact_store()
+        self.request_id = request_id
+        if not self.artifact_store.exists(self._key(INDEX_FILE)):
+            raise FileNotFoundError(f"No transcript artifact stored for request_id: {request_id}")
+        self.index = self.artifact_store.get_json(self._key(INDEX_FILE))
+
+    def _key(self, file_name: str) -> str:
+        return self.artifact_store.key("transcripts", self.request_id, file_name)
+
+    def iter_rows(self, offset: int, limit: int) -> Iterator[bytes]:
+        """JSONL lines of rows [offset, offset + limit), read with one ranged GET over their blocks."""
+        block_rows, blocks = self.index["block_rows"], self.index["blocks"]
+        stop = min(offset + limit, self.index["segments"])
+        if offset >= stop:
+            return
+
+        first_block, last_block = offset // block_rows, (stop - 1) // block_rows
+        start_byte = blocks[first_block][0]
+        end_byte = blocks[last_block][0] + blocks[last_block][1] - 1
+        body = self.artifact_store.open_stream(self._key(TRANSCRIPT_FORMATS["jsonl"][0]), (start_byte, end_byte))
+
+        row = first_block * block_rows
+        pending = b""
+        try:
+            for data in iter_gzip_members(iter(lambda: body.read(self.STREAM_CHUNK_SIZE), b"")):
+                *lines, pending = (pending + data).split(b"\n")
+                for line in lines:
+                    if row >= stop:
+                        return
+                    if row >= offset:
+                        yield line + b"\n"
+                    row += 1
+        finally:
+            body.close()
+
+    def iter_file(self, transcript_format: str) -> Iterator[bytes]:
+        """Decompressed content of a whole artifact, chunk by chunk."""
+        body = self.artifact_store.open_stream(self._key(TRANSCRIPT_FORMATS[transcript_format][0]))
+        try:
+            yield from iter_gzip_members(iter(lambda: body.read(self.STREAM_CHUNK_SIZE), b""))
+        finally:
+            body.close()
@@ -1,59 +1,47 @@
-from VideoAnalyzer.domains.injestion.models import FileMetadata
+from VideoAnalyzer.domains.injestion.models import FileMetadata, AudioProfile, JobEstimate
+from VideoAnalyzer.domains.injestion.transcript import TranscriptSegments
 from VideoAnalyzer.settings import config_settings
 from loguru import logger
 from urllib.parse import urlparse
 from pydub import AudioSegment
+from pypdf import PdfReader
 from VideoAnalyzer.exception import VideoException
+from VideoAnalyzer.rate_limiter import get_rate_limiter
+from VideoAnalyzer.job_scheduler import estimate_job_seconds
 import os
+import shutil
+import asyncio
 from subprocess import run
 import subprocess
 from io import BytesIO
-import requests
 import math
 import time
-from typing import List, Any, BinaryIO
-from langchain_core.documents import Document
+from typing import Any, BinaryIO
 from VideoAnalyzer.domains.s3_utils.utils import get_s3_client, upload_to_spaces
+from VideoAnalyzer.utils import (
+    get_async_http_client,
+    get_io_executor,
+    get_requests_session,
+    get_subprocess_semaphore,
+)
 from pathlib import Path
+from types import SimpleNamespace
+import json
 
 
-def format_timestamp(seconds):
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    seconds = seconds % 60
-    return f"{hours:02d}:{minutes:02d}:{seconds:06.3f}"
-
-
-def format_transcription(all_segments, logger) -> List[Document]:
-    """Format transcription segments into Document objects"""
+def format_transcription(all_segments, logger) -> TranscriptSegments:
+    """Format transcription segments into a columnar TranscriptSegments store"""
     try:
         logger.info("Formatting transcription with timestamps.")
-        documents = []
-
-        for segment in all_segments:
-            start_time = format_timestamp(segment.start)
-            end_time = format_timestamp(segment.end)
-
-            metadata = {
-                "start_time": start_time,
-                "end_time": end_time,
-            }
-
-            doc = Document(page_content=segment.text, metadata=metadata)
-            documents.append(doc)
-
-        return documents
+        return TranscriptSegments.from_segments(all_segments)
 
     except Exception as e:
         logger.error(f"An error occurred during transcription formatting: {str(e)}")
         raise
 
 
-def generate_video_thumbnail(pre_signed_url: str) -> BytesIO:
-    """
-    Generate a thumbnail from a video URL and return it as BytesIO object
-    """
-    thumbnail_command = [
+def get_thumbnail_command(pre_signed_url: str) -> list[str]:
+    return [
         'ffmpeg',
         '-ss', '00:00:05',
         '-i', pre_signed_url,
@@ -63,8 +51,13 @@ def generate_video_thumbnail(pre_signed_url: str) -> BytesIO:
         '-'
     ]
 
+
+def generate_video_thumbnail(pre_signed_url: str) -> BytesIO:
+    """
+    Generate a thumbnail from a video URL and return it as BytesIO object
+    """
     thumbnail_result = subprocess.run(
-        thumbnail_command,
+        get_thumbnail_command(pre_signed_url),
         capture_output=True,
         check=True
     )
@@ -72,24 +65,38 @@ def generate_video_thumbnail(pre_signed_url: str) -> BytesIO:
     return BytesIO(thumbnail_result.stdout)
 
 
+async def run_command_async(command: list[str]) -> bytes:
+    """Run a command without blocking the event loop and return its stdout"""
+    async with get_subprocess_semaphore():
+        process = await asyncio.create_subprocess_exec(
+            *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command, stdout, stderr)
+    return stdout
+
+
+async def generate_video_thumbnail_async(pre_signed_url: str) -> BytesIO:
+    """Async counterpart of generate_video_thumbnail"""
+    return BytesIO(await run_command_async(get_thumbnail_command(pre_signed_url)))
+
+
 def cleanup_temp_files(directory):
+    """Remove a job's temporary directory with everything in it"""
     try:
-        logger.info(f"Cleaning up files in directory: {directory}")
-        for filename in os.listdir(directory):
-            file_path = os.path.join(directory, filename)
-            if os.path.isfile(file_path):
-                os.remove(file_path)
-                logger.info(f"Deleted file: {file_path}")
+        logger.info(f"Cleaning up directory: {directory}")
+        shutil.rmtree(directory)
     except Exception as e:
         logger.warning(f"Failed to clean up files in {directory}. Reason: {e}")
 
 
-
 def extract_metadata_from_video(
         pre_signed_url: str,
         file_name: str,
         original_file_name: str,
         bucket_name: str = config_settings.BUCKET_NAME,
+        s3_client: Any = None,
 ) -> FileMetadata:
     """
     Extract metadata from video file and generate thumbnail
@@ -100,7 +107,7 @@ def extract_metadata_from_video(
 
         try:
             #Try to generate and upload thumbnail
-            s3_client = get_s3_client(
+            s3_client = s3_client or get_s3_client(
                 config_settings.REGION_NAME,
                 config_settings.ENDPOINT_URL,
                 config_settings.AWS_ACCESS_KEY_ID,
@@ -133,37 +140,150 @@ def extract_metadata_from_video(
         raise VideoException("Failed to download from pre_signed_url", error_detail=e)
 
 
-# def compress_audio(input_file, output_file, logger):
-#     """Compress audio file using FFmpeg"""
-#     try:
-#         logger.info(f"Compressing audio: {input_file}")
-#         start_time = time.time()
-#         command = [
-#             "ffmpeg",
-#             "-i",
-#             input_file,
-#             "-vn",
-#             "-map_metadata",
-#             "-1",
-#             "-ac",
-#             "1",
-#             "-c:a",
-#             "libopus",
-#             "-b:a",
-#             "12k",
-#             "-application",
-#             "voip",
-#             output_file,
-#         ]
-#         run(command, check=True)
-#         logger.info(
-#             f"Compression completed in {time.time() - start_time:.2f} seconds: {output_file}"
-#         )
-#     except Exception as e:
-#         logger.error(f"An error occurred during audio compression: {str(e)}")
-#         raise
-
-def compress_audio(input_file, output_file, logger):
+async def extract_metadata_from_video_async(
+        pre_signed_url: str,
+        file_name: str,
+        original_file_name: str,
+        bucket_name: str = config_settings.BUCKET_NAME,
+        s3_client: Any = None,
+) -> FileMetadata:
+    """
+    Async counterpart of extract_metadata_from_video: ffmpeg runs as an asyncio
+    subprocess and the boto3 upload on the IO executor, off the event loop
+    """
+    if not pre_signed_url:
+        raise VideoException("Failed to download from pre_signed_url")
+
+    loop = asyncio.get_running_loop()
+    try:
+        thumbnail = await generate_video_thumbnail_async(pre_signed_url)
+        thumbnail_object_path = str(Path(file_name).with_suffix(".jpg"))
+
+        def upload_thumbnail() -> None:
+            client = s3_client or get_s3_client(
+                config_settings.REGION_NAME,
+                config_settings.ENDPOINT_URL,
+                config_settings.AWS_ACCESS_KEY_ID,
+                config_settings.AWS_SECRET_ACCESS_KEY,
+            )
+            upload_to_spaces(client, thumbnail, bucket_name, thumbnail_object_path, "image/jpeg")
+
+        await loop.run_in_executor(get_io_executor(), upload_thumbnail)
+    except Exception:
+        # If thumbnail generation fails, just return None for thumbnail_object_path
+        thumbnail_object_path = None
+        logger.error(f"Failed to generate thumbnail for {original_file_name}")
+
+    return FileMetadata(
+        title=original_file_name,
+        author=None,
+        file_name=file_name,
+        original_file_name=original_file_name,
+        total_pages=None,
+        thumbnail_object_path=thumbnail_object_path,
+    )
+
+
+def get_probe_command(input_file: str) -> list[str]:
+    return [
+        "ffprobe",
+        "-v",
+        "error",
+        "-print_format",
+        "json",
+        "-show_format",
+        "-show_streams",
+        input_file,
+    ]
+
+
+def parse_probe(probe: dict[str, Any]) -> dict[str, Any]:
+    """Container and first audio stream properties of ffprobe JSON output"""
+    streams = probe.get("streams", [])
+    audio = next((stream for stream in streams if stream.get("codec_type") == "audio"), {})
+    media_format = probe.get("format", {})
+    return {
+        "duration": float(media_format.get("duration") or audio.get("duration") or 0.0),
+        "size": int(media_format.get("size") or 0),
+        "format_name": media_format.get("format_name", ""),
+        "has_video": any(
+            stream.get("codec_type") == "video"
+            and not stream.get("disposition", {}).get("attached_pic")
+            for stream in streams
+        ),
+        "codec_name": audio.get("codec_name", ""),
+        "channels": int(audio.get("channels") or 0),
+        "sample_rate": int(audio.get("sample_rate") or 0),
+        "bit_rate": int(audio.get("bit_rate") or media_format.get("bit_rate") or 0),
+    }
+
+
+def probe_media(input_file, logger) -> dict[str, Any]:
+    """Read container and first audio stream properties with ffprobe"""
+    try:
+        result = run(get_probe_command(input_file), capture_output=True, check=True)
+        return parse_probe(json.loads(result.stdout))
+    except Exception as e:
+        logger.error(f"An error occurred while probing media: {str(e)}")
+        raise
+
+
+async def probe_media_async(input_file, logger) -> dict[str, Any]:
+    """Async counterpart of probe_media"""
+    try:
+        return parse_probe(json.loads(await run_command_async(get_probe_command(input_file))))
+    except Exception as e:
+        logger.error(f"An error occurred while probing media: {str(e)}")
+        raise
+
+
+def select_audio_profile(probe: dict[str, Any], file_type: str, logger) -> AudioProfile:
+    """
+    Pick the cheapest way to get the audio under the transcription upload limit.
+
+    Inputs that are already small mono Opus/MP3 in a format the API accepts are
+    sent as is. Otherwise the highest bitrate of the ladder whose output fits
+    the limit in a single chunk is used; when even the lowest bitrate does not
+    fit, the chunk length is derived from that bitrate so the fewest chunks are
+    produced.
+    """
+    max_bytes = config_settings.TRANSCRIPTION_MAX_UPLOAD_MB * 1024 * 1024 * config_settings.TRANSCRIPTION_SIZE_HEADROOM
+    duration = probe["duration"]
+    whole_file_ms = int(duration * 1000) + 1000
+
+    if (
+        not probe["has_video"]
+        and file_type in config_settings.TRANSCRIPTION_NATIVE_FILE_TYPES
+        and probe["codec_name"] in ("opus", "mp3")
+        and probe["channels"] == 1
+        and 0 < probe["size"] <= max_bytes
+    ):
+        logger.info(f"Input is already {probe['codec_name']} mono under the upload limit, skipping transcoding")
+        return AudioProfile(transcode=False, bitrate_kbps=probe["bit_rate"] // 1000, sample_rate=probe["sample_rate"],
+                            chunk_length_ms=whole_file_ms)
+
+    return select_bitrate_profile(duration, logger)
+
+
+def select_bitrate_profile(duration: float, logger) -> AudioProfile:
+    """Pick the highest ladder bitrate that fits one chunk, or chunk at the lowest bitrate"""
+    max_bytes = config_settings.TRANSCRIPTION_MAX_UPLOAD_MB * 1024 * 1024 * config_settings.TRANSCRIPTION_SIZE_HEADROOM
+    for bitrate_kbps in config_settings.TRANSCRIPTION_BITRATE_LADDER_KBPS:
+        if duration * bitrate_kbps * 1000 / 8 <= max_bytes:
+            logger.info(f"Selected {bitrate_kbps}k single chunk profile for {duration:.2f}s of audio")
+            return AudioProfile(transcode=True, bitrate_kbps=bitrate_kbps, sample_rate=16000,
+                                chunk_length_ms=int(duration * 1000) + 1000)
+
+    bitrate_kbps = config_settings.TRANSCRIPTION_BITRATE_LADDER_KBPS[-1]
+    chunk_length_ms = int(max_bytes * 8 / (bitrate_kbps * 1000) * 1000)
+    logger.info(
+        f"Selected {bitrate_kbps}k profile with {math.ceil(duration * 1000 / chunk_length_ms)} chunks "
+        f"for {duration:.2f}s of audio"
+    )
+    return AudioProfile(transcode=True, bitrate_kbps=bitrate_kbps, sample_rate=16000, chunk_length_ms=chunk_length_ms)
+
+
+def compress_audio(input_file, output_file, logger, bitrate_kbps: int = 12, sample_rate: int = 16000):
     """Compress audio file using FFmpeg"""
     try:
         if not os.path.exists(input_file):
@@ -174,6 +294,8 @@ def compress_audio(input_file, output_file, logger):
         start_time = time.time()
         command = [
             "ffmpeg",
+            "-threads",
+            str(config_settings.FFMPEG_THREADS),
             "-i",
             input_file,
             "-vn",
@@ -181,10 +303,12 @@ def compress_audio(input_file, output_file, logger):
             "-1",
             "-ac",
             "1",
+            "-ar",
+            str(sample_rate),
             "-c:a",
             "libopus",
             "-b:a",
-            "12k",
+            f"{bitrate_kbps}k",
             "-application",
             "voip",
             output_file,
@@ -199,10 +323,13 @@ def compress_audio(input_file, output_file, logger):
 
 
 def split_audio_into_chunks(
-    input_file, temp_dir, chunk_length_ms=1800000, unique_id=""
+    input_file, temp_dir, chunk_length_ms=1800000, unique_id="", duration_ms=None, bitrate_kbps=None
 ):
-    """Split audio file into chunks"""
+    """Split audio file into chunks, returning the input itself when it fits in one chunk"""
     try:
+        if duration_ms is not None and duration_ms <= chunk_length_ms:
+            return [input_file]
+
         # Create temp directory if it doesn't exist
         os.makedirs(temp_dir, exist_ok=True)
 
@@ -219,8 +346,14 @@ def split_audio_into_chunks(
             chunk = audio[start:end]
 
             chunk_name = os.path.join(temp_dir, f"chunk_{unique_id}_{i}.ogg")
-            # Use libopus instead of libvorbis
-            chunk.export(chunk_name, format="ogg", codec="libopus")
+            # Use libopus instead of libvorbis, at the profile bitrate so chunks stay under the upload limit
+            chunk.export(
+                chunk_name,
+                format="ogg",
+                codec="libopus",
+                bitrate=f"{bitrate_kbps}k" if bitrate_kbps else None,
+                parameters=["-application", "voip"] if bitrate_kbps else None,
+            )
             chunk_files.append(chunk_name)
 
         return chunk_files
@@ -233,6 +366,7 @@ def transcribe_audio(file_path, client, logger):
     """Transcribe audio using OpenAI's Whisper model"""
     try:
         logger.info(f"Starting transcription of: {file_path}")
+        get_rate_limiter().acquire("AUDIO_LLM_MODEL")
         start_time = time.time()
         with open(file_path, "rb") as audio_file:
             transcript = client.audio.transcriptions.create(
@@ -248,31 +382,50 @@ def transcribe_audio(file_path, client, logger):
 
 
 def transcribe_and_combine_chunks(
-    compressed_audio, temp_dir, unique_id, client, logger
+    compressed_audio, temp_dir, unique_id, client, logger, checkpoint=None,
+    chunk_length_ms=1800000, duration_ms=None, bitrate_kbps=None, cpu_executor=None,
 ):
-    """Transcribe audio chunks and combine the results"""
+    """Transcribe audio chunks and combine the results, reusing checkpointed chunk transcripts"""
     try:
-        chunks = split_audio_into_chunks(
-            compressed_audio, temp_dir, unique_id=unique_id
+        split_kwargs = dict(
+            chunk_length_ms=chunk_length_ms, unique_id=unique_id, duration_ms=duration_ms, bitrate_kbps=bitrate_kbps
         )
+        if cpu_executor is not None:
+            chunks = cpu_executor.run("split", split_audio_into_chunks, compressed_audio, temp_dir, **split_kwargs)
+        else:
+            chunks = split_audio_into_chunks(compressed_audio, temp_dir, **split_kwargs)
         all_segments = []
         for i, chunk in enumerate(chunks):
+            stage = f"transcript_chunk_{i}"
+            if checkpoint is not None and checkpoint.is_done(stage):
+                logger.info(f"Restoring chunk {i + 1}/{len(chunks)} from checkpoint")
+                all_segments.extend(SimpleNamespace(**segment) for segment in checkpoint.load_json(stage))
+                if chunk != compressed_audio:
+                    os.remove(chunk)
+                continue
+
             logger.info(f"Processing chunk {i + 1}/{len(chunks)}")
             transcript = transcribe_audio(chunk, client, logger)
-            chunk_start_time = i * 30 * 60  # 30 minutes in seconds
+            chunk_start_time = i * chunk_length_ms / 1000
             for segment in transcript.segments:
                 segment.start += chunk_start_time
                 segment.end += chunk_start_time
             all_segments.extend(transcript.segments)
-            os.remove(chunk)
-            logger.info(f"Processed and removed chunk: {chunk}")
+            if checkpoint is not None:
+                checkpoint.save_json(
+                    stage,
+                    [{"start": segment.start, "end": segment.end, "text": segment.text} for segment in transcript.segments],
+                )
+            if chunk != compressed_audio:
+                os.remove(chunk)
+                logger.info(f"Processed and removed chunk: {chunk}")
         return all_segments
     except Exception as e:
         logger.error(f"An error occurred during chunk transcription: {str(e)}")
         raise
 
 
-def extract_audio_from_video(input_video, output_audio, logger):
+def extract_audio_from_video(input_video, output_audio, logger, bitrate_kbps: int = 12, sample_rate: int = 16000):
     """Extract audio from video file using FFmpeg"""
     try:
         if not os.path.exists(input_video):
@@ -282,15 +435,19 @@ def extract_audio_from_video(input_video, output_audio, logger):
         logger.info(f"Extracting audio from video: {input_video}")
         command = [
             "ffmpeg",
+            "-threads",
+            str(config_settings.FFMPEG_THREADS),
             "-i",
             input_video,
             "-vn",
             "-ac",
             "1",
+            "-ar",
+            str(sample_rate),
             "-c:a",
             "libopus",
             "-b:a",
-            "12k",
+            f"{bitrate_kbps}k",
             "-application",
             "voip",
             output_audio,
@@ -305,7 +462,7 @@ def extract_audio_from_video(input_video, output_audio, logger):
 def download_file(url: str, output_path: str, logger) -> str:
     """Download file from URL to local path with progress tracking"""
     try:
-        response = requests.get(url, stream=True, timeout=30)
+        response = get_requests_session().get(url, stream=True, timeout=30)
         if response.status_code != 200:
             raise ValueError(
                 f"Failed to download file: status code {response.status_code}"
@@ -338,6 +495,95 @@ def download_file(url: str, output_path: str, logger) -> str:
         raise
 
 
+def count_pdf_pages(file_path: str) -> int:
+    return len(PdfReader(file_path).pages)
+
+
+def extract_pdf_pages(file_path: str, start: int, stop: int, logger) -> list[tuple[int, str]]:
+    """Extract the text of pages [start, stop) of a PDF; runs in a CPU worker process"""
+    reader = PdfReader(file_path)
+    pages = []
+    for page_number in range(start, min(stop, len(reader.pages))):
+        try:
+            pages.append((page_number, reader.pages[page_number].extract_text() or ""))
+        except Exception as e:
+            logger.warning(f"Failed to extract text from page {page_number + 1} of {file_path}: {str(e)}")
+            pages.append((page_number, ""))
+    return pages
+
+
+def get_remote_file_size(url: str, logger) -> int:
+    """Return the size in bytes of a local file or pre-signed URL, 0 if unknown"""
+    try:
+        if os.path.isfile(url):
+            return os.path.getsize(url)
+
+        # Pre-signed URLs are signed for GET, so ask for a single byte instead of a HEAD
+        response = get_requests_session().get(url, headers={"Range": "bytes=0-0"}, stream=True, timeout=30)
+        response.close()
+        content_range = response.headers.get("content-range", "")
+        if "/" in content_range and not content_range.endswith("*"):
+            return int(content_range.rsplit("/", 1)[1])
+        return int(response.headers.get("content-length", 0))
+    except Exception as e:
+        logger.warning(f"Failed to determine file size for {url}: {str(e)}")
+        return 0
+
+
+async def get_remote_file_size_async(url: str, logger) -> int:
+    """Async counterpart of get_remote_file_size on the shared async HTTP client"""
+    try:
+        if os.path.isfile(url):
+            return os.path.getsize(url)
+
+        async with get_async_http_client().stream("GET", url, headers={"Range": "bytes=0-0"}, timeout=30) as response:
+            content_range = response.headers.get("content-range", "")
+            if "/" in content_range and not content_range.endswith("*"):
+                return int(content_range.rsplit("/", 1)[1])
+            return int(response.headers.get("content-length", 0))
+    except Exception as e:
+        logger.warning(f"Failed to determine file size for {url}: {str(e)}")
+        return 0
+
+
+def build_job_estimate(duration_seconds: float | None, size_bytes: int) -> JobEstimate:
+    return JobEstimate(
+        duration_seconds=duration_seconds,
+        size_bytes=size_bytes,
+        estimated_seconds=estimate_job_seconds(duration_seconds, size_bytes),
+    )
+
+
+def probe_job(pre_signed_url: str, process_type: str, logger, size_bytes: int | None = None) -> JobEstimate:
+    """Duration and size of a submitted file with ffprobe, and its estimated processing seconds"""
+    duration = None
+    if process_type in ["audio", "video"]:
+        try:
+            probe = probe_media(pre_signed_url, logger)
+            duration = probe["duration"] or None
+            size_bytes = size_bytes or probe["size"]
+        except Exception:
+            logger.warning(f"Estimating {pre_signed_url} from its size only")
+    if not size_bytes:
+        size_bytes = get_remote_file_size(pre_signed_url, logger)
+    return build_job_estimate(duration, size_bytes)
+
+
+async def probe_job_async(pre_signed_url: str, process_type: str, logger, size_bytes: int | None = None) -> JobEstimate:
+    """Async counterpart of probe_job"""
+    duration = None
+    if process_type in ["audio", "video"]:
+        try:
+            probe = await probe_media_async(pre_signed_url, logger)
+            duration = probe["duration"] or None
+            size_bytes = size_bytes or probe["size"]
+        except Exception:
+            logger.warning(f"Estimating {pre_signed_url} from its size only")
+    if not size_bytes:
+        size_bytes = await get_remote_file_size_async(pre_signed_url, logger)
+    return build_job_estimate(duration, size_bytes)
+
+
 def is_valid_url(url: str) -> bool:
     """Validate if the provided string is a valid URL"""
     try:
@@ -0,0 +1,218 @@
+import os
+from bisect import bisect_left, bisect_right
+from subprocess import Popen, PIPE
+import subprocess
+import time
+from typing import List, Tuple
+
+import numpy as np
+from loguru import logger
+
+VAD_SAMPLE_RATE = 16000
+# Frames decoded per read from the FFmpeg pipe, about 30 seconds at 30ms frames
+PCM_BLOCK_FRAMES = 1024
+
+
+def decode_audio_to_pcm(
+    input_file, pcm_file, logger, sample_rate: int = VAD_SAMPLE_RATE, frame_ms: int = 30
+) -> Tuple[np.ndarray, float]:
+    """
+    Decode any media file to a 16-bit mono PCM file using FFmpeg.
+
+    The PCM is written to ``pcm_file`` as it is read from the pipe, and the RMS
+    energy of every ``frame_ms`` frame is computed block by block, so only the
+    per-frame energies are held in memory however long the recording is.
+
+    Returns:
+        (frame RMS energies, duration in seconds)
+    """
+    try:
+        logger.info(f"Decoding audio to {sample_rate}Hz mono PCM: {input_file}")
+        start_time = time.time()
+        command = [
+            "ffmpeg",
+            "-nostdin",
+            "-i",
+            input_file,
+            "-vn",
+            "-ac",
+            "1",
+            "-ar",
+            str(sample_rate),
+            "-f",
+            "s16le",
+            "-",
+        ]
+        frame_length = int(sample_rate * frame_ms / 1000)
+        block_bytes = frame_length * PCM_BLOCK_FRAMES * 2
+        energies = []
+        num_samples = 0
+        with open(pcm_file, "wb") as f, Popen(command, stdout=PIPE, stderr=subprocess.DEVNULL) as process:
+            while block := process.stdout.read(block_bytes):
+                f.write(block)
+                samples = np.frombuffer(block[: len(block) - len(block) % 2], dtype=np.int16)
+                num_samples += len(samples)
+                num_frames = len(samples) // frame_length
+                if num_frames:
+                    frames = samples[: num_frames * frame_length].astype(np.float32).reshape(num_frames, frame_length)
+                    energies.append(np.sqrt(np.mean(frames * frames, axis=1)))
+            if process.wait() != 0:
+                raise subprocess.CalledProcessError(process.returncode, command)
+
+        duration = num_samples / sample_rate
+        logger.info(f"Decoded {duration:.2f} seconds of audio in {time.time() - start_time:.2f} seconds")
+        return (np.concatenate(energies) if energies else np.zeros(0, dtype=np.float32)), duration
+    except Exception as e:
+        logger.error(f"An error occurred during audio decoding: {str(e)}")
+        raise
+
+
+def load_pcm(pcm_file) -> np.ndarray:
+    """Memory-mapped view of a PCM file written by decode_audio_to_pcm"""
+    if os.path.getsize(pcm_file) < 2:
+        return np.zeros(0, dtype=np.int16)
+    return np.memmap(pcm_file, dtype=np.int16, mode="r")
+
+
+def detect_speech_regions(
+    frame_rms: np.ndarray,
+    duration: float,
+    frame_ms: int = 30,
+    threshold_db: float = -40.0,
+    min_dbfs: float = -55.0,
+    min_speech_ms: int = 250,
+    min_silence_ms: int = 800,
+    padding_ms: int = 200,
+) -> List[Tuple[float, float]]:
+    """
+    Energy based voice activity detection over per-frame RMS energies.
+
+    Frames are marked as speech when their energy is above ``threshold_db``
+    relative to the loudest frame of the recording and above ``min_dbfs``
+    absolute, so a silent or near-silent recording has no speech. Silences
+    shorter than ``min_silence_ms`` are bridged, speech bursts shorter than
+    ``min_speech_ms`` are dropped and every region is padded so words are not
+    clipped.
+
+    Returns:
+        list of (start, end) tuples in seconds on the original timeline.
+    """
+    if len(frame_rms) == 0:
+        return []
+
+    rms = frame_rms + 1e-9
+    energy_db = 20 * np.log10(rms / rms.max())
+    energy_dbfs = 20 * np.log10(rms / 32768.0)
+    is_speech = (energy_db > threshold_db) & (energy_dbfs > min_dbfs)
+
+    # Find the boundaries of consecutive speech frames
+    padded = np.concatenate(([False], is_speech, [False])).astype(np.int8)
+    edges = np.diff(padded)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    frame_seconds = frame_ms / 1000
+    min_silence_frames = max(1, min_silence_ms // frame_ms)
+    min_speech = min_speech_ms / 1000
+    padding = padding_ms / 1000
+
+    regions: List[Tuple[float, float]] = []
+    for start, end in zip(starts, ends):
+        if regions and start - regions[-1][1] < min_silence_frames:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+
+    speech_regions: List[Tuple[float, float]] = []
+    for start, end in regions:
+        start_sec = float(start * frame_seconds)
+        end_sec = float(end * frame_seconds)
+        if end_sec - start_sec < min_speech:
+            continue
+        start_sec = max(0.0, start_sec - padding)
+        end_sec = min(duration, end_sec + padding)
+        if speech_regions and start_sec <= speech_regions[-1][1]:
+            speech_regions[-1] = (speech_regions[-1][0], end_sec)
+        else:
+            speech_regions.append((start_sec, end_sec))
+
+    return speech_regions
+
+
+class SpeechOffsetMap:
+    """Maps timestamps on the speech-only timeline back to the original timeline"""
+
+    def __init__(self, regions: List[Tuple[float, float]]) -> None:
+        self.regions = regions
+        self.compact_starts: List[float] = []
+        elapsed = 0.0
+        for start, end in regions:
+            self.compact_starts.append(elapsed)
+            elapsed += end - start
+        self.speech_duration = elapsed
+
+    def to_original(self, seconds: float, is_end: bool = False) -> float:
+        """
+        Original time of a speech-timeline time. A time on the boundary of two
+        regions is mapped to the start of the later region, or to the end of
+        the earlier one when it ends a segment, so no removed silence is
+        included in the segment.
+        """
+        if not self.regions:
+            return seconds
+        position = bisect_left if is_end else bisect_right
+        index = max(0, position(self.compact_starts, seconds) - 1)
+        region_start, region_end = self.regions[index]
+        return min(region_end, region_start + seconds - self.compact_starts[index])
+
+    def remap_segments(self, segments) -> None:
+        """Shift segment start/end times in place onto the original timeline"""
+        for segment in segments:
+            segment.start = self.to_original(segment.start)
+            segment.end = self.to_original(segment.end, is_end=True)
+
+
+def write_speech_audio(
+    pcm_file,
+    regions: List[Tuple[float, float]],
+    output_file,
+    logger,
+    sample_rate: int = VAD_SAMPLE_RATE,
+    bitrate_kbps: int = 12,
+) -> None:
+    """Stream the speech regions of a PCM file into the encoder with the transcription profile"""
+    try:
+        logger.info(f"Writing {len(regions)} speech regions to: {output_file}")
+        samples = load_pcm(pcm_file)
+        command = [
+            "ffmpeg",
+            "-nostdin",
+            "-y",
+            "-f",
+            "s16le",
+            "-ar",
+            str(sample_rate),
+            "-ac",
+            "1",
+            "-i",
+            "-",
+            "-c:a",
+            "libopus",
+            "-b:a",
+            f"{bitrate_kbps}k",
+            "-application",
+            "voip",
+            output_file,
+        ]
+        block_samples = sample_rate * 60
+        with Popen(command, stdin=PIPE, stderr=subprocess.DEVNULL) as process:
+            for start, end in regions:
+                start_sample, end_sample = int(start * sample_rate), int(end * sample_rate)
+                for block_start in range(start_sample, end_sample, block_samples):
+                    process.stdin.write(samples[block_start: min(end_sample, block_start + block_samples)].tobytes())
+            process.stdin.close()
+            if process.wait() != 0:
+                raise subprocess.CalledProcessError(process.returncode, command)
+    except Exception as e:
+        logger.error(f"An error occurred while writing speech audio: {str(e)}")
+        raise
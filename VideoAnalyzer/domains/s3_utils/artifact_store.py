@@ -0,0 +1,142 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Any, BinaryIO, Iterable, Tuple
+
+import botocore.exceptions
+from boto3.s3.transfer import TransferConfig
+from loguru import logger
+
+from VideoAnalyzer.client_registry import client_registry
+from VideoAnalyzer.domains.s3_utils.utils import get_s3_client, upload_to_spaces
+from VideoAnalyzer.settings import config_settings
+
+MB = 1024 * 1024
+
+# (local path or bytes, key, content type)
+ArtifactUpload = Tuple[str | bytes, str, str]
+
+
+def get_transfer_config() -> TransferConfig:
+    return TransferConfig(
+        multipart_threshold=config_settings.S3_MULTIPART_THRESHOLD_MB * MB,
+        multipart_chunksize=config_settings.S3_MULTIPART_CHUNKSIZE_MB * MB,
+        max_concurrency=config_settings.S3_MAX_CONCURRENCY,
+        use_threads=True,
+    )
+
+
+class ArtifactStore:
+    """
+    Persists transcripts, audio chunks, storyboards and intermediate results in
+    the bucket under ``<prefix>/<key>``.
+
+    Uploads go through the managed transfer with multipart thresholds and
+    concurrency from Settings, and ``upload_many`` runs several transfers in
+    parallel on the same client. Any boto3 compatible client can be passed in,
+    e.g. a moto mocked client or one pointing at a local MinIO.
+    """
+
+    def __init__(
+            self,
+            client: Any = None,
+            bucket_name: str | None = None,
+            prefix: str | None = None,
+            transfer_config: TransferConfig | None = None,
+            max_workers: int | None = None,
+    ) -> None:
+        self.client = client or get_s3_client(
+            config_settings.REGION_NAME,
+            config_settings.ENDPOINT_URL,
+            config_settings.AWS_ACCESS_KEY_ID,
+            config_settings.AWS_SECRET_ACCESS_KEY,
+        )
+        self.bucket_name = bucket_name or config_settings.ARTIFACT_BUCKET_NAME
+        self.prefix = (config_settings.ARTIFACT_PREFIX if prefix is None else prefix).strip("/")
+        self.transfer_config = transfer_config or get_transfer_config()
+        self.max_workers = max_workers or config_settings.ARTIFACT_UPLOAD_WORKERS
+
+    def key(self, *parts: Any) -> str:
+        return "/".join(str(part).strip("/") for part in (self.prefix, *parts) if str(part))
+
+    def put_fileobj(self, file: BinaryIO, key: str, content_type: str = "application/octet-stream") -> str:
+        upload_to_spaces(self.client, file, self.bucket_name, key, content_type, self.transfer_config)
+        return key
+
+    def put_file(self, file_path: str, key: str, content_type: str = "application/octet-stream") -> str:
+        with open(file_path, "rb") as file:
+            return self.put_fileobj(file, key, content_type)
+
+    def put_bytes(self, data: bytes, key: str, content_type: str = "application/octet-stream") -> str:
+        return self.put_fileobj(BytesIO(data), key, content_type)
+
+    def put_json(self, data: Any, key: str) -> str:
+        return self.put_bytes(json.dumps(data).encode("utf-8"), key, "application/json")
+
+    def upload_many(self, uploads: Iterable[ArtifactUpload]) -> list[str]:
+        """Upload files or byte payloads in parallel, returning their keys in order."""
+        def upload(item: ArtifactUpload) -> str:
+            source, key, content_type = item
+            if isinstance(source, bytes):
+                return self.put_bytes(source, key, content_type)
+            return self.put_file(source, key, content_type)
+
+        uploads = list(uploads)
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, max(1, len(uploads)))) as executor:
+            keys = list(executor.map(upload, uploads))
+        logger.info(f"Uploaded {len(keys)} artifacts to {self.bucket_name}")
+        return keys
+
+    def get_bytes(self, key: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket_name, Key=key)["Body"].read()
+
+    def get_json(self, key: str) -> Any:
+        return json.loads(self.get_bytes(key))
+
+    def open_stream(self, key: str, byte_range: Tuple[int, int | None] | None = None) -> Any:
+        """Return the streaming body of an object, optionally limited to a byte range."""
+        kwargs = {"Bucket": self.bucket_name, "Key": key}
+        if byte_range is not None:
+            start, end = byte_range
+            kwargs["Range"] = f"bytes={start}-{'' if end is None else end}"
+        return self.client.get_object(**kwargs)["Body"]
+
+    def download_file(self, key: str, file_path: str) -> str:
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        self.client.download_file(self.bucket_name, key, file_path, Config=self.transfer_config)
+        return file_path
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket_name, Key=key)
+            return True
+        except botocore.exceptions.ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def list_objects(self, prefix: str) -> list[dict[str, Any]]:
+        """Key, Size and LastModified of every object under the prefix."""
+        paginator = self.client.get_paginator("list_objects_v2")
+        return [
+            item
+            for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix)
+            for item in page.get("Contents", [])
+        ]
+
+    def list_keys(self, prefix: str) -> list[str]:
+        return [item["Key"] for item in self.list_objects(prefix)]
+
+    def delete_prefix(self, prefix: str) -> int:
+        keys = self.list_keys(prefix)
+        for start in range(0, len(keys), 1000):
+            self.client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={"Objects": [{"Key": key} for key in keys[start: start + 1000]]},
+            )
+        return len(keys)
+
+
+def get_artifact_store() -> ArtifactStore:
+    return client_registry.get(("artifact_store",), ArtifactStore)
@@ -1,6 +1,9 @@
 import boto3
 from langchain_core.documents import Document
 import botocore.exceptions
+from botocore.config import Config
+from VideoAnalyzer.client_registry import client_registry
+from VideoAnalyzer.settings import config_settings
 from typing import Any, BinaryIO
 from loguru import logger
 
@@ -11,17 +14,30 @@ def get_s3_client(
         aws_access_key_id: str,
         aws_secret_access_key: str,
 ) -> Any:
-    return boto3.session.Session().client(
-        "s3",
-        region_name=region_name,
-        endpoint_url=endpoint_url,
-        aws_access_key_id=aws_access_key_id,
-        aws_secret_access_key=aws_secret_access_key,
+    return client_registry.get(
+        ("s3", region_name, endpoint_url, aws_access_key_id),
+        lambda: boto3.session.Session().client(
+            "s3",
+            region_name=region_name,
+            endpoint_url=endpoint_url or None,
+            aws_access_key_id=aws_access_key_id,
+            aws_secret_access_key=aws_secret_access_key,
+            config=Config(
+                max_pool_connections=config_settings.S3_MAX_POOL_CONNECTIONS,
+                tcp_keepalive=True,
+                retries={"max_attempts": 5, "mode": "adaptive"},
+            ),
+        ),
     )
 
 
 def upload_to_spaces(
-        client: Any, file: BinaryIO, bucket_name: str, file_name: str, content_type: str
+        client: Any,
+        file: BinaryIO,
+        bucket_name: str,
+        file_name: str,
+        content_type: str,
+        transfer_config: Any = None,
 ) -> None:
     try:
         client.upload_fileobj(
@@ -29,6 +45,7 @@ def upload_to_spaces(
             bucket_name,
             file_name,
             ExtraArgs={"ContentType": content_type},
+            Config=transfer_config,
         )
     except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
         logger.exception("Failed to upload to spaces")
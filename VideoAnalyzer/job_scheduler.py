@@ -0,0 +1,148 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable
+
+from loguru import logger
+
+from VideoAnalyzer.client_registry import client_registry
+from VideoAnalyzer.settings import config_settings
+
+
+def estimate_job_seconds(duration_seconds: float | None, size_bytes: int | None) -> float:
+    """Expected processing seconds of a job from its media duration, or its size when it has none."""
+    if duration_seconds:
+        work = duration_seconds * config_settings.JOB_SECONDS_PER_MEDIA_SECOND
+    else:
+        work = (size_bytes or 0) / (1024 * 1024) * config_settings.JOB_SECONDS_PER_MB
+    return config_settings.JOB_BASE_SECONDS + work
+
+
+class ShortestJobFirstScheduler:
+    """
+    Runs ingestion jobs on a fixed pool of worker threads, shortest estimated job first.
+
+    A job's priority is its estimated processing seconds minus
+    ``aging_rate`` seconds for every second it has waited, so a short voice
+    note overtakes a queued multi-hour webinar, but the webinar moves up as it
+    waits and runs after at most ``estimate / aging_rate`` seconds of being
+    overtaken. Since every queued job ages at the same rate, the priority is
+    fixed at submission as ``estimate + aging_rate * submitted_at`` and the
+    queue is a plain heap.
+
+    ``submit`` returns the job's future and its ETA: the estimated work
+    queued ahead of it and still running, spread over the workers, plus its
+    own estimate. ETAs are scaled by the observed ratio of actual to
+    estimated runtime of completed jobs.
+    """
+
+    def __init__(self, max_workers: int | None = None, aging_rate: float | None = None) -> None:
+        self.max_workers = max_workers or config_settings.JOB_SCHEDULER_WORKERS
+        self.aging_rate = config_settings.JOB_AGING_RATE if aging_rate is None else aging_rate
+        self._queue: list[tuple[float, int, dict[str, Any]]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._workers: list[threading.Thread] = []
+        self._running: dict[int, dict[str, Any]] = {}
+        self._started = time.monotonic()
+        self._completed = 0
+        self._total_wait_seconds = 0.0
+        self._calibration = 1.0
+
+    def _ensure_workers(self) -> None:
+        if self._workers:
+            return
+        logger.info(f"Starting job scheduler with {self.max_workers} workers")
+        for index in range(self.max_workers):
+            worker = threading.Thread(target=self._work, name=f"job-scheduler-{index}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _eta(self, priority: float, estimated_seconds: float) -> float:
+        now = time.monotonic()
+        ahead = [job["estimated_seconds"] for queued_priority, _, job in self._queue if queued_priority <= priority]
+        if len(self._running) + len(ahead) < self.max_workers:
+            return estimated_seconds * self._calibration
+        remaining = sum(
+            max(job["estimated_seconds"] * self._calibration - (now - job["started_at"]), 0.0)
+            for job in self._running.values()
+        )
+        return (remaining + sum(ahead) * self._calibration) / self.max_workers + estimated_seconds * self._calibration
+
+    def submit(self, job_id: Any, estimated_seconds: float, fn: Callable, *args: Any, **kwargs: Any) -> tuple[Future, float]:
+        """Queue ``fn(*args, **kwargs)`` and return its future and ETA in seconds."""
+        future: Future = Future()
+        submitted_at = time.monotonic()
+        priority = estimated_seconds + self.aging_rate * (submitted_at - self._started)
+        job = {
+            "job_id": job_id,
+            "estimated_seconds": estimated_seconds,
+            "submitted_at": submitted_at,
+            "fn": fn,
+            "args": args,
+            "kwargs": kwargs,
+            "future": future,
+        }
+        with self._condition:
+            self._ensure_workers()
+            eta = self._eta(priority, estimated_seconds)
+            heapq.heappush(self._queue, (priority, next(self._sequence), job))
+            self._condition.notify()
+        logger.info(f"Scheduled job {job_id}: estimated {estimated_seconds:.0f}s, ETA {eta:.0f}s")
+        return future, eta
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                _, sequence, job = heapq.heappop(self._queue)
+                job["started_at"] = time.monotonic()
+                self._running[sequence] = job
+
+            future = job["future"]
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(job["fn"](*job["args"], **job["kwargs"]))
+                    except BaseException as e:
+                        logger.exception(f"Scheduled job {job['job_id']} failed")
+                        future.set_exception(e)
+            finally:
+                finished = time.monotonic()
+                with self._condition:
+                    del self._running[sequence]
+                    self._completed += 1
+                    self._total_wait_seconds += job["started_at"] - job["submitted_at"]
+                    if job["estimated_seconds"] > 0:
+                        ratio = (finished - job["started_at"]) / job["estimated_seconds"]
+                        self._calibration += config_settings.JOB_ETA_SMOOTHING * (ratio - self._calibration)
+
+    def metrics(self) -> dict[str, Any]:
+        now = time.monotonic()
+        with self._condition:
+            return {
+                "max_workers": self.max_workers,
+                "aging_rate": self.aging_rate,
+                "queued": len(self._queue),
+                "running": len(self._running),
+                "completed": self._completed,
+                "mean_wait_seconds": self._total_wait_seconds / self._completed if self._completed else 0.0,
+                "eta_calibration": self._calibration,
+                "queue": [
+                    {
+                        "job_id": job["job_id"],
+                        "estimated_seconds": job["estimated_seconds"],
+                        "waited_seconds": now - job["submitted_at"],
+                    }
+                    for _, _, job in sorted(self._queue, key=lambda item: item[:2])
+                ],
+            }
+
+
+def get_job_scheduler() -> ShortestJobFirstScheduler | None:
+    if not config_settings.JOB_SCHEDULER_ENABLED:
+        return None
+    return client_registry.get(("job_scheduler",), ShortestJobFirstScheduler)
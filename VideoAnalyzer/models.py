@@ -55,6 +55,20 @@ class FileInjestionRequestDto(StatusRequestDto):
     search_type: ProcessType = ProcessType.HYBRID
 
 
+class BatchFileInjestionRequestDto(StatusRequestDto):
+    files: List[FileInjestionRequestDto]
+
+
+class LiveStreamInjestionRequestDto(StatusRequestDto):
+    stream_url: str
+    file_name: str
+    namespace: str
+    original_file_name: str
+    metadata: List[dict[str, str]] = []
+    params: dict[str, Any] = {}
+    window_seconds: Optional[int] = None
+
+
 class FileInjestionResponseDto(BaseModel):
     title: Optional[str] = None
     author: Optional[str] = None
@@ -62,4 +76,11 @@ class FileInjestionResponseDto(BaseModel):
     original_file_name: Optional[str] = None
     total_pages: Optional[int] = None
     thumbnail_object_path: Optional[str] = None
+    estimated_duration_seconds: Optional[float] = None
+    eta_seconds: Optional[float] = None
+
+
+class BatchFileInjestionResponseDto(BaseModel):
+    request_id: int
+    files: List[FileInjestionResponseDto] = []
 
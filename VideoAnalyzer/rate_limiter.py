@@ -0,0 +1,154 @@
+import asyncio
+import os
+import random
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, Iterable
+
+import tiktoken
+from loguru import logger
+
+from VideoAnalyzer.client_registry import client_registry
+from VideoAnalyzer.settings import config_settings
+
+
+class RateLimitTimeout(Exception):
+    pass
+
+
+def count_tokens(texts: Iterable[str], encoding_name: str = "cl100k_base") -> int:
+    """Token estimate of request texts, charged against the tokens-per-minute bucket."""
+    encoding = client_registry.get(("tiktoken", encoding_name), lambda: tiktoken.get_encoding(encoding_name))
+    return sum(len(tokens) for tokens in encoding.encode_ordinary_batch(list(texts)))
+
+
+class TokenBucketLimiter:
+    """
+    Requests-per-minute and tokens-per-minute buckets per model key, shared by
+    every process on the host through a SQLite file.
+
+    Each bucket refills continuously at its per-minute quota and holds at most
+    ``RATE_LIMIT_BURST_SECONDS`` worth of it. ``acquire`` takes a request and
+    its estimated tokens from both buckets of a model key in one IMMEDIATE
+    transaction, or sleeps until they have refilled enough, so workers queue
+    on the limiter instead of bursting into 429s and retry storms. A request
+    larger than the bucket waits for a full bucket and leaves it in debt, which
+    later callers wait out. Model keys without a quota are not limited.
+    """
+
+    def __init__(self, path: str | None = None, limits: dict[str, dict[str, int]] | None = None) -> None:
+        self.path = path or config_settings.RATE_LIMIT_DB_PATH
+        self.limits = limits or config_settings.RATE_LIMITS
+        self.burst_seconds = config_settings.RATE_LIMIT_BURST_SECONDS
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                " model_key TEXT NOT NULL, kind TEXT NOT NULL, level REAL NOT NULL, updated REAL NOT NULL,"
+                " PRIMARY KEY (model_key, kind))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def _quotas(self, model_key: str) -> dict[str, float]:
+        """Per-minute quota of each bucket kind of a model key, unlimited kinds left out."""
+        limits = self.limits.get(model_key) or {}
+        return {kind: float(limits[kind]) for kind in ("rpm", "tpm") if limits.get(kind)}
+
+    def _try_acquire(self, model_key: str, needs: dict[str, float]) -> float:
+        """Take ``needs`` from the buckets and return 0, or return the seconds to wait for them."""
+        now = time.time()
+        quotas = self._quotas(model_key)
+        with closing(self._connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                stored = {
+                    kind: (level, updated)
+                    for kind, level, updated in connection.execute(
+                        "SELECT kind, level, updated FROM buckets WHERE model_key = ?", (model_key,)
+                    )
+                }
+                levels, wait = {}, 0.0
+                for kind, quota in quotas.items():
+                    rate, capacity = quota / 60, quota / 60 * self.burst_seconds
+                    level, updated = stored.get(kind, (capacity, now))
+                    levels[kind] = min(capacity, level + (now - updated) * rate)
+                    shortfall = min(needs[kind], capacity) - levels[kind]
+                    if shortfall > 0:
+                        wait = max(wait, shortfall / rate)
+                if wait == 0:
+                    levels = {kind: level - needs[kind] for kind, level in levels.items()}
+                connection.executemany(
+                    "INSERT OR REPLACE INTO buckets (model_key, kind, level, updated) VALUES (?, ?, ?, ?)",
+                    [(model_key, kind, level, now) for kind, level in levels.items()],
+                )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return wait
+
+    def _next_wait(self, model_key: str, requests: int, tokens: int, started: float, timeout: float | None) -> float:
+        if not self._quotas(model_key):
+            return 0.0
+        wait = self._try_acquire(model_key, {"rpm": requests, "tpm": tokens})
+        if wait and timeout is not None and time.monotonic() - started + wait > timeout:
+            raise RateLimitTimeout(f"Waited over {timeout:.0f}s for the {model_key} rate limit")
+        # Jitter keeps waiting processes from waking up in lockstep
+        return wait and min(wait, config_settings.RATE_LIMIT_MAX_SLEEP_SECONDS) * random.uniform(1.0, 1.2)
+
+    def acquire(self, model_key: str, requests: int = 1, tokens: int = 0, timeout: float | None = None) -> float:
+        """Block until the model key's quota allows the call, returning the seconds waited."""
+        timeout = config_settings.RATE_LIMIT_MAX_WAIT_SECONDS if timeout is None else timeout
+        started = time.monotonic()
+        while sleep := self._next_wait(model_key, requests, tokens, started, timeout):
+            time.sleep(sleep)
+        waited = time.monotonic() - started
+        if waited > 1:
+            logger.info(f"Waited {waited:.1f}s for the {model_key} rate limit ({requests} requests, {tokens} tokens)")
+        return waited
+
+    async def aacquire(self, model_key: str, requests: int = 1, tokens: int = 0, timeout: float | None = None) -> float:
+        """Async counterpart of acquire, sleeping without blocking the event loop."""
+        timeout = config_settings.RATE_LIMIT_MAX_WAIT_SECONDS if timeout is None else timeout
+        started = time.monotonic()
+        while sleep := await asyncio.to_thread(self._next_wait, model_key, requests, tokens, started, timeout):
+            await asyncio.sleep(sleep)
+        return time.monotonic() - started
+
+    def metrics(self) -> dict[str, Any]:
+        with closing(self._connect()) as connection:
+            rows = connection.execute("SELECT model_key, kind, level, updated FROM buckets").fetchall()
+        now = time.time()
+        buckets: dict[str, Any] = {}
+        for model_key, kind, level, updated in rows:
+            quota = self._quotas(model_key).get(kind)
+            if quota is None:
+                continue
+            capacity = quota / 60 * self.burst_seconds
+            buckets.setdefault(model_key, {})[kind] = {
+                "quota_per_minute": quota,
+                "available": min(capacity, level + (now - updated) * quota / 60),
+                "capacity": capacity,
+            }
+        return buckets
+
+
+class NoopLimiter:
+    def acquire(self, model_key: str, requests: int = 1, tokens: int = 0, timeout: float | None = None) -> float:
+        return 0.0
+
+    async def aacquire(self, model_key: str, requests: int = 1, tokens: int = 0, timeout: float | None = None) -> float:
+        return 0.0
+
+    def metrics(self) -> dict[str, Any]:
+        return {}
+
+
+def get_rate_limiter() -> TokenBucketLimiter | NoopLimiter:
+    if not config_settings.RATE_LIMIT_ENABLED:
+        return client_registry.get(("rate_limiter", "noop"), NoopLimiter)
+    return client_registry.get(("rate_limiter",), TokenBucketLimiter)
@@ -1,3 +1,4 @@
+import json
 import os
 from pydantic_settings import BaseSettings
 from typing import ClassVar
@@ -16,13 +17,151 @@ class Settings:
     MILVUS_COLLECTION_NAME_TEST: str = os.environ.get("MILVUS_COLLECTION_NAME_TEST", "")
     MILVUS_COLLECTION_NAME_STAGING: str = os.environ.get("MILVUS_COLLECTION_NAME_STAGING", "")
 
+    # vector database settings
+    MILVUS_URI: str = os.environ.get("MILVUS_URI", "http://localhost:19530")
+    MILVUS_TOKEN: str = os.environ.get("MILVUS_TOKEN", "")
+    MILVUS_DB_NAME: str = os.environ.get("MILVUS_DB_NAME", "default")
+    INDEX_NAME: str = os.environ.get("INDEX_NAME", MILVUS_COLLECTION_NAME_DEV)
+    PRIMARY_KEY_FIELD_SCHEMA_NAME: str = os.environ.get("PRIMARY_KEY_FIELD_SCHEMA_NAME", "pk")
+    TEXT_FIELD_SCHEMA_NAME: str = os.environ.get("TEXT_FIELD_SCHEMA_NAME", "text")
+    DENSE_FIELD_SCHEMA_NAME: str = os.environ.get("DENSE_FIELD_SCHEMA_NAME", "vector")
+    SPARSE_FIELD_SCHEMA_NAME: str = os.environ.get("SPARSE_FIELD_SCHEMA_NAME", "sparse_vector")
+    PARTITION_FIELD_SCHEMA_NAME: str = os.environ.get("PARTITION_FIELD_SCHEMA_NAME", "namespace")
+    TIMESTAMP_FIELD_SCHEMA_NAME: str = os.environ.get("TIMESTAMP_FIELD_SCHEMA_NAME", "timestamp")
+    COLLECTION_FIELD_SCHEMA_NAME: str = os.environ.get("COLLECTION_FIELD_SCHEMA_NAME", "collection_metadata")
+    COLLECTION_SCHEMA_AUTO_ID_STATUS: bool = os.environ.get("COLLECTION_SCHEMA_AUTO_ID_STATUS", "false").lower() == "true"
+    COLLECTION_SCHEMA_MAX_LENGTH: int = int(os.environ.get("COLLECTION_SCHEMA_MAX_LENGTH", 128))
+    SCHEMA_MAX_LENGTH: int = int(os.environ.get("SCHEMA_MAX_LENGTH", 65535))
+    # dense index profile (FLAT, HNSW, IVF_FLAT, IVF_PQ, DISKANN), params override the profile's defaults
+    DENSE_INDEX_TYPE: str = os.environ.get("DENSE_INDEX_TYPE", "HNSW")
+    DENSE_INDEX_PARAMS: ClassVar[dict] = json.loads(os.environ.get("DENSE_INDEX_PARAMS", "{}"))
+    DENSE_SEARCH_PARAMS: ClassVar[dict] = json.loads(os.environ.get("DENSE_SEARCH_PARAMS", "{}"))
+    DENSE_METRIC_TYPE: str = os.environ.get("DENSE_METRIC_TYPE", "COSINE")
+    SPARSE_INDEX_TYPE: str = os.environ.get("SPARSE_INDEX_TYPE", "SPARSE_INVERTED_INDEX")
+    SPARSE_METRIC_TYPE: str = os.environ.get("SPARSE_METRIC_TYPE", "BM25")
+    # tenant partitions kept loaded per collection, least recently used ones are released
+    MILVUS_MAX_LOADED_PARTITIONS: int = int(os.environ.get("MILVUS_MAX_LOADED_PARTITIONS", 64))
+    # namespace of inserts without one and of searches that name none
+    DEFAULT_NAMESPACE: str = os.environ.get("DEFAULT_NAMESPACE", "default")
+
+    # vector store backend: "milvus" or the single-node "embedded" store
+    VECTOR_STORE_BACKEND: str = os.environ.get("VECTOR_STORE_BACKEND", "milvus")
+    EMBEDDED_STORE_DIR: str = os.environ.get(
+        "EMBEDDED_STORE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.getcwd())), "embedded_vector_store")
+    )
+    EMBEDDED_IVF_THRESHOLD: int = int(os.environ.get("EMBEDDED_IVF_THRESHOLD", 50000))
+    EMBEDDED_IVF_NLIST: int = int(os.environ.get("EMBEDDED_IVF_NLIST", 256))
+    EMBEDDED_IVF_NPROBE: int = int(os.environ.get("EMBEDDED_IVF_NPROBE", 16))
+    # hybrid search ranker: "rrf" or "weighted" with [dense, sparse] weights
+    HYBRID_RANKER: str = os.environ.get("HYBRID_RANKER", "rrf")
+    HYBRID_RRF_K: int = int(os.environ.get("HYBRID_RRF_K", 60))
+    HYBRID_WEIGHTS: ClassVar[list] = [float(w) for w in os.environ.get("HYBRID_WEIGHTS", "0.7,0.3").split(",")]
+    # candidates fetched per search request before local reranking and dedup cut them to top k
+    HYBRID_CANDIDATE_LIMIT: int = int(os.environ.get("HYBRID_CANDIDATE_LIMIT", 20))
+    RERANKER_ENABLED: bool = os.environ.get("RERANKER_ENABLED", "false").lower() == "true"
+    RERANKER_MODEL: str = os.environ.get("RERANKER_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+    RERANKER_BATCH_SIZE: int = int(os.environ.get("RERANKER_BATCH_SIZE", 32))
+    # transcript hits of one file closer than this are merged, negative disables the dedup
+    DEDUP_WINDOW_SECONDS: float = float(os.environ.get("DEDUP_WINDOW_SECONDS", 0))
+    # search result cache, entries of a namespace are dropped when it is written to
+    SEARCH_CACHE_ENABLED: bool = os.environ.get("SEARCH_CACHE_ENABLED", "true").lower() == "true"
+    SEARCH_CACHE_MAX_ENTRIES: int = int(os.environ.get("SEARCH_CACHE_MAX_ENTRIES", 2048))
+    SEARCH_CACHE_TTL_SECONDS: float = float(os.environ.get("SEARCH_CACHE_TTL_SECONDS", 300))
+    # share invalidations between API workers through namespace generations in RATE_LIMIT_DB_PATH
+    SEARCH_CACHE_SHARED_INVALIDATION: bool = os.environ.get("SEARCH_CACHE_SHARED_INVALIDATION", "true").lower() == "true"
+    INCREMENTAL_INGESTION_ENABLED: bool = os.environ.get("INCREMENTAL_INGESTION_ENABLED", "true").lower() == "true"
+
     # chunk settings
     CHUNK_SIZE: int = int(os.environ.get("CHUNK_SIZE", 500))
     CHUNK_OVERLAP: int = int(os.environ.get("CHUNK_OVERLAP", 100))
+    TRANSCRIPT_CHUNK_TOKENS: int = int(os.environ.get("TRANSCRIPT_CHUNK_TOKENS", 300))
+    TRANSCRIPT_CHUNK_OVERLAP_SEGMENTS: int = int(os.environ.get("TRANSCRIPT_CHUNK_OVERLAP_SEGMENTS", 1))
+    PDF_PAGES_PER_TASK: int = int(os.environ.get("PDF_PAGES_PER_TASK", 8))
+    TEXT_BLOCK_CHARS: int = int(os.environ.get("TEXT_BLOCK_CHARS", 64000))
     INITIAL_NUMBER_OF_PAGES_TO_RETRIEVE_FOR_SUMMARIZATION: int = int(
         os.environ.get("INITIAL_NUMBER_OF_PAGES_TO_RETRIEVE_FOR_SUMMARIZATION", 5)
     )
 
+    # resumable job checkpoints
+    CHECKPOINT_ENABLED: bool = os.environ.get("CHECKPOINT_ENABLED", "true").lower() == "true"
+    CHECKPOINT_DIR: str = os.environ.get(
+        "CHECKPOINT_DIR", os.path.join(os.path.dirname(os.path.dirname(os.getcwd())), "ingestion_checkpoints")
+    )
+    CHECKPOINT_TO_ARTIFACT_STORE: bool = os.environ.get("CHECKPOINT_TO_ARTIFACT_STORE", "false").lower() == "true"
+    # Checkpoints of jobs not retried within the TTL are swept, at most once per interval
+    CHECKPOINT_TTL_HOURS: float = float(os.environ.get("CHECKPOINT_TTL_HOURS", 72))
+    CHECKPOINT_SWEEP_INTERVAL_SECONDS: float = float(os.environ.get("CHECKPOINT_SWEEP_INTERVAL_SECONDS", 3600))
+    EMBED_BATCH_SIZE: int = int(os.environ.get("EMBED_BATCH_SIZE", 256))
+
+    # transcript artifacts, the status payload only carries a pointer to them
+    TRANSCRIPT_ARTIFACT_ENABLED: bool = os.environ.get("TRANSCRIPT_ARTIFACT_ENABLED", "true").lower() == "true"
+    TRANSCRIPT_ARTIFACT_BLOCK_ROWS: int = int(os.environ.get("TRANSCRIPT_ARTIFACT_BLOCK_ROWS", 500))
+    TRANSCRIPT_PAGE_MAX_ROWS: int = int(os.environ.get("TRANSCRIPT_PAGE_MAX_ROWS", 5000))
+
+    # summary cache, serves streamed summaries of ingested files
+    SUMMARY_CACHE_DIR: str = os.environ.get(
+        "SUMMARY_CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.getcwd())), "summary_cache")
+    )
+    SUMMARY_CACHE_MAX_ENTRIES: int = int(os.environ.get("SUMMARY_CACHE_MAX_ENTRIES", 1024))
+    SUMMARY_CACHE_TO_ARTIFACT_STORE: bool = (
+        os.environ.get("SUMMARY_CACHE_TO_ARTIFACT_STORE", "false").lower() == "true"
+    )
+
+    # per-file transcript segment index for timestamp context lookups
+    SEGMENT_INDEX_ENABLED: bool = os.environ.get("SEGMENT_INDEX_ENABLED", "true").lower() == "true"
+    SEGMENT_INDEX_DIR: str = os.environ.get(
+        "SEGMENT_INDEX_DIR", os.path.join(os.path.dirname(os.path.dirname(os.getcwd())), "segment_index")
+    )
+    SEGMENT_INDEX_TO_ARTIFACT_STORE: bool = (
+        os.environ.get("SEGMENT_INDEX_TO_ARTIFACT_STORE", "false").lower() == "true"
+    )
+    SEGMENT_INDEX_MAX_CACHED_FILES: int = int(os.environ.get("SEGMENT_INDEX_MAX_CACHED_FILES", 128))
+    SEGMENT_CONTEXT_WINDOW: int = int(os.environ.get("SEGMENT_CONTEXT_WINDOW", 2))
+
+    # cpu stage executor settings, 0 workers means the cgroup-aware CPU count
+    CPU_EXECUTOR_MAX_WORKERS: int = int(os.environ.get("CPU_EXECUTOR_MAX_WORKERS", 0))
+    CPU_EXECUTOR_START_METHOD: str = os.environ.get("CPU_EXECUTOR_START_METHOD", "forkserver")
+    CPU_STAGE_LIMITS: ClassVar[dict] = {
+        "decode": int(os.environ.get("CPU_STAGE_LIMIT_DECODE", 2)),
+        "transcode": int(os.environ.get("CPU_STAGE_LIMIT_TRANSCODE", 4)),
+        "split": int(os.environ.get("CPU_STAGE_LIMIT_SPLIT", 2)),
+        "pdf": int(os.environ.get("CPU_STAGE_LIMIT_PDF", 4)),
+        "ocr": int(os.environ.get("CPU_STAGE_LIMIT_OCR", 2)),
+    }
+
+    # live stream ingestion settings
+    LIVE_WINDOW_SECONDS: int = int(os.environ.get("LIVE_WINDOW_SECONDS", 30))
+    LIVE_TRANSCRIBE_CONCURRENCY: int = int(os.environ.get("LIVE_TRANSCRIBE_CONCURRENCY", 2))
+    LIVE_BITRATE_KBPS: int = int(os.environ.get("LIVE_BITRATE_KBPS", 24))
+    LIVE_STITCH_GAP_SECONDS: float = float(os.environ.get("LIVE_STITCH_GAP_SECONDS", 1.5))
+    LIVE_POLL_INTERVAL_SECONDS: float = float(os.environ.get("LIVE_POLL_INTERVAL_SECONDS", 0.5))
+    LIVE_IDLE_TIMEOUT_SECONDS: float = float(os.environ.get("LIVE_IDLE_TIMEOUT_SECONDS", 60))
+    LIVE_SEGMENT_INDEX_EVERY_WINDOWS: int = int(os.environ.get("LIVE_SEGMENT_INDEX_EVERY_WINDOWS", 10))
+
+    # batch ingestion settings
+    BATCH_MAX_WORKERS: int = int(os.environ.get("BATCH_MAX_WORKERS", 4))
+
+    # duration-aware job scheduling, shortest estimated job first with aging
+    JOB_SCHEDULER_ENABLED: bool = os.environ.get("JOB_SCHEDULER_ENABLED", "true").lower() == "true"
+    JOB_SCHEDULER_WORKERS: int = int(os.environ.get("JOB_SCHEDULER_WORKERS", 4))
+    # Seconds of estimated work a queued job is credited for every second it waits
+    JOB_AGING_RATE: float = float(os.environ.get("JOB_AGING_RATE", 1.0))
+    JOB_BASE_SECONDS: float = float(os.environ.get("JOB_BASE_SECONDS", 20))
+    JOB_SECONDS_PER_MEDIA_SECOND: float = float(os.environ.get("JOB_SECONDS_PER_MEDIA_SECOND", 0.15))
+    JOB_SECONDS_PER_MB: float = float(os.environ.get("JOB_SECONDS_PER_MB", 2.0))
+    JOB_ETA_SMOOTHING: float = float(os.environ.get("JOB_ETA_SMOOTHING", 0.2))
+
+    # shared client connection pools
+    HTTP_MAX_CONNECTIONS: int = int(os.environ.get("HTTP_MAX_CONNECTIONS", 100))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.environ.get("HTTP_MAX_KEEPALIVE_CONNECTIONS", 20))
+    HTTP_KEEPALIVE_EXPIRY: float = float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", 60.0))
+    HTTP_TIMEOUT: float = float(os.environ.get("HTTP_TIMEOUT", 600.0))
+    S3_MAX_POOL_CONNECTIONS: int = int(os.environ.get("S3_MAX_POOL_CONNECTIONS", 50))
+
+    # async request path
+    IO_EXECUTOR_MAX_WORKERS: int = int(os.environ.get("IO_EXECUTOR_MAX_WORKERS", 32))
+    ASYNC_SUBPROCESS_LIMIT: int = int(os.environ.get("ASYNC_SUBPROCESS_LIMIT", 64))
+
     # aws
     BUCKET_NAME: str = os.environ.get("BUCKET_NAME", "")
     REGION_NAME: str = os.environ.get("REGION_NAME", "")
@@ -30,8 +169,44 @@ class Settings:
     AWS_ACCESS_KEY_ID: str = os.environ.get("AWS_ACCESS_KEY_ID", "")
     AWS_SECRET_ACCESS_KEY: str = os.environ.get("AWS_SECRET_ACCESS_KEY", "")
 
+    # artifact store
+    ARTIFACT_BUCKET_NAME: str = os.environ.get("ARTIFACT_BUCKET_NAME", os.environ.get("BUCKET_NAME", ""))
+    ARTIFACT_PREFIX: str = os.environ.get("ARTIFACT_PREFIX", "artifacts")
+    ARTIFACT_UPLOAD_WORKERS: int = int(os.environ.get("ARTIFACT_UPLOAD_WORKERS", 8))
+    S3_MULTIPART_THRESHOLD_MB: int = int(os.environ.get("S3_MULTIPART_THRESHOLD_MB", 8))
+    S3_MULTIPART_CHUNKSIZE_MB: int = int(os.environ.get("S3_MULTIPART_CHUNKSIZE_MB", 8))
+    S3_MAX_CONCURRENCY: int = int(os.environ.get("S3_MAX_CONCURRENCY", 10))
+
     SUMMARIZE_LLM_MODEL: str = os.environ.get("SUMMARIZE_LLM_MODEL", "gpt-4o")
 
+    # transcription audio profile settings
+    TRANSCRIPTION_MAX_UPLOAD_MB: int = int(os.environ.get("TRANSCRIPTION_MAX_UPLOAD_MB", 25))
+    TRANSCRIPTION_SIZE_HEADROOM: float = float(os.environ.get("TRANSCRIPTION_SIZE_HEADROOM", 0.9))
+    TRANSCRIPTION_BITRATE_LADDER_KBPS: ClassVar[list] = [
+        int(bitrate) for bitrate in os.environ.get("TRANSCRIPTION_BITRATE_LADDER_KBPS", "32,24,16,12").split(",")
+    ]
+    TRANSCRIPTION_NATIVE_FILE_TYPES: ClassVar[list] = ["mp3", "mpeg", "mpga", "m4a", "ogg", "webm"]
+    FFMPEG_THREADS: int = int(os.environ.get("FFMPEG_THREADS", 0))
+
+    # voice activity detection settings
+    VAD_ENABLED: bool = os.environ.get("VAD_ENABLED", "true").lower() == "true"
+    VAD_FRAME_MS: int = int(os.environ.get("VAD_FRAME_MS", 30))
+    VAD_THRESHOLD_DB: float = float(os.environ.get("VAD_THRESHOLD_DB", -40.0))
+    VAD_MIN_DBFS: float = float(os.environ.get("VAD_MIN_DBFS", -55.0))
+    VAD_MIN_SPEECH_MS: int = int(os.environ.get("VAD_MIN_SPEECH_MS", 250))
+    VAD_MIN_SILENCE_MS: int = int(os.environ.get("VAD_MIN_SILENCE_MS", 800))
+    VAD_PADDING_MS: int = int(os.environ.get("VAD_PADDING_MS", 200))
+
+    # speaker diarization settings
+    DIARIZATION_ENABLED: bool = os.environ.get("DIARIZATION_ENABLED", "false").lower() == "true"
+    DIARIZATION_THRESHOLD: float = float(os.environ.get("DIARIZATION_THRESHOLD", 0.3))
+    DIARIZATION_MAX_SPEAKERS: int = int(os.environ.get("DIARIZATION_MAX_SPEAKERS", 8))
+
+    # slide keyframe OCR settings
+    VIDEO_OCR_ENABLED: bool = os.environ.get("VIDEO_OCR_ENABLED", "false").lower() == "true"
+    VIDEO_SCENE_THRESHOLD: float = float(os.environ.get("VIDEO_SCENE_THRESHOLD", 0.3))
+    VIDEO_OCR_HASH_DISTANCE: int = int(os.environ.get("VIDEO_OCR_HASH_DISTANCE", 6))
+
     # Modular LLM Names
     LLMS: ClassVar[dict] = {
         "RAG_LLM_MODEL": os.environ.get("RAG_LLM_MODEL", "gpt-4o-mini"),
@@ -40,6 +215,34 @@ class Settings:
         "AUDIO_LLM_MODEL": os.environ.get("AUDIO_LLM_MODEL", "whisper-1"),
     }
 
+    # Per-minute request (rpm) and token (tpm) quotas per LLMS model key, 0 is unlimited
+    RATE_LIMIT_ENABLED: bool = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_DB_PATH: str = os.environ.get(
+        "RATE_LIMIT_DB_PATH", os.path.join(os.path.dirname(os.path.dirname(os.getcwd())), "rate_limits.sqlite3")
+    )
+    RATE_LIMITS: ClassVar[dict] = {
+        "RAG_LLM_MODEL": {
+            "rpm": int(os.environ.get("RAG_LLM_MODEL_RPM", 500)),
+            "tpm": int(os.environ.get("RAG_LLM_MODEL_TPM", 200000)),
+        },
+        "SUMMARIZE_LLM_MODEL": {
+            "rpm": int(os.environ.get("SUMMARIZE_LLM_MODEL_RPM", 500)),
+            "tpm": int(os.environ.get("SUMMARIZE_LLM_MODEL_TPM", 30000)),
+        },
+        "EMBEDDING_MODEL": {
+            "rpm": int(os.environ.get("EMBEDDING_MODEL_RPM", 3000)),
+            "tpm": int(os.environ.get("EMBEDDING_MODEL_TPM", 1000000)),
+        },
+        "AUDIO_LLM_MODEL": {
+            "rpm": int(os.environ.get("AUDIO_LLM_MODEL_RPM", 50)),
+            "tpm": int(os.environ.get("AUDIO_LLM_MODEL_TPM", 0)),
+        },
+    }
+    RATE_LIMIT_BURST_SECONDS: float = float(os.environ.get("RATE_LIMIT_BURST_SECONDS", 10))
+    RATE_LIMIT_MAX_SLEEP_SECONDS: float = float(os.environ.get("RATE_LIMIT_MAX_SLEEP_SECONDS", 5))
+    RATE_LIMIT_MAX_WAIT_SECONDS: float = float(os.environ.get("RATE_LIMIT_MAX_WAIT_SECONDS", 1800))
+    RATE_LIMIT_COMPLETION_TOKENS: int = int(os.environ.get("RATE_LIMIT_COMPLETION_TOKENS", 512))
+
     AZURE_OPENAI_SETTINGS: ClassVar[dict] = {
         "LLM_MODEL_NAME": {
             "ENDPOINT": os.environ.get("AZURE_ENDPOINT_LLM_MODEL_NAME", ""),
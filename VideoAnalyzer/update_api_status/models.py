@@ -9,6 +9,8 @@ class RequestStatusEnum(str, Enum):
 
 class ApiNameEnum(str, Enum):
     INJEST_DOC = "injest-doc"
+    INJEST_DOC_BATCH = "injest-doc-batch"
+    INJEST_LIVE_STREAM = "injest-live-stream"
     SCRAPE = "scrape"
     DELETE_FILE = "delete-file"
     PROFILE_DETAILS = "profile-details"
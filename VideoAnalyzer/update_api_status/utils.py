@@ -3,6 +3,7 @@ from loguru import logger
 
 from VideoAnalyzer.update_api_status.models import RequestStatus
 from VideoAnalyzer.settings import config_settings
+from VideoAnalyzer.utils import get_requests_session
 
 
 def call_update_status_api(
@@ -17,7 +18,7 @@ def call_update_status_api(
             f"API_PATH: {status_api_path} and "
             f"auth_token: {token} and "
             f"data: {request_status}")
-        response = requests.post(
+        response = get_requests_session().post(
             status_api_url,
             json=request_status.model_dump(),
             headers={"Authorization": token},
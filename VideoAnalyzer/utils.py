@@ -1,3 +1,8 @@
+import asyncio
+import httpx
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
 from openai import OpenAI, AzureOpenAI
 from langchain_openai import (
     ChatOpenAI,
@@ -6,15 +11,84 @@ from langchain_openai import (
 )
 from langchain_ollama import ChatOllama
 from langchain_ollama.llms import OllamaLLM
+from VideoAnalyzer.client_registry import client_registry
 from VideoAnalyzer.settings import config_settings
 from loguru import logger
 
 
+def get_http_client() -> httpx.Client:
+    """Shared keep-alive connection pool used by the OpenAI and chat model clients."""
+    return client_registry.get(
+        ("httpx",),
+        lambda: httpx.Client(
+            limits=httpx.Limits(
+                max_connections=config_settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=config_settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=config_settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=config_settings.HTTP_TIMEOUT,
+        ),
+    )
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Shared keep-alive connection pool for the async request path."""
+    return client_registry.get(
+        ("httpx_async",),
+        lambda: httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=config_settings.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=config_settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=config_settings.HTTP_KEEPALIVE_EXPIRY,
+            ),
+            timeout=config_settings.HTTP_TIMEOUT,
+        ),
+    )
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Threads for blocking SDK calls (boto3) made from async code, apart from the request threadpool."""
+    return client_registry.get(
+        ("io_executor",),
+        lambda: ThreadPoolExecutor(max_workers=config_settings.IO_EXECUTOR_MAX_WORKERS, thread_name_prefix="io"),
+    )
+
+
+def get_subprocess_semaphore() -> asyncio.Semaphore:
+    """Bounds the ffmpeg/ffprobe subprocesses started by async requests of this worker."""
+    return client_registry.get(
+        ("subprocess_semaphore",), lambda: asyncio.Semaphore(config_settings.ASYNC_SUBPROCESS_LIMIT)
+    )
+
+
+def get_requests_session() -> requests.Session:
+    """Shared requests session with a pooled adapter for backend and download calls."""
+    def build_session() -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=config_settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            pool_maxsize=config_settings.HTTP_MAX_CONNECTIONS,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    return client_registry.get(("requests",), build_session)
+
+
 def get_chat_model(model_key: str = "RAG_LLM_MODEL", temperature: float = 0.0):
+    return client_registry.get(
+        ("chat_model", config_settings.LLM_SERVICE, model_key, temperature),
+        lambda: _build_chat_model(model_key, temperature),
+    )
+
+
+def _build_chat_model(model_key: str, temperature: float):
     if config_settings.LLM_SERVICE == "openai":
         return ChatOpenAI(
             model=config_settings.LLMS.get(model_key, ""), temperature=temperature,
-            stream_usage=True
+            stream_usage=True,
+            http_client=get_http_client(),
         )
 
     elif config_settings.LLM_SERVICE == "azure-openai":
@@ -27,6 +101,7 @@ def get_chat_model(model_key: str = "RAG_LLM_MODEL", temperature: float = 0.0):
             api_version=config_settings.AZURE_OPENAI_SETTINGS[model_key]["API_VERSION"],
             model=config_settings.LLMS.get(model_key, ""),
             temperature=temperature,
+            http_client=get_http_client(),
         )
 
     elif config_settings.LLM_SERVICE == "ollama":
@@ -36,8 +111,15 @@ def get_chat_model(model_key: str = "RAG_LLM_MODEL", temperature: float = 0.0):
 
 
 def get_openai_client(model_key: str):
+    return client_registry.get(
+        ("openai_client", config_settings.LLM_SERVICE, model_key),
+        lambda: _build_openai_client(model_key),
+    )
+
+
+def _build_openai_client(model_key: str):
     if config_settings.LLM_SERVICE == "openai":
-        return OpenAI(api_key=config_settings.OPENAI_API_KEY)
+        return OpenAI(api_key=config_settings.OPENAI_API_KEY, http_client=get_http_client())
 
     elif config_settings.LLM_SERVICE == "azure-openai":
         return AzureOpenAI(
@@ -47,9 +129,21 @@ def get_openai_client(model_key: str):
             ],
             api_key=config_settings.AZURE_OPENAI_SETTINGS[model_key]["API_KEY"],
             api_version=config_settings.AZURE_OPENAI_SETTINGS[model_key]["API_VERSION"],
+            http_client=get_http_client(),
         )
 
     elif config_settings.LLM_SERVICE == "ollama":
         return OllamaLLM(
             model=config_settings.OLLAMA_LLM_SETTING.get(model_key, "")
         )
+
+
+def get_transcription_client():
+    """Whisper client: Azure when configured, otherwise OpenAI (Ollama has no transcription API)."""
+    if config_settings.LLM_SERVICE == "azure-openai":
+        return get_openai_client("OPENAI_AUDIO_TRANSCRIPTION_MODEL")
+
+    return client_registry.get(
+        ("openai_client", "openai", "OPENAI_AUDIO_TRANSCRIPTION_MODEL"),
+        lambda: OpenAI(api_key=config_settings.OPENAI_API_KEY, http_client=get_http_client()),
+    )
@@ -0,0 +1,135 @@
+from typing import Tuple
+import numpy as np
+
+
+def prepare_vectors(vectors: np.ndarray, metric: str) -> np.ndarray:
+    """float32 copy of the vectors, L2 normalised for COSINE so it can be scored as inner product."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if metric == "COSINE":
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        vectors = vectors / np.maximum(norms, 1e-12)
+    return vectors
+
+
+def score_vectors(queries: np.ndarray, vectors: np.ndarray, metric: str) -> np.ndarray:
+    """Similarity of prepared queries and vectors, higher is better (negative squared distance for L2)."""
+    if metric == "L2":
+        return (
+            2 * queries @ vectors.T
+            - np.einsum("ij,ij->i", queries, queries)[:, None]
+            - np.einsum("ij,ij->i", vectors, vectors)[None, :]
+        )
+    return queries @ vectors.T
+
+
+def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Indices and scores of the k best columns of each row, best first."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.empty((scores.shape[0], 0)), np.empty((scores.shape[0], 0), dtype=np.int64)
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1)
+    return np.take_along_axis(candidate_scores, order, axis=1), np.take_along_axis(candidates, order, axis=1)
+
+
+def brute_force_search(
+    vectors: np.ndarray, queries: np.ndarray, k: int, metric: str = "COSINE", batch_size: int = 1024
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Exact top-k by scoring every vector, in query batches to bound the score matrix."""
+    vectors = prepare_vectors(vectors, metric)
+    queries = prepare_vectors(queries, metric)
+    all_scores, all_ids = [], []
+    for start in range(0, len(queries), batch_size):
+        scores, ids = top_k(score_vectors(queries[start: start + batch_size], vectors, metric), k)
+        all_scores.append(scores)
+        all_ids.append(ids)
+    return np.vstack(all_scores), np.vstack(all_ids)
+
+
+class IVFFlatIndex:
+    """
+    Inverted file index over uncompressed vectors, the NumPy counterpart of
+    Milvus IVF_FLAT.
+
+    Vectors are clustered into ``nlist`` k-means lists and stored contiguously
+    per list, so a search scores only the ``nprobe`` lists closest to the query
+    instead of the whole set.
+    """
+
+    def __init__(self, nlist: int = 1024, metric: str = "COSINE", n_iter: int = 10, seed: int = 0) -> None:
+        self.nlist = nlist
+        self.metric = metric
+        self.n_iter = n_iter
+        self.seed = seed
+        self.centroids: np.ndarray | None = None
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.offsets = np.zeros(nlist + 1, dtype=np.int64)
+
+    def train(self, vectors: np.ndarray) -> None:
+        """Fit the list centroids with k-means on a sample of at most 256 vectors per list."""
+        vectors = prepare_vectors(vectors, self.metric)
+        rng = np.random.default_rng(self.seed)
+        self.nlist = min(self.nlist, len(vectors))
+        sample = vectors[rng.choice(len(vectors), min(len(vectors), self.nlist * 256), replace=False)]
+        centroids = sample[rng.choice(len(sample), self.nlist, replace=False)].copy()
+
+        for _ in range(self.n_iter):
+            assignment = self._assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            counts = np.bincount(assignment, minlength=self.nlist)
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+            centroids = prepare_vectors(centroids, self.metric)
+
+        self.centroids = centroids
+        self.offsets = np.zeros(self.nlist + 1, dtype=np.int64)
+
+    def _assign(self, vectors: np.ndarray, centroids: np.ndarray, batch_size: int = 8192) -> np.ndarray:
+        return np.concatenate([
+            np.argmax(score_vectors(vectors[start: start + batch_size], centroids, self.metric), axis=1)
+            for start in range(0, len(vectors), batch_size)
+        ]) if len(vectors) else np.empty(0, dtype=np.int64)
+
+    def add(self, vectors: np.ndarray, ids: np.ndarray | None = None) -> None:
+        if self.centroids is None:
+            self.train(vectors)
+
+        vectors = prepare_vectors(vectors, self.metric)
+        ids = np.arange(len(self.ids), len(self.ids) + len(vectors)) if ids is None else np.asarray(ids, dtype=np.int64)
+        assignment = np.concatenate([np.repeat(np.arange(self.nlist), np.diff(self.offsets)), self._assign(vectors, self.centroids)])
+        all_vectors = np.vstack([self.vectors, vectors]) if len(self.vectors) else vectors
+        all_ids = np.concatenate([self.ids, ids])
+
+        # Keep each list contiguous so a probe is a single slice
+        order = np.argsort(assignment, kind="stable")
+        self.vectors = all_vectors[order]
+        self.ids = all_ids[order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=self.nlist))])
+
+    def search(self, queries: np.ndarray, k: int, nprobe: int = 16) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k scores and ids per query, -1 ids pad queries whose probed lists hold fewer than k vectors."""
+        queries = prepare_vectors(np.atleast_2d(queries), self.metric)
+        nprobe = min(nprobe, self.nlist)
+        probes = top_k(score_vectors(queries, self.centroids, self.metric), nprobe)[1]
+
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        for row, lists in enumerate(probes):
+            rows = np.concatenate([np.arange(self.offsets[i], self.offsets[i + 1]) for i in lists])
+            if not len(rows):
+                continue
+            row_scores, positions = top_k(score_vectors(queries[row: row + 1], self.vectors[rows], self.metric), k)
+            scores[row, :positions.shape[1]] = row_scores[0]
+            ids[row, :positions.shape[1]] = self.ids[rows[positions[0]]]
+        return scores, ids
+
+    @property
+    def nbytes(self) -> int:
+        centroids = 0 if self.centroids is None else self.centroids.nbytes
+        return self.vectors.nbytes + self.ids.nbytes + self.offsets.nbytes + centroids
+
+    def __len__(self) -> int:
+        return len(self.ids)
@@ -0,0 +1,20 @@
+from VideoAnalyzer.client_registry import client_registry
+from VideoAnalyzer.settings import config_settings
+from VideoAnalyzer.vector_db.vector_store import VectorStore
+
+
+def get_vector_store(backend: str | None = None) -> VectorStore:
+    """Process-wide vector store of the configured VECTOR_STORE_BACKEND."""
+    backend = (backend or config_settings.VECTOR_STORE_BACKEND).lower()
+
+    if backend == "embedded":
+        from VideoAnalyzer.vector_db.embedded_store import EmbeddedVectorStore
+
+        return client_registry.get(("vector_store", backend), EmbeddedVectorStore)
+
+    if backend == "milvus":
+        from VideoAnalyzer.vector_db.milvus_store import MilvusVectorStore
+
+        return client_registry.get(("vector_store", backend), MilvusVectorStore)
+
+    raise ValueError(f"Unsupported vector store backend: {backend}")
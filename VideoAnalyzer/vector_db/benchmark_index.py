@@ -0,0 +1,149 @@
+"""
+Recall/latency benchmark of the dense index profiles.
+
+Ground truth is exact NumPy brute force. The ``numpy`` backend runs FLAT and
+IVF_FLAT in process via ``vector_db.ann``; the ``milvus`` backend builds each
+profile in a Milvus instance, by default a local Milvus Lite file (which only
+implements FLAT, so other profiles measure FLAT there).
+
+    python -m VideoAnalyzer.vector_db.benchmark_index --backend numpy --profiles FLAT,IVF_FLAT
+    python -m VideoAnalyzer.vector_db.benchmark_index --backend milvus --uri http://localhost:19530
+"""
+import argparse
+import time
+from typing import Any, Callable
+import numpy as np
+from VideoAnalyzer.vector_db.ann import (
+    IVFFlatIndex,
+    brute_force_search,
+    prepare_vectors,
+    score_vectors,
+    top_k,
+)
+from VideoAnalyzer.vector_db.index_profiles import (
+    INDEX_PROFILES,
+    get_index_profile,
+    estimate_index_memory_bytes,
+)
+
+
+def make_dataset(num_vectors: int, num_queries: int, dim: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """Clustered Gaussian vectors, closer to embedding distributions than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, num_vectors // 1000), dim)).astype(np.float32)
+    vectors = centers[rng.integers(len(centers), size=num_vectors)] + 0.3 * rng.normal(size=(num_vectors, dim))
+    queries = centers[rng.integers(len(centers), size=num_queries)] + 0.3 * rng.normal(size=(num_queries, dim))
+    return vectors.astype(np.float32), queries.astype(np.float32)
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    return float(np.mean([len(set(f[:k]) & set(t)) / k for f, t in zip(found, truth)]))
+
+
+def measure(search: Callable[[np.ndarray], np.ndarray], queries: np.ndarray) -> tuple[np.ndarray, float]:
+    started = time.perf_counter()
+    found = np.vstack([search(query[None, :]) for query in queries])
+    return found, len(queries) / (time.perf_counter() - started)
+
+
+def run_numpy(profile_name: str, vectors: np.ndarray, queries: np.ndarray, k: int, metric: str) -> dict[str, Any] | None:
+    profile = get_index_profile(profile_name)
+    started = time.perf_counter()
+    if profile["index_type"] == "FLAT":
+        prepared = prepare_vectors(vectors, metric)
+        search = lambda query: top_k(score_vectors(prepare_vectors(query, metric), prepared, metric), k)[1]
+        nbytes = prepared.nbytes
+    elif profile["index_type"] == "IVF_FLAT":
+        index = IVFFlatIndex(nlist=profile["build_params"].get("nlist", 1024), metric=metric)
+        index.add(vectors)
+        nprobe = profile["search_params"].get("nprobe", 16)
+        search = lambda query: index.search(query, k, nprobe)[1]
+        nbytes = index.nbytes
+    else:
+        return None
+    build_seconds = time.perf_counter() - started
+
+    found, qps = measure(search, queries)
+    return {"found": found, "qps": qps, "build_seconds": build_seconds, "memory_bytes": nbytes}
+
+
+def run_milvus(
+    profile_name: str, vectors: np.ndarray, queries: np.ndarray, k: int, metric: str, uri: str
+) -> dict[str, Any]:
+    from pymilvus import DataType, MilvusClient
+
+    profile = get_index_profile(profile_name)
+    client = MilvusClient(uri=uri)
+    collection_name = f"index_benchmark_{profile_name.lower()}"
+    if client.has_collection(collection_name):
+        client.drop_collection(collection_name)
+
+    schema = client.create_schema(auto_id=False)
+    schema.add_field("id", DataType.INT64, is_primary=True)
+    schema.add_field("vector", DataType.FLOAT_VECTOR, dim=vectors.shape[1])
+    index_params = client.prepare_index_params()
+    index_params.add_index(
+        field_name="vector", index_type=profile["index_type"], metric_type=metric, params=profile["build_params"]
+    )
+
+    started = time.perf_counter()
+    client.create_collection(collection_name, schema=schema, index_params=index_params)
+    for start in range(0, len(vectors), 10000):
+        client.insert(
+            collection_name,
+            [{"id": start + i, "vector": vector.tolist()} for i, vector in enumerate(vectors[start: start + 10000])],
+        )
+    client.flush(collection_name)
+    client.load_collection(collection_name)
+    build_seconds = time.perf_counter() - started
+
+    search_params = {"metric_type": metric, "params": profile["search_params"]}
+
+    def search(query: np.ndarray) -> np.ndarray:
+        hits = client.search(collection_name, data=query.tolist(), limit=k, search_params=search_params)[0]
+        return np.array([hit["id"] for hit in hits] + [-1] * (k - len(hits)))
+
+    found, qps = measure(search, queries)
+    client.drop_collection(collection_name)
+    return {
+        "found": found,
+        "qps": qps,
+        "build_seconds": build_seconds,
+        "memory_bytes": estimate_index_memory_bytes(profile_name, *vectors.shape),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", choices=["numpy", "milvus"], default="numpy")
+    parser.add_argument("--uri", default="./index_benchmark.db", help="Milvus URI, a .db path uses Milvus Lite")
+    parser.add_argument("--profiles", default=",".join(INDEX_PROFILES))
+    parser.add_argument("--num-vectors", type=int, default=100000)
+    parser.add_argument("--num-queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--metric", choices=["COSINE", "IP", "L2"], default="COSINE")
+    args = parser.parse_args()
+
+    vectors, queries = make_dataset(args.num_vectors, args.num_queries, args.dim)
+    truth = brute_force_search(vectors, queries, args.k, args.metric)[1]
+
+    print(f"{args.backend}: {args.num_vectors} x {args.dim} vectors, {args.num_queries} queries, k={args.k}, {args.metric}")
+    print(f"{'profile':<10} {'recall@k':>9} {'QPS':>10} {'build s':>9} {'memory MB':>10}")
+    for profile_name in args.profiles.upper().split(","):
+        if args.backend == "numpy":
+            result = run_numpy(profile_name, vectors, queries, args.k, args.metric)
+        else:
+            result = run_milvus(profile_name, vectors, queries, args.k, args.metric, args.uri)
+        if result is None:
+            print(f"{profile_name:<10} {'no in-process stand-in, use --backend milvus':>40}")
+            continue
+        print(
+            f"{profile_name:<10} {recall_at_k(result['found'], truth):>9.3f} {result['qps']:>10.1f}"
+            f" {result['build_seconds']:>9.2f} {result['memory_bytes'] / (1024 * 1024):>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
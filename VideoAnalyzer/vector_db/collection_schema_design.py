@@ -1,44 +1,67 @@
-from langchain_ollama import OllamaEmbeddings
 from VideoAnalyzer.settings import config_settings
 from loguru import logger
 from pymilvus import (
-    Collection,
     CollectionSchema,
     DataType,
     FieldSchema,
+    Function,
+    FunctionType,
 )
-from chat_with_summarization.vector_db.extract_dense_emb_dimension_size import dense_embedding_length
 
-schema = None
 
+def get_collection_schema(dense_embedding_length: int) -> CollectionSchema:
+    """
+    Collection schema with a scalar VARCHAR namespace field.
 
-def get_collection_schema():
+    Each namespace (tenant) is stored in its own partition, see
+    ``vector_db.partitions``; the scalar field keeps the tenant filterable and
+    lets inserts be routed to the matching partition. Sparse vectors are
+    produced server side by a BM25 function over the text field.
+    """
     try:
         fields =[
             FieldSchema(
-                name=settings.PRIMARY_KEY_FIELD_SCHEMA_NAME,
+                name=config_settings.PRIMARY_KEY_FIELD_SCHEMA_NAME,
                 dtype=DataType.VARCHAR,
                 is_primary=True,
-                auto_id=settings.COLLECTION_SCHEMA_AUTO_ID_STATUS,
-                max_length=settings.COLLECTION_SCHEMA_MAX_LENGTH,
+                auto_id=config_settings.COLLECTION_SCHEMA_AUTO_ID_STATUS,
+                max_length=config_settings.COLLECTION_SCHEMA_MAX_LENGTH,
             ),
-            FieldSchema(name=settings.DENSE_FIELD_SCHEMA_NAME, dtype=DataType.FLOAT_VECTOR, dim=dense_embedding_length),
-            FieldSchema(name=settings.SPARSE_FIELD_SCHEMA_NAME, dtype=DataType.SPARSE_FLOAT_VECTOR),
-            FieldSchema(name=settings.TEXT_FIELD_SCHEMA_NAME, dtype=DataType.VARCHAR, max_length=settings.SCHEMA_MAX_LENGTH),
-            FieldSchema(name=settings.PARTITION_FIELD_SCHEMA_NAME, dtype=DataType.JSON, max_length=settings.SCHEMA_MAX_LENGTH),
-            FieldSchema(name=settings.TIMESTAMP_FIELD_SCHEMA_NAME, dtype=DataType.JSON, max_length=settings.SCHEMA_MAX_LENGTH),
-            FieldSchema(name=settings.COLLECTION_FIELD_SCHEMA_NAME, dtype=DataType.JSON, max_length=settings.SCHEMA_MAX_LENGTH)
+            FieldSchema(name=config_settings.DENSE_FIELD_SCHEMA_NAME, dtype=DataType.FLOAT_VECTOR, dim=dense_embedding_length),
+            FieldSchema(name=config_settings.SPARSE_FIELD_SCHEMA_NAME, dtype=DataType.SPARSE_FLOAT_VECTOR),
+            FieldSchema(
+                name=config_settings.TEXT_FIELD_SCHEMA_NAME,
+                dtype=DataType.VARCHAR,
+                max_length=config_settings.SCHEMA_MAX_LENGTH,
+                enable_analyzer=True,
+            ),
+            FieldSchema(
+                name=config_settings.PARTITION_FIELD_SCHEMA_NAME,
+                dtype=DataType.VARCHAR,
+                max_length=config_settings.COLLECTION_SCHEMA_MAX_LENGTH,
+            ),
+            FieldSchema(name=config_settings.TIMESTAMP_FIELD_SCHEMA_NAME, dtype=DataType.JSON, nullable=True),
+            FieldSchema(name=config_settings.COLLECTION_FIELD_SCHEMA_NAME, dtype=DataType.JSON, nullable=True)
         ]
 
         schema = CollectionSchema(fields=fields, enable_dynamic_field=True)
+        schema.add_function(
+            Function(
+                name="text_bm25",
+                function_type=FunctionType.BM25,
+                input_field_names=[config_settings.TEXT_FIELD_SCHEMA_NAME],
+                output_field_names=[config_settings.SPARSE_FIELD_SCHEMA_NAME],
+            )
+        )
         return schema
 
     except Exception as e:
         logger.error(f"Error {e}")
-        return e
+        raise e
+
+
+if __name__ == "__main__":
+    from VideoAnalyzer.vector_db.dense_embedding_len import dense_embedding_length
 
-try:
-    schema_design = get_collection_schema()
+    schema_design = get_collection_schema(dense_embedding_length)
     logger.debug(f"Schema Created : \n{schema_design}")
-except Exception as e:
-    logger.error(f"Error while creating schema {e}")
\ No newline at end of file
@@ -0,0 +1,468 @@
+import json
+import math
+import os
+import re
+import threading
+from typing import Any, Iterable
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from loguru import logger
+from VideoAnalyzer.settings import config_settings
+from VideoAnalyzer.vector_db.ann import IVFFlatIndex, prepare_vectors, score_vectors, top_k
+from VideoAnalyzer.vector_db.rerank import SearchHits, get_reranker, postprocess_hits, rrf_fuse, weighted_fuse
+from VideoAnalyzer.vector_db.search_cache import invalidate_search_cache
+from VideoAnalyzer.vector_db.vector_store import VectorStore, matches_filters
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased word tokens, close to the Milvus standard analyzer used by the BM25 function."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SparseIndex:
+    """
+    BM25 postings in a term-major CSR layout.
+
+    ``indptr[t]:indptr[t + 1]`` slices the row ids and term frequencies of term
+    ``t``. Rows added since the last merge are kept in a small in-memory delta
+    and folded into the CSR arrays once it grows, so appends stay cheap.
+    """
+
+    def __init__(self) -> None:
+        self.vocabulary: dict[str, int] = {}
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.rows = np.empty(0, dtype=np.int64)
+        self.term_frequencies = np.empty(0, dtype=np.float32)
+        self.doc_lengths = np.empty(0, dtype=np.float32)
+        self._delta: dict[int, tuple[list[int], list[float]]] = {}
+        self._delta_postings = 0
+        self._delta_lengths: list[float] = []
+
+    def add(self, row: int, tokens: list[str]) -> None:
+        counts: dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        for token, count in counts.items():
+            term_id = self.vocabulary.setdefault(token, len(self.vocabulary))
+            rows, frequencies = self._delta.setdefault(term_id, ([], []))
+            rows.append(row)
+            frequencies.append(count)
+        self._delta_postings += len(counts)
+        self._delta_lengths.append(len(tokens))
+
+    @property
+    def delta_size(self) -> int:
+        return self._delta_postings
+
+    def merge_delta(self) -> None:
+        if not self._delta_lengths:
+            return
+
+        num_terms = len(self.vocabulary)
+        base_counts = np.diff(self.indptr)
+        base_counts = np.concatenate([base_counts, np.zeros(num_terms - len(base_counts), dtype=np.int64)])
+        delta_counts = np.zeros(num_terms, dtype=np.int64)
+        for term_id, (rows, _) in self._delta.items():
+            delta_counts[term_id] = len(rows)
+
+        indptr = np.concatenate([[0], np.cumsum(base_counts + delta_counts)])
+        rows = np.empty(indptr[-1], dtype=np.int64)
+        frequencies = np.empty(indptr[-1], dtype=np.float32)
+        # Base postings of each term first, then its delta postings, rows stay ascending
+        base_terms = np.repeat(np.arange(len(base_counts)), base_counts)
+        base_positions = indptr[base_terms] + (np.arange(len(self.rows)) - self.indptr[base_terms])
+        rows[base_positions] = self.rows
+        frequencies[base_positions] = self.term_frequencies
+        for term_id, (delta_rows, delta_frequencies) in self._delta.items():
+            start = indptr[term_id] + base_counts[term_id]
+            rows[start: start + len(delta_rows)] = delta_rows
+            frequencies[start: start + len(delta_rows)] = delta_frequencies
+
+        self.indptr, self.rows, self.term_frequencies = indptr, rows, frequencies
+        self.doc_lengths = np.concatenate([self.doc_lengths, np.asarray(self._delta_lengths, dtype=np.float32)])
+        self._delta, self._delta_postings, self._delta_lengths = {}, 0, []
+
+    def _postings(self, term_id: int) -> tuple[np.ndarray, np.ndarray]:
+        rows = self.rows[self.indptr[term_id]: self.indptr[term_id + 1]] if term_id + 1 < len(self.indptr) else self.rows[:0]
+        frequencies = (
+            self.term_frequencies[self.indptr[term_id]: self.indptr[term_id + 1]]
+            if term_id + 1 < len(self.indptr) else self.term_frequencies[:0]
+        )
+        if term_id in self._delta:
+            delta_rows, delta_frequencies = self._delta[term_id]
+            rows = np.concatenate([rows, np.asarray(delta_rows, dtype=np.int64)])
+            frequencies = np.concatenate([frequencies, np.asarray(delta_frequencies, dtype=np.float32)])
+        return rows, frequencies
+
+    def search(self, tokens: list[str], mask: np.ndarray, k1: float = 1.2, b: float = 0.75) -> SearchHits:
+        """BM25 scores of the rows in mask containing any query token."""
+        doc_lengths = np.concatenate([self.doc_lengths, np.asarray(self._delta_lengths, dtype=np.float32)])
+        num_docs = int(mask.sum())
+        if not num_docs:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        average_length = float(doc_lengths[mask[:len(doc_lengths)]].mean()) or 1.0
+
+        all_rows, all_scores = [], []
+        for token in set(tokens):
+            if (term_id := self.vocabulary.get(token)) is None:
+                continue
+            rows, frequencies = self._postings(term_id)
+            keep = mask[rows]
+            rows, frequencies = rows[keep], frequencies[keep]
+            if not len(rows):
+                continue
+            idf = math.log(1 + (num_docs - len(rows) + 0.5) / (len(rows) + 0.5))
+            norm = k1 * (1 - b + b * doc_lengths[rows] / average_length)
+            all_rows.append(rows)
+            all_scores.append(idf * frequencies * (k1 + 1) / (frequencies + norm))
+
+        if not all_rows:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        rows, inverse = np.unique(np.concatenate(all_rows), return_inverse=True)
+        return rows, np.bincount(inverse, weights=np.concatenate(all_scores))
+
+    def save(self, path: str) -> None:
+        np.savez(
+            path,
+            indptr=self.indptr,
+            rows=self.rows,
+            term_frequencies=self.term_frequencies,
+            doc_lengths=self.doc_lengths,
+        )
+
+    def load(self, path: str, vocabulary: dict[str, int]) -> None:
+        with np.load(path) as data:
+            self.indptr = data["indptr"]
+            self.rows = data["rows"]
+            self.term_frequencies = data["term_frequencies"]
+            self.doc_lengths = data["doc_lengths"]
+        self.vocabulary = vocabulary
+
+
+class EmbeddedVectorStore(VectorStore):
+    """
+    Single-node vector store kept in a local directory, for small deployments,
+    offline use and CI.
+
+    * dense vectors live in a memory-mapped ``.npy`` file that grows by doubling;
+    * BM25 postings live in a term-major CSR index (``SparseIndex``);
+    * text and metadata are appended to a JSONL file, with metadata and line
+      offsets kept in memory and text read on demand;
+    * deletes set tombstones, rows are rewritten once a third of them are dead.
+
+    Search is vectorized brute force over the live rows of the namespaces,
+    switching to an in-memory IVF index above ``EMBEDDED_IVF_THRESHOLD`` rows.
+    Dense and BM25 hits are fused with the same RRF / weighted ranker semantics
+    as Milvus ``hybrid_search``. The store is safe for threads of one process.
+    """
+
+    MANIFEST_FILE = "manifest.json"
+    DENSE_FILE = "dense.npy"
+    RECORDS_FILE = "records.jsonl"
+    ALIVE_FILE = "alive.npy"
+    SPARSE_FILE = "sparse.npz"
+    VOCABULARY_FILE = "vocabulary.json"
+
+    def __init__(self, directory: str | None = None, embedding: Embeddings | None = None, metric: str | None = None) -> None:
+        self.directory = directory or config_settings.EMBEDDED_STORE_DIR
+        if embedding is None:
+            # Imported here so offline deployments and CI can pass their own embeddings without an OpenAI key
+            from VideoAnalyzer.vector_db.utils import dense_embed_func as embedding
+        self.embedding = embedding
+        self.metric = (metric or config_settings.DENSE_METRIC_TYPE).upper()
+        self._lock = threading.RLock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._open()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _open(self) -> None:
+        manifest_path = self._path(self.MANIFEST_FILE)
+        manifest = {"count": 0, "dim": 0, "sparse_rows": 0}
+        if os.path.isfile(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        self.count = manifest["count"]
+        self.dim = manifest["dim"]
+        self.dense = np.load(self._path(self.DENSE_FILE), mmap_mode="r+") if self.dim else None
+
+        self.ids: list[str] = []
+        self.namespaces: list[str] = []
+        self.metadatas: list[dict[str, Any]] = []
+        self.offsets: list[int] = []
+        self.id_rows: dict[str, int] = {}
+        records_path = self._path(self.RECORDS_FILE)
+        if os.path.isfile(records_path):
+            with open(records_path, "rb") as f:
+                offset = 0
+                for _ in range(self.count):
+                    line = f.readline()
+                    record = json.loads(line)
+                    self._append_record(record, offset)
+                    offset += len(line)
+            # Drop lines of a write that never reached the manifest
+            with open(records_path, "r+b") as f:
+                f.truncate(offset)
+
+        alive_path = self._path(self.ALIVE_FILE)
+        self.alive = np.load(alive_path)[:self.count] if os.path.isfile(alive_path) else np.ones(self.count, dtype=bool)
+        for row in np.flatnonzero(~self.alive):
+            self.id_rows.pop(self.ids[row], None)
+
+        self.sparse = SparseIndex()
+        if manifest["sparse_rows"]:
+            with open(self._path(self.VOCABULARY_FILE)) as f:
+                self.sparse.load(self._path(self.SPARSE_FILE), json.load(f))
+        for row in range(manifest["sparse_rows"], self.count):
+            self.sparse.add(row, tokenize(self._read_text(row)))
+
+        self._namespace_codes: dict[str, int] = {}
+        self.namespace_ids = np.asarray(
+            [self._namespace_code(namespace) for namespace in self.namespaces], dtype=np.int32
+        )
+        self._ivf: IVFFlatIndex | None = None
+        self._ivf_rows = 0
+        self._changes_since_ivf = 0
+        logger.info(f"Opened embedded vector store at {self.directory} with {int(self.alive.sum())} live rows")
+
+    def _append_record(self, record: dict[str, Any], offset: int) -> None:
+        row = len(self.ids)
+        self.ids.append(record["id"])
+        self.namespaces.append(record["namespace"])
+        self.metadatas.append(record["metadata"])
+        self.offsets.append(offset)
+        self.id_rows[record["id"]] = row
+
+    def _namespace_code(self, namespace: str) -> int:
+        return self._namespace_codes.setdefault(namespace, len(self._namespace_codes))
+
+    def _read_text(self, row: int) -> str:
+        with open(self._path(self.RECORDS_FILE), "rb") as f:
+            f.seek(self.offsets[row])
+            return json.loads(f.readline())["text"]
+
+    def _ensure_capacity(self, rows: int, dim: int) -> None:
+        if self.dense is not None and len(self.dense) >= rows:
+            return
+        capacity = max(1024, 2 ** math.ceil(math.log2(rows)))
+        temp_path = self._path(f"{self.DENSE_FILE}.tmp.npy")
+        dense = np.lib.format.open_memmap(temp_path, mode="w+", dtype=np.float32, shape=(capacity, dim))
+        if self.dense is not None:
+            dense[:self.count] = self.dense[:self.count]
+        dense.flush()
+        del dense
+        os.replace(temp_path, self._path(self.DENSE_FILE))
+        self.dense = np.load(self._path(self.DENSE_FILE), mmap_mode="r+")
+        self.dim = dim
+
+    def _save_alive(self) -> None:
+        temp_path = self._path(f"{self.ALIVE_FILE}.tmp.npy")
+        np.save(temp_path, self.alive)
+        os.replace(temp_path, self._path(self.ALIVE_FILE))
+
+    def _save_sparse(self) -> None:
+        self.sparse.merge_delta()
+        temp_path = self._path(f"{self.SPARSE_FILE}.tmp.npz")
+        self.sparse.save(temp_path)
+        os.replace(temp_path, self._path(self.SPARSE_FILE))
+        with open(self._path(f"{self.VOCABULARY_FILE}.tmp"), "w") as f:
+            json.dump(self.sparse.vocabulary, f)
+        os.replace(self._path(f"{self.VOCABULARY_FILE}.tmp"), self._path(self.VOCABULARY_FILE))
+
+    def _write_manifest(self) -> None:
+        temp_path = self._path(f"{self.MANIFEST_FILE}.tmp")
+        with open(temp_path, "w") as f:
+            # Rows past sparse_rows are re-tokenized from the records when the store is opened
+            json.dump({"count": self.count, "dim": self.dim, "sparse_rows": len(self.sparse.doc_lengths)}, f)
+        os.replace(temp_path, self._path(self.MANIFEST_FILE))
+
+    def add_documents(self, documents: list[Document], namespace: str, ids: list[str] | None = None) -> list[str]:
+        if not documents:
+            return []
+
+        vectors = prepare_vectors(self.embedding.embed_documents([doc.page_content for doc in documents]), self.metric)
+
+        with self._lock:
+            ids = ids or [f"{namespace}-{self.count + i}" for i in range(len(documents))]
+            # Re-inserting an ID replaces the stored chunk
+            for chunk_id in ids:
+                if (row := self.id_rows.pop(chunk_id, None)) is not None:
+                    self.alive[row] = False
+
+            start = self.count
+            self._ensure_capacity(start + len(documents), vectors.shape[1])
+            self.dense[start: start + len(documents)] = vectors
+            self.dense.flush()
+
+            with open(self._path(self.RECORDS_FILE), "ab") as f:
+                offset = f.tell()
+                for chunk_id, document in zip(ids, documents):
+                    record = {"id": chunk_id, "namespace": namespace, "text": document.page_content, "metadata": document.metadata}
+                    line = (json.dumps(record) + "\n").encode("utf-8")
+                    f.write(line)
+                    self._append_record(record, offset)
+                    offset += len(line)
+
+            for row, document in enumerate(documents, start):
+                self.sparse.add(row, tokenize(document.page_content))
+            self.alive = np.concatenate([self.alive, np.ones(len(documents), dtype=bool)])
+            self.namespace_ids = np.concatenate(
+                [self.namespace_ids, np.full(len(documents), self._namespace_code(namespace), dtype=np.int32)]
+            )
+            self.count += len(documents)
+            self._changes_since_ivf += len(documents)
+
+            if self.sparse.delta_size > max(10000, len(self.sparse.rows) // 10):
+                self._save_sparse()
+            self._save_alive()
+            self._write_manifest()
+
+        invalidate_search_cache(namespace)
+        logger.info(f"Added {len(documents)} chunks to the embedded store in namespace: {namespace}")
+        return list(ids)
+
+    def delete(self, ids: Iterable[str], namespace: str | None = None) -> int:
+        ids = list(ids)
+        with self._lock:
+            for chunk_id in ids:
+                row = self.id_rows.get(chunk_id)
+                if row is not None and (namespace is None or self.namespaces[row] == namespace):
+                    self.alive[row] = False
+                    del self.id_rows[chunk_id]
+                    self._changes_since_ivf += 1
+            self._save_alive()
+
+            dead = self.count - int(self.alive.sum())
+            if dead > 1000 and dead > self.count // 3:
+                self.compact()
+        invalidate_search_cache(namespace)
+        return len(ids)
+
+    def compact(self) -> None:
+        """Rewrite the store with live rows only."""
+        with self._lock:
+            live_rows = np.flatnonzero(self.alive)
+            logger.info(f"Compacting embedded store: keeping {len(live_rows)} of {self.count} rows")
+            records = []
+            with open(self._path(self.RECORDS_FILE), "rb") as f:
+                for row in live_rows:
+                    f.seek(self.offsets[row])
+                    records.append(f.readline())
+            vectors = np.array(self.dense[live_rows]) if len(live_rows) else None
+
+            with open(self._path(f"{self.RECORDS_FILE}.tmp"), "wb") as f:
+                f.writelines(records)
+            os.replace(self._path(f"{self.RECORDS_FILE}.tmp"), self._path(self.RECORDS_FILE))
+            for name in (self.DENSE_FILE, self.ALIVE_FILE, self.SPARSE_FILE, self.VOCABULARY_FILE):
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+
+            self.dense, self.dim = None, 0
+            if vectors is not None:
+                self._ensure_capacity(len(vectors), vectors.shape[1])
+                self.dense[:len(vectors)] = vectors
+                self.dense.flush()
+            self.count = len(live_rows)
+            with open(self._path(self.MANIFEST_FILE), "w") as f:
+                json.dump({"count": self.count, "dim": self.dim, "sparse_rows": 0}, f)
+            self._open()
+            self._save_sparse()
+            self._save_alive()
+            self._write_manifest()
+
+    def get_chunk_ids(self, file_name: str, namespace: str) -> set[str]:
+        with self._lock:
+            return {
+                self.ids[row] for row in np.flatnonzero(self.alive)
+                if self.namespaces[row] == namespace and self.metadatas[row].get("file_name") == file_name
+            }
+
+    def _search_mask(self, namespaces: list[str] | None, filters: dict[str, Any] | None) -> np.ndarray:
+        mask = self.alive.copy()
+        if namespaces:
+            codes = [self._namespace_codes[namespace] for namespace in namespaces if namespace in self._namespace_codes]
+            mask &= np.isin(self.namespace_ids, codes)
+        if filters:
+            for row in np.flatnonzero(mask):
+                mask[row] = matches_filters(self.metadatas[row], filters)
+        return mask
+
+    def _get_ivf(self) -> IVFFlatIndex | None:
+        live = int(self.alive.sum())
+        if live < config_settings.EMBEDDED_IVF_THRESHOLD:
+            return None
+        if self._ivf is None or self._changes_since_ivf > 0.1 * max(1, len(self._ivf)):
+            live_rows = np.flatnonzero(self.alive)
+            self._ivf = IVFFlatIndex(nlist=config_settings.EMBEDDED_IVF_NLIST, metric=self.metric)
+            self._ivf.add(self.dense[live_rows], ids=live_rows)
+            self._ivf_rows = self.count
+            self._changes_since_ivf = 0
+            logger.info(f"Built IVF index over {len(live_rows)} rows of the embedded store")
+        return self._ivf
+
+    def _dense_search(self, query_vector: np.ndarray, mask: np.ndarray, k: int) -> SearchHits:
+        rows = np.flatnonzero(mask)
+        ivf = self._get_ivf()
+        if ivf is not None:
+            # Oversample since hits outside the mask are dropped, rows added after the build are scored exactly
+            scores, ivf_rows = ivf.search(query_vector, k * 4, config_settings.EMBEDDED_IVF_NPROBE)
+            keep = (ivf_rows[0] >= 0) & mask[np.maximum(ivf_rows[0], 0)]
+            recent = rows[rows >= self._ivf_rows]
+            recent_scores = score_vectors(query_vector, self.dense[recent], self.metric)[0] if len(recent) else np.empty(0)
+            candidates = np.concatenate([ivf_rows[0][keep], recent])
+            candidate_scores = np.concatenate([scores[0][keep], recent_scores])
+            if len(candidates) >= min(k, len(rows)):
+                best_scores, positions = top_k(candidate_scores[None, :], k)
+                return candidates[positions[0]], best_scores[0]
+
+        if not len(rows):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        best_scores, positions = top_k(score_vectors(query_vector, self.dense[rows], self.metric), k)
+        return rows[positions[0]], best_scores[0]
+
+    @property
+    def cache_scope(self) -> str:
+        return f"embedded:{self.directory}"
+
+    def _hybrid_search(
+            self,
+            query: str,
+            namespaces: list[str] | None,
+            k: int,
+            filters: dict[str, Any] | None,
+    ) -> list[Document]:
+        query_vector = prepare_vectors(np.asarray([self.embedding.embed_query(query)]), self.metric)
+        limit = max(k, config_settings.HYBRID_CANDIDATE_LIMIT)
+
+        with self._lock:
+            if not self.count:
+                return []
+            mask = self._search_mask(namespaces, filters)
+            dense_rows, dense_scores = self._dense_search(query_vector, mask, limit)
+            sparse_rows, sparse_scores = self.sparse.search(tokenize(query), mask)
+            if len(sparse_rows):
+                order = np.argsort(-sparse_scores, kind="stable")[:limit]
+                sparse_rows, sparse_scores = sparse_rows[order], sparse_scores[order]
+
+            if self.metric == "L2":
+                # Milvus reports L2 as a distance
+                dense_scores = -dense_scores
+            hits = [(dense_rows, dense_scores), (sparse_rows, sparse_scores)]
+            if config_settings.HYBRID_RANKER == "weighted":
+                rows, scores = weighted_fuse(hits, config_settings.HYBRID_WEIGHTS, [self.metric, "BM25"], limit)
+            else:
+                rows, scores = rrf_fuse(hits, limit, config_settings.HYBRID_RRF_K)
+
+            candidates = [
+                Document(
+                    page_content=self._read_text(int(row)),
+                    metadata=self.metadatas[row] | {"id": self.ids[row], "score": float(score)},
+                )
+                for row, score in zip(rows, scores)
+            ]
+
+        return postprocess_hits(query, candidates, k, reranker=get_reranker())
@@ -0,0 +1,50 @@
+import hashlib
+import json
+from collections import Counter
+from typing import Tuple
+from langchain_core.documents import Document
+from loguru import logger
+
+
+def compute_chunk_ids(documents: list[Document], file_name: str) -> list[str]:
+    """
+    Content-hash IDs for the chunks of a file.
+
+    The hash covers the file name, the chunk text and its position (time range
+    for transcripts, page for PDFs), so an unchanged chunk keeps its ID across
+    re-uploads while an edited one gets a new ID. Identical chunks within a
+    file are told apart by their occurrence number.
+    """
+    occurrences: Counter[str] = Counter()
+    ids = []
+    for document in documents:
+        content = json.dumps(
+            [
+                file_name,
+                document.page_content,
+                document.metadata.get("start_time"),
+                document.metadata.get("end_time"),
+                document.metadata.get("page"),
+            ]
+        )
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        occurrences[digest] += 1
+        ids.append(f"{digest[:48]}-{occurrences[digest] - 1}")
+    return ids
+
+
+def diff_chunks(
+    documents: list[Document], ids: list[str], stored_ids: set[str]
+) -> Tuple[list[Document], list[str], list[str]]:
+    """Split a re-ingested file into chunks to insert and stored chunk IDs to delete."""
+    new_documents, new_ids = [], []
+    for document, chunk_id in zip(documents, ids):
+        if chunk_id not in stored_ids:
+            new_documents.append(document)
+            new_ids.append(chunk_id)
+
+    stale_ids = sorted(stored_ids.difference(ids))
+    logger.info(
+        f"Chunk diff: {len(new_ids)} new, {len(ids) - len(new_ids)} unchanged, {len(stale_ids)} stale"
+    )
+    return new_documents, new_ids, stale_ids
@@ -0,0 +1,82 @@
+from typing import Any, TypedDict
+from VideoAnalyzer.settings import config_settings
+
+
+class IndexProfile(TypedDict):
+    index_type: str
+    build_params: dict[str, Any]
+    search_params: dict[str, Any]
+
+
+# Build and search parameters that go together, e.g. HNSW ef must be >= top_k
+INDEX_PROFILES: dict[str, IndexProfile] = {
+    "FLAT": {"index_type": "FLAT", "build_params": {}, "search_params": {}},
+    "HNSW": {
+        "index_type": "HNSW",
+        "build_params": {"M": 16, "efConstruction": 200},
+        "search_params": {"ef": 64},
+    },
+    "IVF_FLAT": {
+        "index_type": "IVF_FLAT",
+        "build_params": {"nlist": 1024},
+        "search_params": {"nprobe": 16},
+    },
+    "IVF_PQ": {
+        "index_type": "IVF_PQ",
+        "build_params": {"nlist": 1024, "m": 16, "nbits": 8},
+        "search_params": {"nprobe": 32},
+    },
+    "DISKANN": {"index_type": "DISKANN", "build_params": {}, "search_params": {"search_list": 100}},
+}
+
+
+def get_index_profile(name: str | None = None) -> IndexProfile:
+    """Named dense index profile with the build/search parameter overrides from Settings applied."""
+    name = (name or config_settings.DENSE_INDEX_TYPE).upper()
+    if name not in INDEX_PROFILES:
+        raise ValueError(f"Unknown index profile: {name}. Supported profiles are: {', '.join(INDEX_PROFILES)}")
+
+    profile = INDEX_PROFILES[name]
+    return {
+        "index_type": profile["index_type"],
+        "build_params": profile["build_params"] | config_settings.DENSE_INDEX_PARAMS,
+        "search_params": profile["search_params"] | config_settings.DENSE_SEARCH_PARAMS,
+    }
+
+
+def get_dense_index_params(name: str | None = None) -> dict[str, Any]:
+    profile = get_index_profile(name)
+    return {
+        "index_type": profile["index_type"],
+        "metric_type": config_settings.DENSE_METRIC_TYPE,
+        "params": profile["build_params"],
+    }
+
+
+def get_dense_search_params(name: str | None = None) -> dict[str, Any]:
+    """Search params for the dense AnnSearchRequest, e.g. the retriever's field_search_params."""
+    return {"metric_type": config_settings.DENSE_METRIC_TYPE, "params": get_index_profile(name)["search_params"]}
+
+
+def get_sparse_search_params() -> dict[str, Any]:
+    return {"metric_type": config_settings.SPARSE_METRIC_TYPE, "params": {"drop_ratio_search": 0.0}}
+
+
+def estimate_index_memory_bytes(name: str, num_vectors: int, dim: int) -> int:
+    """Rough resident memory of a dense index, used to compare profiles before building them."""
+    profile = get_index_profile(name)
+    params = profile["build_params"]
+    raw = num_vectors * dim * 4
+
+    if profile["index_type"] == "HNSW":
+        # Level 0 links (2 * M) plus upper layers, 4 byte neighbour ids
+        return raw + num_vectors * params.get("M", 16) * 2 * 4 * 2
+    if profile["index_type"] == "IVF_FLAT":
+        return raw + params.get("nlist", 1024) * dim * 4 + num_vectors * 8
+    if profile["index_type"] == "IVF_PQ":
+        codes = num_vectors * params.get("m", 16) * params.get("nbits", 8) // 8
+        return codes + params.get("nlist", 1024) * dim * 4 + num_vectors * 8
+    if profile["index_type"] == "DISKANN":
+        # Vectors and graph stay on disk, PQ codes of roughly dim / 4 bytes per vector are cached in memory
+        return num_vectors * max(1, dim // 4)
+    return raw
@@ -0,0 +1,103 @@
+import json
+from typing import Any, Iterable
+from langchain_core.documents import Document
+from pymilvus import AnnSearchRequest, RRFRanker, WeightedRanker
+from VideoAnalyzer.settings import config_settings
+from VideoAnalyzer.vector_db.index_profiles import get_dense_search_params, get_sparse_search_params
+from VideoAnalyzer.vector_db.partitions import get_partition_router, partition_name_for
+from VideoAnalyzer.vector_db.push_vector import get_collection, push_to_database, delete_from_database
+from VideoAnalyzer.vector_db.rerank import get_reranker, postprocess_hits
+from VideoAnalyzer.vector_db.utils import dense_embed_func
+from VideoAnalyzer.vector_db.vector_store import VectorStore, build_filter_expr
+
+
+class MilvusVectorStore(VectorStore):
+    """Vector store on a Milvus collection with one partition per namespace."""
+
+    def __init__(self, index_name: str | None = None) -> None:
+        self.index_name = index_name or config_settings.INDEX_NAME
+
+    def add_documents(self, documents: list[Document], namespace: str, ids: list[str] | None = None) -> list[str]:
+        return push_to_database(documents, self.index_name, namespace, ids=ids)
+
+    def delete(self, ids: Iterable[str], namespace: str | None = None) -> int:
+        return delete_from_database(ids, self.index_name, namespace)
+
+    def get_chunk_ids(self, file_name: str, namespace: str) -> set[str]:
+        collection = get_collection(self.index_name)
+        partition_name = partition_name_for(namespace)
+        if not collection.has_partition(partition_name):
+            return set()
+
+        primary_field = config_settings.PRIMARY_KEY_FIELD_SCHEMA_NAME
+        with get_partition_router(collection).loaded([namespace]):
+            iterator = collection.query_iterator(
+                batch_size=1000,
+                expr=f"file_name == {json.dumps(file_name)}",
+                output_fields=[primary_field],
+                partition_names=[partition_name],
+            )
+            stored_ids = set()
+            try:
+                while batch := iterator.next():
+                    stored_ids.update(row[primary_field] for row in batch)
+            finally:
+                iterator.close()
+        return stored_ids
+
+    @property
+    def cache_scope(self) -> str:
+        return f"milvus:{self.index_name}"
+
+    def _hybrid_search(
+            self,
+            query: str,
+            namespaces: list[str] | None,
+            k: int,
+            filters: dict[str, Any] | None,
+    ) -> list[Document]:
+        collection = get_collection(self.index_name)
+        expr = build_filter_expr(filters)
+        limit = max(k, config_settings.HYBRID_CANDIDATE_LIMIT)
+        requests = [
+            AnnSearchRequest(
+                data=[dense_embed_func.embed_query(query)],
+                anns_field=config_settings.DENSE_FIELD_SCHEMA_NAME,
+                param=get_dense_search_params(),
+                limit=limit,
+                expr=expr,
+            ),
+            # The BM25 function embeds the raw query text server side
+            AnnSearchRequest(
+                data=[query],
+                anns_field=config_settings.SPARSE_FIELD_SCHEMA_NAME,
+                param=get_sparse_search_params(),
+                limit=limit,
+                expr=expr,
+            ),
+        ]
+        if config_settings.HYBRID_RANKER == "weighted":
+            ranker = WeightedRanker(*config_settings.HYBRID_WEIGHTS)
+        else:
+            ranker = RRFRanker(config_settings.HYBRID_RRF_K)
+
+        text_field = config_settings.TEXT_FIELD_SCHEMA_NAME
+        vector_fields = {config_settings.DENSE_FIELD_SCHEMA_NAME, config_settings.SPARSE_FIELD_SCHEMA_NAME}
+
+        with get_partition_router(collection).loaded(namespaces) as partition_names:
+            if not partition_names:
+                return []
+            results = collection.hybrid_search(
+                requests, ranker, limit=limit, partition_names=partition_names, output_fields=["*"]
+            )
+
+        candidates = []
+        for hit in results[0]:
+            entity = {field: value for field, value in hit.fields.items() if field not in vector_fields}
+            candidates.append(
+                Document(
+                    page_content=entity.pop(text_field, ""),
+                    metadata=entity | {"id": hit.id, "score": hit.distance},
+                )
+            )
+        return postprocess_hits(query, candidates, k, reranker=get_reranker())
@@ -0,0 +1,112 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+from loguru import logger
+from pymilvus import Collection
+from VideoAnalyzer.client_registry import client_registry
+from VideoAnalyzer.settings import config_settings
+
+
+def partition_name_for(namespace: str | None) -> str:
+    """
+    Milvus partition name of a namespace, or of DEFAULT_NAMESPACE without one.
+
+    Partition names only allow letters, digits and underscores, so the
+    namespace is sanitised and suffixed with a short hash to keep distinct
+    namespaces from colliding after sanitising.
+    """
+    namespace = namespace or config_settings.DEFAULT_NAMESPACE
+    sanitised = re.sub(r"[^0-9A-Za-z_]", "_", namespace)[:64]
+    digest = hashlib.sha1(namespace.encode("utf-8")).hexdigest()[:8]
+    return f"ns_{sanitised}_{digest}"
+
+
+class PartitionRouter:
+    """
+    Routes inserts and searches of a collection to per-namespace partitions.
+
+    Partitions are created on first insert and loaded on first search; a
+    search without namespaces goes to the DEFAULT_NAMESPACE partition, the
+    whole collection is never loaded. At most
+    ``max_loaded`` partitions stay loaded; when a new one is loaded, the least
+    recently searched partitions that no search is currently using are
+    released, so query node memory stays bounded as tenants grow.
+    """
+
+    def __init__(self, collection: Collection, max_loaded: int | None = None) -> None:
+        self.collection = collection
+        self.max_loaded = max_loaded or config_settings.MILVUS_MAX_LOADED_PARTITIONS
+        self._lock = threading.Lock()
+        self._loaded: OrderedDict[str, None] = OrderedDict()
+        self._in_use: dict[str, int] = defaultdict(int)
+        self._partition_locks: dict[str, threading.Lock] = {}
+
+    def _partition_lock(self, partition_name: str) -> threading.Lock:
+        with self._lock:
+            return self._partition_locks.setdefault(partition_name, threading.Lock())
+
+    def ensure_partition(self, namespace: str) -> str:
+        """Create the namespace's partition if needed and return its name."""
+        partition_name = partition_name_for(namespace)
+        with self._partition_lock(partition_name):
+            if not self.collection.has_partition(partition_name):
+                self.collection.create_partition(partition_name)
+                logger.info(f"Created partition {partition_name} for namespace: {namespace}")
+        return partition_name
+
+    def _load(self, partition_name: str) -> None:
+        with self._partition_lock(partition_name):
+            with self._lock:
+                if partition_name in self._loaded:
+                    self._loaded.move_to_end(partition_name)
+                    return
+            self.collection.partition(partition_name).load()
+            logger.info(f"Loaded partition {partition_name} of {self.collection.name}")
+            with self._lock:
+                self._loaded[partition_name] = None
+
+    def _release_least_recently_used(self) -> None:
+        with self._lock:
+            evictable = [name for name in self._loaded if not self._in_use[name]]
+            excess = len(self._loaded) - self.max_loaded
+            to_release = evictable[:max(0, excess)]
+            for name in to_release:
+                del self._loaded[name]
+
+        for name in to_release:
+            with self._partition_lock(name):
+                with self._lock:
+                    # A search may have picked the partition up again since it was chosen
+                    if name in self._loaded or self._in_use[name]:
+                        continue
+                self.collection.partition(name).release()
+            logger.info(f"Released partition {name} of {self.collection.name}")
+
+    @contextmanager
+    def loaded(self, namespaces: Iterable[str] | None) -> Iterator[list[str]]:
+        """Load the namespaces' partitions for the duration of a search and yield their names."""
+        # Namespaces without a partition have nothing stored yet
+        partition_names = [
+            name
+            for name in dict.fromkeys(map(partition_name_for, namespaces or [None]))
+            if self.collection.has_partition(name)
+        ]
+        with self._lock:
+            for name in partition_names:
+                self._in_use[name] += 1
+        try:
+            for name in partition_names:
+                self._load(name)
+            self._release_least_recently_used()
+            yield partition_names
+        finally:
+            with self._lock:
+                for name in partition_names:
+                    self._in_use[name] -= 1
+
+
+def get_partition_router(collection: Collection) -> PartitionRouter:
+    return client_registry.get(("partition_router", collection.name), lambda: PartitionRouter(collection))
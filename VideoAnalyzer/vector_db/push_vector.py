@@ -1,15 +1,80 @@
+from typing import Iterable
+from langchain_core.documents import Document
+from loguru import logger
+from pymilvus import Collection, connections, utility
+from VideoAnalyzer.client_registry import client_registry
+from VideoAnalyzer.settings import config_settings
+from VideoAnalyzer.vector_db.collection_schema_design import get_collection_schema
+from VideoAnalyzer.vector_db.partitions import get_partition_router, partition_name_for
+from VideoAnalyzer.vector_db.search_cache import invalidate_search_cache
+from VideoAnalyzer.vector_db.utils import dense_embed_func, create_index_with_type
 
 
-def push_to_database(texts, index_name, namespace):
-    # collect metadata to track source information
-    meta_datas = [text['metadata'] for text in texts]
+def connect_to_milvus() -> str:
+    """Open the process-wide Milvus connection once and return its alias."""
+    def connect() -> str:
+        connections.connect(
+            alias="default",
+            uri=config_settings.MILVUS_URI,
+            token=config_settings.MILVUS_TOKEN,
+            db_name=config_settings.MILVUS_DB_NAME,
+        )
+        return "default"
 
-    Pinecone.from_texts(
-        [t['page_content'] for t in texts],
-        get_embeddings(model_key="EMBEDDING_MODEL"),
-        meta_datas,
-        index_name=index_name,
-        namespace=namespace,
-    )
+    return client_registry.get(("milvus_connection",), connect)
 
-    # logger.info("Vectors have been pushed to database")
\ No newline at end of file
+
+def get_collection(index_name: str) -> Collection:
+    """Collection used for ingestion and search, created with the project schema and indexes if missing."""
+    def build_collection() -> Collection:
+        connect_to_milvus()
+        if utility.has_collection(index_name):
+            return Collection(index_name)
+
+        dense_embedding_length = len(dense_embed_func.embed_query("Test Embedding Dimension"))
+        collection = Collection(index_name, schema=get_collection_schema(dense_embedding_length))
+        create_index_with_type(collection)
+        logger.info(f"Created collection {index_name} with dense dimension {dense_embedding_length}")
+        return collection
+
+    return client_registry.get(("milvus_collection", index_name), build_collection)
+
+
+def push_to_database(texts: list[Document], index_name: str, namespace: str, ids: list[str] | None = None) -> list[str]:
+    """Embed documents and insert them into the namespace's partition."""
+    if not texts:
+        return []
+
+    namespace = namespace or config_settings.DEFAULT_NAMESPACE
+    collection = get_collection(index_name)
+    partition_name = get_partition_router(collection).ensure_partition(namespace)
+
+    vectors = dense_embed_func.embed_documents([text.page_content for text in texts])
+    rows = [
+        {
+            **text.metadata,
+            config_settings.TEXT_FIELD_SCHEMA_NAME: text.page_content,
+            config_settings.DENSE_FIELD_SCHEMA_NAME: vector,
+            config_settings.PARTITION_FIELD_SCHEMA_NAME: namespace,
+        }
+        | ({config_settings.PRIMARY_KEY_FIELD_SCHEMA_NAME: ids[i]} if ids else {})
+        for i, (text, vector) in enumerate(zip(texts, vectors))
+    ]
+    result = collection.insert(rows, partition_name=partition_name)
+    invalidate_search_cache(namespace)
+    logger.info(f"Pushed {len(rows)} vectors to {index_name} partition: {partition_name}")
+    return [str(pk) for pk in result.primary_keys]
+
+
+def delete_from_database(ids: Iterable[str], index_name: str, namespace: str | None = None) -> int:
+    ids = list(ids)
+    if ids:
+        collection = get_collection(index_name)
+        partition_name = partition_name_for(namespace) if namespace else None
+        primary_field = config_settings.PRIMARY_KEY_FIELD_SCHEMA_NAME
+        for start in range(0, len(ids), 1000):
+            id_list = ", ".join(f'"{chunk_id}"' for chunk_id in ids[start: start + 1000])
+            collection.delete(f"{primary_field} in [{id_list}]", partition_name=partition_name)
+        invalidate_search_cache(namespace)
+        logger.info(f"Deleted {len(ids)} vectors from {index_name}")
+    return len(ids)
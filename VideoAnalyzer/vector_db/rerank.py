@@ -0,0 +1,156 @@
+from typing import Any, Sequence, Tuple
+import numpy as np
+from langchain_core.documents import Document
+from loguru import logger
+from VideoAnalyzer.client_registry import client_registry
+from VideoAnalyzer.domains.injestion.transcript import parse_timestamp
+from VideoAnalyzer.settings import config_settings
+
+# (ids, scores) of one search request, best first
+SearchHits = Tuple[np.ndarray, np.ndarray]
+
+
+def _top(ids: np.ndarray, scores: np.ndarray, limit: int) -> SearchHits:
+    order = np.argsort(-scores, kind="stable")[:limit]
+    return ids[order], scores[order]
+
+
+def rrf_fuse(hits: Sequence[SearchHits], limit: int, k: int = 60) -> SearchHits:
+    """
+    Reciprocal rank fusion as Milvus RRFRanker: every request contributes
+    1 / (k + rank) for each of its hits, rank starting at 1.
+    """
+    hits = [(np.asarray(ids), np.asarray(scores)) for ids, scores in hits if len(ids)]
+    if not hits:
+        return np.empty(0, dtype=object), np.empty(0)
+
+    all_ids = np.concatenate([ids for ids, _ in hits])
+    contributions = np.concatenate([1.0 / (k + np.arange(1, len(ids) + 1)) for ids, _ in hits])
+    unique_ids, inverse = np.unique(all_ids, return_inverse=True)
+    return _top(unique_ids, np.bincount(inverse, weights=contributions), limit)
+
+
+def normalize_scores(scores: np.ndarray, metric: str) -> np.ndarray:
+    """Map raw scores to [0, 1] the way Milvus WeightedRanker does, larger is better."""
+    scores = np.asarray(scores, dtype=np.float64)
+    if metric == "L2":
+        return 1 - 2 * np.arctan(scores) / np.pi
+    if metric == "BM25":
+        return 2 * np.arctan(scores) / np.pi
+    # IP and COSINE
+    return 0.5 + np.arctan(scores) / np.pi
+
+
+def weighted_fuse(
+    hits: Sequence[SearchHits], weights: Sequence[float], metrics: Sequence[str], limit: int
+) -> SearchHits:
+    """Weighted sum of per-request normalised scores, as Milvus WeightedRanker."""
+    parts = [
+        (np.asarray(ids), weight * normalize_scores(scores, metric))
+        for (ids, scores), weight, metric in zip(hits, weights, metrics)
+        if len(ids)
+    ]
+    if not parts:
+        return np.empty(0, dtype=object), np.empty(0)
+
+    all_ids = np.concatenate([ids for ids, _ in parts])
+    unique_ids, inverse = np.unique(all_ids, return_inverse=True)
+    return _top(unique_ids, np.bincount(inverse, weights=np.concatenate([s for _, s in parts])), limit)
+
+
+class CrossEncoderReranker:
+    """
+    Scores (query, chunk) pairs with a sentence-transformers cross-encoder on CPU.
+
+    Pairs are scored in batches of ``batch_size``; the fused candidates are
+    reordered by these scores, which are stored as ``rerank_score``.
+    """
+
+    def __init__(self, model_name: str | None = None, batch_size: int | None = None) -> None:
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError as e:
+            raise ImportError("Cross-encoder reranking needs the sentence-transformers package") from e
+
+        self.model_name = model_name or config_settings.RERANKER_MODEL
+        self.batch_size = batch_size or config_settings.RERANKER_BATCH_SIZE
+        self.model = CrossEncoder(self.model_name, device="cpu")
+        logger.info(f"Loaded cross-encoder reranker {self.model_name}")
+
+    def rerank(self, query: str, documents: list[Document]) -> list[Document]:
+        if not documents:
+            return documents
+        scores = np.asarray(
+            self.model.predict(
+                [(query, document.page_content) for document in documents],
+                batch_size=self.batch_size,
+                show_progress_bar=False,
+            )
+        )
+        reranked = []
+        for position in np.argsort(-scores, kind="stable"):
+            document = documents[position]
+            document.metadata["rerank_score"] = float(scores[position])
+            reranked.append(document)
+        return reranked
+
+
+def get_reranker() -> CrossEncoderReranker | None:
+    if not config_settings.RERANKER_ENABLED:
+        return None
+    return client_registry.get(("reranker", config_settings.RERANKER_MODEL), CrossEncoderReranker)
+
+
+def merge_overlapping_segments(documents: list[Document], window_seconds: float) -> list[Document]:
+    """
+    Merge hits from the same file whose time ranges overlap or lie within
+    ``window_seconds`` of each other into one hit spanning them.
+
+    The merged hit takes the position of its best ranked member; documents
+    without timestamps are kept as they are.
+    """
+    merged: list[Document] = []
+    spans: dict[str, list[tuple[float, float, int]]] = {}
+
+    for document in documents:
+        metadata = document.metadata
+        if "start_time" not in metadata or "end_time" not in metadata:
+            merged.append(document)
+            continue
+
+        start, end = parse_timestamp(metadata["start_time"]), parse_timestamp(metadata["end_time"])
+        file_spans = spans.setdefault(metadata.get("file_name", ""), [])
+        for i, (span_start, span_end, position) in enumerate(file_spans):
+            if start <= span_end + window_seconds and end >= span_start - window_seconds:
+                target = merged[position]
+                if start < span_start:
+                    target.page_content = f"{document.page_content} {target.page_content}"
+                    target.metadata["start_time"] = metadata["start_time"]
+                elif end > span_end:
+                    target.page_content = f"{target.page_content} {document.page_content}"
+                if end > span_end:
+                    target.metadata["end_time"] = metadata["end_time"]
+                target.metadata["merged_hits"] = target.metadata.get("merged_hits", 1) + 1
+                file_spans[i] = (min(start, span_start), max(end, span_end), position)
+                break
+        else:
+            file_spans.append((start, end, len(merged)))
+            merged.append(Document(page_content=document.page_content, metadata=dict(metadata)))
+
+    return merged
+
+
+def postprocess_hits(
+    query: str,
+    documents: list[Document],
+    k: int,
+    reranker: Any = None,
+    dedup_window_seconds: float | None = None,
+) -> list[Document]:
+    """Rerank fused candidates, merge overlapping transcript hits and keep the top k."""
+    if reranker is not None:
+        documents = reranker.rerank(query, documents)
+    window = config_settings.DEDUP_WINDOW_SECONDS if dedup_window_seconds is None else dedup_window_seconds
+    if window >= 0:
+        documents = merge_overlapping_segments(documents, window)
+    return documents[:k]
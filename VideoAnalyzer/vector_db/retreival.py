@@ -1,22 +1,141 @@
+import json
+import numpy as np
 from pymilvus import AnnSearchRequest, Collection
 from typing import Any, Dict, List, Optional, Union
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
 from langchain_milvus.retrievers import MilvusCollectionHybridSearchRetriever
+from VideoAnalyzer.vector_db.partitions import PartitionRouter, get_partition_router
+from VideoAnalyzer.vector_db.rerank import postprocess_hits, rrf_fuse, weighted_fuse
+from VideoAnalyzer.vector_db.search_cache import get_search_cache, search_cache_key
 
 
 class CustomMilvusCollectionHybridSearchRetriever(MilvusCollectionHybridSearchRetriever):
-    """Custom Hybrid Search Retriever with Partition and Filtering"""
+    """
+    Custom Hybrid Search Retriever with Partition and Filtering
 
-    partition_name: Optional[str] = None  # Added partition support
+    Searches are routed to the partitions of ``namespaces``; the partitions are
+    loaded on first use and released least recently used by the collection's
+    ``PartitionRouter``. Without namespaces the DEFAULT_NAMESPACE partition is
+    searched.
+
+    With ``local_fusion`` the dense and sparse searches run separately and
+    their hits are fused, reranked and deduplicated client side, so a small
+    per-field limit is enough to fill top_k with distinct moments. Results
+    are cached per query, filter and namespaces until those namespaces change.
+    """
+
+    namespaces: Optional[List[str]] = None  # Tenants whose partitions are searched
+    partition_name: Optional[str] = None  # Deprecated single namespace, use namespaces
     filter_expr: Optional[str] = None  # Added filtering support
+    speakers: Optional[List[str]] = None  # Restrict hits to chunks with any of these speakers
+    partition_router: Optional[PartitionRouter] = None
+    # Client side post-processing: fuse per-field hits ("rrf" or "weighted"), rerank and merge overlapping segments
+    local_fusion: bool = False
+    fusion: str = "rrf"
+    fusion_weights: Optional[List[float]] = None
+    rrf_k: int = 60
+    reranker: Optional[Any] = None  # e.g. rerank.CrossEncoderReranker
+    dedup_window_seconds: Optional[float] = None
 
     def __init__(self, **kwargs: Any):
         super().__init__(**kwargs)
 
-        # Load specific partition if provided
-        self.collection.load(
-            partition_names=[self.partition_name] if self.partition_name else None
+        if self.namespaces is None and self.partition_name:
+            self.namespaces = [self.partition_name]
+        if self.partition_router is None:
+            self.partition_router = get_partition_router(self.collection)
+
+    def _get_relevant_documents(
+            self,
+            query: str,
+            *,
+            run_manager: CallbackManagerForRetrieverRun,
+            **kwargs: Any,
+    ) -> List[Document]:
+        cache = get_search_cache()
+        if cache is not None:
+            key = search_cache_key(
+                f"milvus:{self.collection.name}",
+                query,
+                self.namespaces,
+                self._build_filter_expr(None),
+                self.top_k,
+                tuple(self.anns_fields),
+                tuple(self.field_exprs or ()),
+                self.local_fusion,
+            )
+            if (documents := cache.get(key)) is not None:
+                return documents
+
+        documents = self._search_namespaces(query)
+        if cache is not None:
+            cache.put(key, self.namespaces, documents)
+        return documents
+
+    def _search_namespaces(self, query: str) -> List[Document]:
+        requests = self._build_ann_search_requests(query)
+        with self.partition_router.loaded(self.namespaces) as partition_names:
+            if not partition_names:
+                return []
+            return self._search(query, requests, partition_names)
+
+    def _search(
+            self, query: str, requests: List[AnnSearchRequest], partition_names: List[str]
+    ) -> List[Document]:
+        if not self.local_fusion:
+            search_result = self.collection.hybrid_search(
+                requests,
+                self.rerank,
+                limit=self.top_k,
+                partition_names=partition_names,
+                output_fields=self.output_fields,
+            )
+            return self._process_search_result(search_result)
+
+        # Run every field's search separately and fuse the hit lists client side
+        hits, entities, metrics = [], {}, []
+        for request in requests:
+            result = self.collection.search(
+                data=request.data,
+                anns_field=request.anns_field,
+                param=request.param,
+                limit=request.limit,
+                expr=request.expr,
+                partition_names=partition_names,
+                output_fields=self.output_fields,
+            )[0]
+            hits.append((np.array([hit.id for hit in result]), np.array([hit.distance for hit in result])))
+            metrics.append(request.param.get("metric_type", "IP"))
+            for hit in result:
+                entities.setdefault(hit.id, hit.fields)
+
+        limit = max(self.top_k, max((request.limit for request in requests), default=self.top_k))
+        if self.fusion == "weighted":
+            weights = self.fusion_weights or [1.0 / len(requests)] * len(requests)
+            ids, scores = weighted_fuse(hits, weights, metrics, limit)
+        else:
+            ids, scores = rrf_fuse(hits, limit, self.rrf_k)
+
+        candidates = []
+        for hit_id, score in zip(ids.tolist(), scores):
+            document = self._parse_document(dict(entities[hit_id]))
+            document.metadata |= {"id": hit_id, "score": float(score)}
+            candidates.append(document)
+        return postprocess_hits(
+            query, candidates, self.top_k, reranker=self.reranker, dedup_window_seconds=self.dedup_window_seconds
         )
 
+    def _build_filter_expr(self, expr: Optional[str]) -> Optional[str]:
+        """Combine the custom filter (or the field expression) with the speaker filter"""
+        expr = self.filter_expr if self.filter_expr else expr
+        if not self.speakers:
+            return expr
+
+        speaker_list = ", ".join(json.dumps(speaker) for speaker in self.speakers)
+        speaker_expr = f"array_contains_any(speakers, [{speaker_list}])"
+        return f"({expr}) and {speaker_expr}" if expr else speaker_expr
+
     def _build_ann_search_requests(self, query: str) -> List[AnnSearchRequest]:
         """Override method to include filtering expression"""
         search_requests = []
@@ -32,7 +151,7 @@ class CustomMilvusCollectionHybridSearchRetriever(MilvusCollectionHybridSearchRe
                 anns_field=ann_field,
                 param=param,
                 limit=limit,
-                expr=self.filter_expr if self.filter_expr else expr,  # Apply custom filter if provided
+                expr=self._build_filter_expr(expr),  # Apply custom and speaker filters if provided
             )
             search_requests.append(request)
         return search_requests
\ No newline at end of file
@@ -0,0 +1,178 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from contextlib import closing
+from typing import Any, Hashable, Iterable
+from langchain_core.documents import Document
+from VideoAnalyzer.client_registry import client_registry
+from VideoAnalyzer.settings import config_settings
+
+# Namespace recorded for searches that span every namespace
+ALL_NAMESPACES = "*"
+
+
+def normalize_query(query: str) -> str:
+    """Case, Unicode form and whitespace insensitive form of a query."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", query)).strip().lower()
+
+
+class NamespaceGenerations:
+    """
+    Write generation of every namespace, shared by every process on the host
+    through the rate limiter's SQLite file.
+
+    Ingesting into or deleting from a namespace bumps its generation and that
+    of searches over all namespaces; invalidating everything bumps the global
+    generation. The generations are part of the search cache key, so a write
+    handled by one API worker turns the cached results of every worker into
+    misses on their next lookup.
+    """
+
+    GLOBAL = ""
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path or config_settings.RATE_LIMIT_DB_PATH
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS search_generations ("
+                " namespace TEXT NOT NULL PRIMARY KEY, generation INTEGER NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    def current(self, namespaces: tuple[str, ...]) -> tuple[int, ...]:
+        """Global generation followed by the generation of each namespace."""
+        names = (self.GLOBAL, *namespaces)
+        with closing(self._connect()) as connection:
+            stored = dict(
+                connection.execute(
+                    "SELECT namespace, generation FROM search_generations"
+                    f" WHERE namespace IN ({', '.join('?' * len(names))})",
+                    names,
+                )
+            )
+        return tuple(stored.get(name, 0) for name in names)
+
+    def bump(self, namespace: str | None = None) -> None:
+        names = (namespace, ALL_NAMESPACES) if namespace else (self.GLOBAL,)
+        with closing(self._connect()) as connection:
+            connection.executemany(
+                "INSERT INTO search_generations (namespace, generation) VALUES (?, 1)"
+                " ON CONFLICT (namespace) DO UPDATE SET generation = generation + 1",
+                [(name,) for name in names],
+            )
+
+
+def get_namespace_generations() -> NamespaceGenerations | None:
+    if not config_settings.SEARCH_CACHE_SHARED_INVALIDATION:
+        return None
+    return client_registry.get(("search_generations",), NamespaceGenerations)
+
+
+def search_cache_key(
+        scope: str,
+        query: str,
+        namespaces: Iterable[str] | None,
+        filter_expr: str | None,
+        k: int,
+        *extra: Hashable,
+) -> tuple:
+    namespaces = tuple(sorted(namespaces or ()))
+    generations = get_namespace_generations()
+    versions = generations.current(namespaces or (ALL_NAMESPACES,)) if generations is not None else ()
+    return (scope, normalize_query(query), namespaces, filter_expr or "", k, *extra, versions)
+
+
+class SearchCache:
+    """
+    Bounded TTL/LRU cache of search results.
+
+    Entries are indexed by the namespaces they searched; ingesting into or
+    deleting from a namespace drops its entries together with the entries of
+    searches over all namespaces. Other API worker processes see the write
+    through the namespace generations in the cache key (see
+    ``NamespaceGenerations``), and their stale entries age out of the LRU.
+    """
+
+    def __init__(self, max_entries: int | None = None, ttl_seconds: float | None = None) -> None:
+        self.max_entries = max_entries or config_settings.SEARCH_CACHE_MAX_ENTRIES
+        self.ttl_seconds = config_settings.SEARCH_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._entries: OrderedDict[tuple, tuple[float, tuple[str, ...], list[Document]]] = OrderedDict()
+        self._by_namespace: dict[str, set[tuple]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _copy(documents: list[Document]) -> list[Document]:
+        return [Document(page_content=doc.page_content, metadata=dict(doc.metadata)) for doc in documents]
+
+    def _remove(self, key: tuple) -> None:
+        _, namespaces, _ = self._entries.pop(key)
+        for namespace in namespaces:
+            keys = self._by_namespace.get(namespace)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_namespace[namespace]
+
+    def get(self, key: tuple) -> list[Document] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._copy(entry[2])
+
+    def put(self, key: tuple, namespaces: Iterable[str] | None, documents: list[Document]) -> None:
+        namespaces = tuple(namespaces or ()) or (ALL_NAMESPACES,)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, namespaces, self._copy(documents))
+            for namespace in namespaces:
+                self._by_namespace.setdefault(namespace, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, namespace: str | None = None) -> int:
+        """Drop the entries of a namespace and of all-namespace searches, or everything without a namespace."""
+        with self._lock:
+            if namespace is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                self._by_namespace.clear()
+                return dropped
+
+            keys = self._by_namespace.get(namespace, set()) | self._by_namespace.get(ALL_NAMESPACES, set())
+            for key in list(keys):
+                self._remove(key)
+            return len(keys)
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def get_search_cache() -> SearchCache | None:
+    if not config_settings.SEARCH_CACHE_ENABLED:
+        return None
+    return client_registry.get(("search_cache",), SearchCache)
+
+
+def invalidate_search_cache(namespace: str | None = None) -> None:
+    if (cache := get_search_cache()) is not None:
+        if (generations := get_namespace_generations()) is not None:
+            generations.bump(namespace)
+        cache.invalidate(namespace)
@@ -1,11 +1,16 @@
 from VideoAnalyzer.vector_db.models import MilvusConnectionRequest
 from langchain_openai import OpenAIEmbeddings
 from VideoAnalyzer.settings import config_settings
+from VideoAnalyzer.vector_db.index_profiles import get_dense_index_params
 from pymilvus import utility, DataType
 from loguru import logger
 import asyncio
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+from typing import Iterable
+import tiktoken
+from VideoAnalyzer.rate_limiter import count_tokens, get_rate_limiter
 
 
 def split_text(text: list[Document], CHUNK_SIZE: int = 500, CHUNK_OVERLAP: int=100) -> list[str]:
@@ -18,6 +23,60 @@ def split_text(text: list[Document], CHUNK_SIZE: int = 500, CHUNK_OVERLAP: int=1
     return texts
 
 
+def _merge_transcript_segments(segments: list[Document]) -> Document:
+    """Merge consecutive transcript segments into a single Document spanning their time range."""
+    metadata = dict(segments[0].metadata)
+    metadata["end_time"] = segments[-1].metadata["end_time"]
+    metadata["segment_count"] = len(segments)
+    speakers = sorted({segment.metadata["speaker"] for segment in segments if "speaker" in segment.metadata})
+    metadata.pop("speaker", None)
+    if speakers:
+        metadata["speakers"] = speakers
+    page_content = " ".join(segment.page_content.strip() for segment in segments)
+    return Document(page_content=page_content, metadata=metadata)
+
+
+def split_transcript(
+        segments: Iterable[Document],
+        MAX_TOKENS: int = 300,
+        OVERLAP_SEGMENTS: int = 1,
+        ENCODING_NAME: str = "cl100k_base",
+) -> list[Document]:
+    """
+    Merges consecutive transcript segments into chunks of up to MAX_TOKENS tokens.
+
+    Segments are never split, so every chunk starts and ends on a segment boundary
+    and carries the exact start_time of its first and end_time of its last segment.
+    The last OVERLAP_SEGMENTS segments of a chunk are repeated at the start of the next one.
+    """
+    encoding = tiktoken.get_encoding(ENCODING_NAME)
+    chunks: list[Document] = []
+    window: list[tuple[Document, int]] = []
+    window_tokens = 0
+    new_segments = 0
+
+    for segment in segments:
+        tokens = len(encoding.encode(segment.page_content))
+        if new_segments and window_tokens + tokens > MAX_TOKENS:
+            chunks.append(_merge_transcript_segments([doc for doc, _ in window]))
+            window = window[-OVERLAP_SEGMENTS:] if OVERLAP_SEGMENTS > 0 else []
+            window_tokens = sum(count for _, count in window)
+            new_segments = 0
+            # Drop overlap that would not leave room for the incoming segment
+            while window and window_tokens + tokens > MAX_TOKENS:
+                window_tokens -= window.pop(0)[1]
+
+        window.append((segment, tokens))
+        window_tokens += tokens
+        new_segments += 1
+
+    if new_segments:
+        chunks.append(_merge_transcript_segments([doc for doc, _ in window]))
+
+    logger.info(f"Merged transcript segments into {len(chunks)} chunks")
+    return chunks
+
+
 def validate_sparse_embedding(sparse_embedding: dict[int, float]) -> bool:
     """
     Custom validation function to check if a sparse embedding is valid.
@@ -33,8 +92,8 @@ def create_index_with_type(collection=None):
 
     The method takes a collection object and creates an index on the given field.
     The type of index created depends on the type of field. For example, for a
-    dense field, a dense index is created and for a sparse field, a sparse index
-    is created.
+    dense field, a dense index is created from the DENSE_INDEX_TYPE profile (see
+    index_profiles) and for a sparse field, a sparse index is created.
 
     If an index already exists for a given field, the method will skip its creation.
 
@@ -59,9 +118,9 @@ def create_index_with_type(collection=None):
                     logger.warning(f"Index already exists for Dense field '{field_name}'. Skipping its creation.")
 
                 else:
-                    logger.debug(f"Creating Dense index in the collection with Index Type {config_settings.DENSE_INDEX_TYPE} "
-                                 f"& Metric Type {config_settings.DENSE_METRIC_TYPE}")
-                    dense_index = {"index_type": config_settings.DENSE_INDEX_TYPE, "metric_type": config_settings.DENSE_METRIC_TYPE}
+                    dense_index = get_dense_index_params()
+                    logger.debug(f"Creating Dense index in the collection with Index Type {dense_index['index_type']} "
+                                 f"& Metric Type {dense_index['metric_type']} & Params {dense_index['params']}")
                     collection.create_index(field_name, dense_index)
 
             # Check and create Sparse index
@@ -96,13 +155,33 @@ def validate_collection_name(collection_name: str):
         raise e
 
 
+class RateLimitedEmbeddings(Embeddings):
+    """Embeddings that wait on the shared rate limiter of their model key before every call."""
+
+    def __init__(self, embeddings: Embeddings, model_key: str = "EMBEDDING_MODEL") -> None:
+        self.embeddings = embeddings
+        self.model_key = model_key
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        # The client sends chunk_size texts per request
+        chunk_size = getattr(self.embeddings, "chunk_size", None) or 1000
+        get_rate_limiter().acquire(
+            self.model_key, requests=max(1, -(-len(texts) // chunk_size)), tokens=count_tokens(texts)
+        )
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> list[float]:
+        get_rate_limiter().acquire(self.model_key, tokens=count_tokens([text]))
+        return self.embeddings.embed_query(text)
+
+
 async def get_embedding_model():
     try:
         embed_model=OpenAIEmbeddings(
             model=config_settings.OPENAI_EMBEDDING_MODEL,
             api_key=config_settings.OPENAI_API_KEY
         )
-        return embed_model
+        return RateLimitedEmbeddings(embed_model)
 
     except Exception as e:
         logger.error(f"Error {e}")
@@ -0,0 +1,100 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Iterable
+from langchain_core.documents import Document
+from VideoAnalyzer.vector_db.search_cache import get_search_cache, search_cache_key
+
+
+# Metadata fields holding lists, a filter on them matches chunks containing any of the values
+ARRAY_FILTER_FIELDS = ("speakers", "tags", "synonyms")
+
+
+def build_filter_expr(filters: dict[str, Any] | None) -> str | None:
+    """Milvus boolean expression of metadata equality filters, a list value matches any of its values."""
+    if not filters:
+        return None
+
+    clauses = []
+    for field, value in filters.items():
+        if isinstance(value, (list, tuple, set)):
+            values = ", ".join(json.dumps(item) for item in value)
+            if field in ARRAY_FILTER_FIELDS:
+                clauses.append(f"array_contains_any({field}, [{values}])")
+            else:
+                clauses.append(f"{field} in [{values}]")
+        else:
+            clauses.append(f"{field} == {json.dumps(value)}")
+    return " and ".join(clauses)
+
+
+def matches_filters(metadata: dict[str, Any], filters: dict[str, Any] | None) -> bool:
+    """In-process counterpart of build_filter_expr."""
+    for field, value in (filters or {}).items():
+        stored = metadata.get(field)
+        if isinstance(value, (list, tuple, set)):
+            if field in ARRAY_FILTER_FIELDS:
+                if not set(stored or []) & set(value):
+                    return False
+            elif stored not in value:
+                return False
+        elif stored != value:
+            return False
+    return True
+
+
+class VectorStore(ABC):
+    """
+    Storage and hybrid search of document chunks, per namespace.
+
+    Ingestion and retrieval only depend on this interface, so a deployment can
+    use Milvus or the embedded single-node store (``VECTOR_STORE_BACKEND``).
+    Hybrid search fuses a dense and a BM25 sparse search with the configured
+    ranker (RRF or weighted), with the semantics of Milvus ``hybrid_search``.
+    Results are served from the search cache until the namespace changes.
+    """
+
+    @abstractmethod
+    def add_documents(self, documents: list[Document], namespace: str, ids: list[str] | None = None) -> list[str]:
+        """Embed and store documents in the namespace, returning their IDs."""
+
+    @abstractmethod
+    def delete(self, ids: Iterable[str], namespace: str | None = None) -> int:
+        """Delete chunks by ID, returning how many were requested for deletion."""
+
+    @abstractmethod
+    def get_chunk_ids(self, file_name: str, namespace: str) -> set[str]:
+        """IDs of the chunks stored for a file in the namespace."""
+
+    @abstractmethod
+    def _hybrid_search(
+            self,
+            query: str,
+            namespaces: list[str] | None,
+            k: int,
+            filters: dict[str, Any] | None,
+    ) -> list[Document]:
+        """Backend search, called on cache misses."""
+
+    @property
+    def cache_scope(self) -> str:
+        """Identifies the store in search cache keys."""
+        return self.__class__.__name__
+
+    def hybrid_search(
+            self,
+            query: str,
+            namespaces: list[str] | None = None,
+            k: int = 4,
+            filters: dict[str, Any] | None = None,
+    ) -> list[Document]:
+        """Top k chunks for the query, with ``id`` and ``score`` in their metadata."""
+        cache = get_search_cache()
+        if cache is None:
+            return self._hybrid_search(query, namespaces, k, filters)
+
+        key = search_cache_key(self.cache_scope, query, namespaces, build_filter_expr(filters), k)
+        if (documents := cache.get(key)) is not None:
+            return documents
+        documents = self._hybrid_search(query, namespaces, k, filters)
+        cache.put(key, namespaces, documents)
+        return documents
@@ -0,0 +1,59 @@
+import pytest
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+from VideoAnalyzer.domains.s3_utils.artifact_store import ArtifactStore
+
+BUCKET = "artifacts"
+
+
+@pytest.fixture
+def store():
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield ArtifactStore(client=client, bucket_name=BUCKET, prefix="tests", max_workers=4)
+
+
+def test_key_joins_parts_under_prefix(store):
+    assert store.key("checkpoints", 7, "manifest.json") == "tests/checkpoints/7/manifest.json"
+
+
+def test_put_file_round_trip(store, tmp_path):
+    source = tmp_path / "audio.mp3"
+    source.write_bytes(b"\x00\x01" * 1024)
+    key = store.put_file(str(source), store.key("audio", "audio.mp3"), "audio/mpeg")
+
+    assert store.exists(key)
+    target = store.download_file(key, str(tmp_path / "copy" / "audio.mp3"))
+    with open(target, "rb") as f:
+        assert f.read() == source.read_bytes()
+
+
+def test_put_json_round_trip(store):
+    data = {"stages": {"download": {"file": "download.mp4"}}, "request_id": 7}
+    key = store.put_json(data, store.key("checkpoints", 7, "manifest.json"))
+
+    assert store.get_json(key) == data
+    assert not store.exists(store.key("checkpoints", 8, "manifest.json"))
+
+
+def test_upload_many_and_delete_prefix(store, tmp_path):
+    uploads = []
+    for index in range(8):
+        source = tmp_path / f"chunk_{index}.wav"
+        source.write_bytes(bytes([index]) * 256)
+        uploads.append((str(source), store.key("chunks", f"chunk_{index}.wav"), "audio/wav"))
+    uploads.append((b"{}", store.key("chunks", "manifest.json"), "application/json"))
+    uploads.append((b"keep", store.key("other", "keep.txt"), "text/plain"))
+
+    keys = store.upload_many(uploads)
+
+    assert keys == [key for _, key, _ in uploads]
+    assert store.get_bytes(store.key("chunks", "chunk_3.wav")) == bytes([3]) * 256
+    assert len(store.list_keys(store.key("chunks", ""))) == 9
+
+    assert store.delete_prefix(store.key("chunks", "")) == 9
+    assert store.list_keys(store.key("chunks", "")) == []
+    assert store.exists(store.key("other", "keep.txt"))
@@ -0,0 +1,36 @@
+import os
+
+from VideoAnalyzer.domains.injestion.checkpoint import JobCheckpoint
+
+
+def test_resume_after_completed_stages(tmp_path):
+    root = str(tmp_path)
+    media = tmp_path / "download.mp4"
+    media.write_bytes(b"media")
+
+    checkpoint = JobCheckpoint(7, root=root)
+    saved = checkpoint.save_file("download", str(media))
+    checkpoint.save_json("transcript_chunk_0", {"segments": [[0.0, 2.5, "hello"]]})
+
+    resumed = JobCheckpoint(7, root=root)
+
+    assert resumed.is_done("download")
+    assert resumed.is_done("transcript_chunk_0")
+    assert not resumed.is_done("split")
+    assert resumed.file("download") == saved
+    assert resumed.load_json("transcript_chunk_0") == {"segments": [[0.0, 2.5, "hello"]]}
+
+
+def test_jobs_are_independent(tmp_path):
+    JobCheckpoint(7, root=str(tmp_path)).mark("download", file="download.mp4")
+
+    assert not JobCheckpoint(8, root=str(tmp_path)).is_done("download")
+
+
+def test_clear_forgets_the_job(tmp_path):
+    checkpoint = JobCheckpoint(7, root=str(tmp_path))
+    checkpoint.mark("split")
+    checkpoint.clear()
+
+    assert not os.path.isdir(checkpoint.directory)
+    assert not JobCheckpoint(7, root=str(tmp_path)).is_done("split")
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from VideoAnalyzer.vector_db.rerank import normalize_scores, rrf_fuse, weighted_fuse
+
+
+def test_rrf_fuse_sums_reciprocal_ranks():
+    dense = (np.array(["a", "b", "c"]), np.array([0.9, 0.8, 0.7]))
+    sparse = (np.array(["c", "a"]), np.array([12.0, 3.0]))
+
+    ids, scores = rrf_fuse([dense, sparse], limit=3, k=60)
+
+    assert list(ids) == ["a", "c", "b"]
+    assert scores[0] == pytest.approx(1 / 61 + 1 / 62)
+    assert scores[1] == pytest.approx(1 / 63 + 1 / 61)
+    assert scores[2] == pytest.approx(1 / 62)
+
+
+def test_rrf_fuse_limit_and_empty_requests():
+    dense = (np.array(["a", "b", "c"]), np.array([0.9, 0.8, 0.7]))
+    empty = (np.array([]), np.array([]))
+
+    ids, _ = rrf_fuse([dense, empty], limit=2)
+    assert list(ids) == ["a", "b"]
+
+    ids, scores = rrf_fuse([empty], limit=2)
+    assert len(ids) == 0 and len(scores) == 0
+
+
+def test_weighted_fuse_uses_normalized_scores():
+    dense = (np.array(["a", "b"]), np.array([0.9, 0.1]))
+    sparse = (np.array(["b"]), np.array([20.0]))
+
+    ids, scores = weighted_fuse([dense, sparse], [0.3, 0.7], ["COSINE", "BM25"], limit=2)
+
+    expected_b = 0.3 * normalize_scores(np.array([0.1]), "COSINE")[0] + 0.7 * normalize_scores(np.array([20.0]), "BM25")[0]
+    assert list(ids) == ["b", "a"]
+    assert scores[0] == pytest.approx(expected_b)
+    assert scores[1] == pytest.approx(0.3 * normalize_scores(np.array([0.9]), "COSINE")[0])
+
+
+def test_normalize_scores_larger_is_better():
+    assert normalize_scores(np.array([0.1]), "L2")[0] > normalize_scores(np.array([2.0]), "L2")[0]
+    assert normalize_scores(np.array([2.0]), "IP")[0] > normalize_scores(np.array([0.1]), "IP")[0]
+    assert 0 <= normalize_scores(np.array([0.0]), "BM25")[0] < normalize_scores(np.array([5.0]), "BM25")[0] <= 1
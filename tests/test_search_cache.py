@@ -0,0 +1,90 @@
+import pytest
+from langchain_core.documents import Document
+
+from VideoAnalyzer.vector_db import search_cache
+from VideoAnalyzer.vector_db.search_cache import NamespaceGenerations, SearchCache, search_cache_key
+
+
+@pytest.fixture(autouse=True)
+def generations(tmp_path, monkeypatch):
+    generations = NamespaceGenerations(str(tmp_path / "generations.sqlite3"))
+    monkeypatch.setattr(search_cache, "get_namespace_generations", lambda: generations)
+    return generations
+
+
+def documents(text):
+    return [Document(page_content=text, metadata={"file_name": f"{text}.mp4"})]
+
+
+def test_key_ignores_query_case_and_whitespace():
+    assert search_cache_key("hybrid", "  Pricing   Plans ", ["b", "a"], None, 5) == search_cache_key(
+        "hybrid", "pricing plans", ["a", "b"], "", 5
+    )
+
+
+def test_hit_returns_a_copy():
+    cache = SearchCache(max_entries=10, ttl_seconds=60)
+    cache.put(("q",), ["sales"], documents("sales"))
+
+    hit = cache.get(("q",))
+    hit[0].metadata["file_name"] = "changed"
+
+    assert cache.get(("q",))[0].metadata["file_name"] == "sales.mp4"
+    assert cache.metrics()["hits"] == 2
+
+
+def test_invalidate_namespace_drops_its_entries_and_all_namespace_searches():
+    cache = SearchCache(max_entries=10, ttl_seconds=60)
+    cache.put(("sales",), ["sales"], documents("sales"))
+    cache.put(("support",), ["support"], documents("support"))
+    cache.put(("everything",), None, documents("everything"))
+
+    assert cache.invalidate("sales") == 2
+
+    assert cache.get(("sales",)) is None
+    assert cache.get(("everything",)) is None
+    assert cache.get(("support",)) is not None
+
+
+def test_invalidate_everything():
+    cache = SearchCache(max_entries=10, ttl_seconds=60)
+    cache.put(("sales",), ["sales"], documents("sales"))
+    cache.put(("support",), ["support"], documents("support"))
+
+    assert cache.invalidate() == 2
+    assert cache.metrics()["entries"] == 0
+
+
+def test_expired_and_evicted_entries_miss():
+    expired = SearchCache(max_entries=10, ttl_seconds=0)
+    expired.put(("q",), ["sales"], documents("sales"))
+    assert expired.get(("q",)) is None
+
+    bounded = SearchCache(max_entries=2, ttl_seconds=60)
+    for name in ("a", "b", "c"):
+        bounded.put((name,), [name], documents(name))
+    assert bounded.get(("a",)) is None
+    assert bounded.get(("c",)) is not None
+    # Evicted entries are no longer indexed by their namespace
+    assert bounded.invalidate("a") == 0
+
+
+def test_writes_in_another_worker_change_the_key(tmp_path):
+    # Two API workers share the generations file but not their caches
+    worker = SearchCache(max_entries=10, ttl_seconds=60)
+    other_worker = NamespaceGenerations(str(tmp_path / "generations.sqlite3"))
+    sales_key = search_cache_key("hybrid", "pricing", ["sales"], None, 5)
+    support_key = search_cache_key("hybrid", "pricing", ["support"], None, 5)
+    everything_key = search_cache_key("hybrid", "pricing", None, None, 5)
+    for key, namespaces in ((sales_key, ["sales"]), (support_key, ["support"]), (everything_key, None)):
+        worker.put(key, namespaces, documents("hit"))
+
+    other_worker.bump("sales")
+
+    assert worker.get(search_cache_key("hybrid", "pricing", ["sales"], None, 5)) is None
+    assert worker.get(search_cache_key("hybrid", "pricing", None, None, 5)) is None
+    assert worker.get(search_cache_key("hybrid", "pricing", ["support"], None, 5)) is not None
+
+    other_worker.bump()
+
+    assert worker.get(search_cache_key("hybrid", "pricing", ["support"], None, 5)) is None
@@ -0,0 +1,39 @@
+from VideoAnalyzer.domains.injestion.transcript import TranscriptSegments
+from VideoAnalyzer.vector_db.utils import split_transcript
+
+
+def make_segments(count):
+    transcript = TranscriptSegments()
+    for index in range(count):
+        transcript.append(index * 5.0, index * 5.0 + 4.0, f" segment number {index} of the talk")
+    return list(transcript.iter_documents())
+
+
+def test_short_transcript_is_one_chunk():
+    chunks = split_transcript(make_segments(3), MAX_TOKENS=300)
+
+    assert len(chunks) == 1
+    assert chunks[0].metadata["start_time"] == "00:00:00.000"
+    assert chunks[0].metadata["end_time"] == "00:00:14.000"
+    assert chunks[0].metadata["segment_count"] == 3
+
+
+def test_chunks_end_on_segment_boundaries_and_overlap():
+    segments = make_segments(40)
+    chunks = split_transcript(segments, MAX_TOKENS=40, OVERLAP_SEGMENTS=1)
+
+    assert len(chunks) > 1
+    assert chunks[0].metadata["start_time"] == segments[0].metadata["start_time"]
+    assert chunks[-1].metadata["end_time"] == segments[-1].metadata["end_time"]
+    starts = {segment.metadata["start_time"] for segment in segments}
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.metadata["start_time"] in starts
+        # The last segment of a chunk opens the next one
+        assert previous.page_content.endswith(chunk.page_content.split(" of the talk")[0] + " of the talk")
+
+
+def test_without_overlap_every_segment_is_in_one_chunk():
+    segments = make_segments(40)
+    chunks = split_transcript(segments, MAX_TOKENS=40, OVERLAP_SEGMENTS=0)
+
+    assert sum(chunk.metadata["segment_count"] for chunk in chunks) == len(segments)
@@ -0,0 +1,46 @@
+import pytest
+
+from VideoAnalyzer.domains.injestion.vad import SpeechOffsetMap
+
+
+class Segment:
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
+
+def test_to_original_without_regions_is_identity():
+    assert SpeechOffsetMap([]).to_original(12.5) == 12.5
+
+
+def test_to_original_skips_removed_silence():
+    offsets = SpeechOffsetMap([(2.0, 5.0), (10.0, 12.0), (20.0, 30.0)])
+
+    assert offsets.speech_duration == 15.0
+    assert offsets.to_original(0.0) == 2.0
+    assert offsets.to_original(1.5) == 3.5
+    assert offsets.to_original(4.0) == 11.0
+    assert offsets.to_original(6.0) == 21.0
+
+
+def test_to_original_maps_boundaries_by_side():
+    offsets = SpeechOffsetMap([(2.0, 5.0), (10.0, 12.0)])
+
+    # 3s of speech is both the end of the first region and the start of the second
+    assert offsets.to_original(3.0) == 10.0
+    assert offsets.to_original(3.0, is_end=True) == 5.0
+
+
+def test_to_original_clamps_past_the_last_region():
+    offsets = SpeechOffsetMap([(2.0, 5.0)])
+
+    assert offsets.to_original(4.0) == 5.0
+
+
+def test_remap_segments():
+    offsets = SpeechOffsetMap([(2.0, 5.0), (10.0, 12.0)])
+    segments = [Segment(0.5, 3.0), Segment(3.0, 4.5)]
+
+    offsets.remap_segments(segments)
+
+    assert [(s.start, s.end) for s in segments] == [(2.5, 5.0), (10.0, 11.5)]